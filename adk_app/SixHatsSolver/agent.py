@@ -1,23 +1,50 @@
 import logging
+import os
 import sys
+import threading
 from dataclasses import dataclass, field
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence
 
-import litellm
-from google.adk.agents import ParallelAgent, SequentialAgent
-from google.adk.models.google_llm import Gemini
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
-# Custom Hat Factories
-from agents_intensive_capstone.agents import (
-    black_hat_factory,
-    blue_hat_factory,
-    green_hat_factory,
-    red_hat_factory,
-    white_hat_factory,
-    yellow_hat_factory,
+from agents_intensive_capstone.agents.context_compaction import (
+    ContextCompactionAgent,
+    clear_outputs_callback,
 )
+from agents_intensive_capstone.agents.decomposition import DecompositionAgent, ProblemDecomposer
+from agents_intensive_capstone.agents.incremental_synthesis import IncrementalSynthesisAgent
+from agents_intensive_capstone.agents.question_router import HatRouter, QuestionRouterAgent
+from agents_intensive_capstone.agents.quorum_parallel_agent import QuorumParallelAgent
+from agents_intensive_capstone.cache import (
+    InMemoryCacheBackend,
+    ResponseCache,
+    SqliteCacheBackend,
+)
+from agents_intensive_capstone.models.budget import BudgetedLlm, RequestBudget
+from agents_intensive_capstone.models.cascade import CascadeLlm, QualityCheck
+from agents_intensive_capstone.models.hedging import HedgedLlm
+from agents_intensive_capstone.models.rate_limit import (
+    RateLimit,
+    RateLimitedLlm,
+    bind_rate_limit_session,
+)
+from agents_intensive_capstone.models.routing import RoutedLlm
+from agents_intensive_capstone.models.scheduler import (
+    DEFAULT,
+    GEMINI,
+    LITELLM,
+    AdmissionLimits,
+    ScheduledLlm,
+    backend_of,
+    priority_callback,
+)
+from agents_intensive_capstone.prompts import preload_prompts
+
+# Model providers (litellm in particular), the hat factories and their tools
+# are imported on first use so that importing this module stays cheap for
+# serverless cold starts; see build_six_hats_agent and get_root_agent.
 
 # ==========================================
 # LOGGING & CONFIGURATION
@@ -47,6 +74,137 @@ class AgentConfig:
     retry_base: int = 7
     retry_codes: List[int] = field(default_factory=lambda: [429, 500, 503, 504])
 
+    # Response Cache (opt-in); a path selects the SQLite backend
+    enable_response_cache: bool = False
+    response_cache_path: Optional[str] = None
+    response_cache_max_entries: int = 1024
+    response_cache_ttl_seconds: Optional[float] = 24 * 60 * 60
+
+    # Topology: "barrier" waits for every hat before the Blue Hat runs;
+    # "incremental" folds each hat into a Blue Hat draft as soon as it finishes
+    topology: str = "barrier"
+
+    # Brainstorm Deadlines (barrier topology). Timeouts are keyed by hat,
+    # e.g. {"white": 20.0}; quorum is the "k" in "k of n" hats
+    hat_timeout_seconds: Dict[str, float] = field(default_factory=dict)
+    default_hat_timeout_seconds: Optional[float] = None
+    brainstorm_deadline_seconds: Optional[float] = None
+    brainstorm_quorum: Optional[int] = None
+    quorum_grace_seconds: float = 0.0
+
+    # Hedged Requests: re-issue a model call still running after this
+    # latency percentile (None disables hedging)
+    hedge_percentile: Optional[float] = None
+    hedge_min_samples: int = 20
+
+    # Shared Search (opt-in): "session" or "process" routes the White, Red and
+    # Yellow hat searches through one single-flight cache (None disables it).
+    # White and Red then search through a nested helper agent instead of
+    # built-in grounding: one more model call per search, saved on every hit
+    search_cache_scope: Optional[str] = None
+    search_cache_ttl_seconds: Optional[float] = 10 * 60
+
+    # Local Search (offline): the White and Red hats search this directory of
+    # .txt/.md/.rst documents instead of the web. It is indexed (incrementally)
+    # at startup into local_index_dir, by default <corpus>/.six_hats_index
+    local_corpus_dir: Optional[str] = None
+    local_index_dir: Optional[str] = None
+    local_search_top_k: int = 5
+    # "nested" searches for the Yellow Hat through its google_optimist agent
+    # (one extra model call per search); "direct" gives it a function tool
+    # over the local corpus whose results are filtered for positive framing
+    yellow_search_mode: str = "nested"
+
+    # Context Compaction (barrier topology): bound the Blue Hat's input to this
+    # many tokens of deduplicated hat outputs (None sends the full history)
+    blue_hat_token_budget: Optional[int] = None
+
+    # Structured Outputs: hats answer in typed, length-capped JSON schemas
+    # (see agents/hat_schemas.py) stored compactly in their output_key, and
+    # the Blue Hat reads a condensed rendering of them instead of the prose
+    structured_hat_outputs: bool = False
+
+    # Question Routing: run only the hats a question needs. A keyword
+    # classifier decides; below router_min_confidence the (small) router_model
+    # is asked, if set; otherwise every hat runs
+    route_questions: bool = False
+    router_model: Optional[str] = None
+    router_min_confidence: float = 0.5
+
+    # Decomposition (map-reduce): split multi-part problems into at most
+    # decomposition_max_parts independent sub-questions (lists and separate
+    # questions locally; else the decomposer_model is asked, if set), solve
+    # them with the full pipeline, decomposition_workers at a time, caching
+    # each sub-question's plan, then merge the plans decomposition_fan_in at a time
+    decompose_problems: bool = False
+    decomposer_model: Optional[str] = None
+    decomposition_max_parts: int = 8
+    decomposition_workers: int = 4
+    decomposition_fan_in: int = 4
+
+    # Model Cascade: each hat answers on the first (cheapest) tier and is
+    # re-run on the next tier when its answer fails the quality check.
+    # hat_tiers overrides cascade_tiers per hat, e.g. {"blue": ["gemini-2.5-flash"]};
+    # non-"gemini-" names are served through LiteLLM (White/Red/Yellow search
+    # with google_search and need Gemini tiers)
+    cascade_tiers: List[str] = field(default_factory=list)
+    hat_tiers: Dict[str, List[str]] = field(default_factory=dict)
+    cascade_min_chars: int = 400
+    cascade_required_sections: Dict[str, List[str]] = field(default_factory=dict)
+    cascade_min_confidence: Optional[float] = None
+
+    # Provider Routing: hats without a cascade send each call to whichever of
+    # routing_models currently has the lowest time to first response and error
+    # rate, failing over to the next on an error or when nothing arrives within
+    # routing_latency_slo_seconds. Calls with google_search stay on the
+    # "gemini-" models, e.g. ["gemini-2.5-flash-lite", "openai/gpt-4.1-mini"]
+    routing_models: List[str] = field(default_factory=list)
+    routing_latency_slo_seconds: Optional[float] = None
+
+    # Rate Limits: process-wide requests/tokens per minute keyed by model name,
+    # e.g. {"gemini-2.5-flash-lite": RateLimit(15, 250_000)}. Calls over the
+    # limit wait client-side (queued fairly per session) instead of retrying
+    # on 429s; output tokens are estimated up front and corrected from usage
+    rate_limits: Dict[str, RateLimit] = field(default_factory=dict)
+    rate_limit_output_tokens: int = 512
+
+    # Admission Control: process-wide cap on concurrent model calls per backend
+    # ("gemini" or "litellm"), e.g. {"gemini": AdmissionLimits(32, max_queue=64)}.
+    # Waiting calls are admitted by priority class ("interactive", "default",
+    # "batch"); a full queue or a wait over the timeout rejects the call with
+    # AdmissionRejected. The "request_priority" session state key picks the
+    # class per request, default_priority otherwise
+    admission_limits: Dict[str, AdmissionLimits] = field(default_factory=dict)
+    default_priority: str = DEFAULT
+
+    # Request Budget (barrier topology): token, model call, tool call and wall
+    # time limits for all hats of one request, nested search agents included.
+    # When spent, the hats still running are cancelled and the Blue Hat
+    # synthesizes from the outputs that exist. The "request_budget" session
+    # state key overrides individual limits per request
+    request_budget: Optional[RequestBudget] = None
+
+    # Cassettes (offline tests and demos): record every model call and shared
+    # search to this JSONL file, or replay them without network access.
+    # cassette_mode is "record", "replay" or "auto" (replay what is recorded,
+    # record the rest); both default to SIX_HATS_CASSETTE(_MODE)
+    cassette_path: Optional[str] = field(
+        default_factory=lambda: os.environ.get("SIX_HATS_CASSETTE") or None
+    )
+    cassette_mode: str = field(
+        default_factory=lambda: os.environ.get("SIX_HATS_CASSETTE_MODE", "replay")
+    )
+
+    @property
+    def uses_quorum_brainstorm(self) -> bool:
+        return bool(
+            self.hat_timeout_seconds
+            or self.default_hat_timeout_seconds is not None
+            or self.brainstorm_deadline_seconds is not None
+            or self.brainstorm_quorum is not None
+            or self.request_budget is not None
+        )
+
     @property
     def http_retry_options(self) -> types.HttpRetryOptions:
         return types.HttpRetryOptions(
@@ -64,82 +222,454 @@ class ModelBuilder:
     """Helper to initialize models with consistent settings."""
     def __init__(self, config: AgentConfig):
         self.config = config
-        
+        self.cascades: Dict[str, CascadeLlm] = {}
+        self.router: Optional[RoutedLlm] = None
+        self._models: Dict[str, BaseLlm] = {}
+        self.cassette = None
+        if config.cassette_path:
+            from agents_intensive_capstone.cassettes import Cassette
+
+            logger.info(f"Cassette {config.cassette_path} ({config.cassette_mode} mode)")
+            self.cassette = Cassette(config.cassette_path, mode=config.cassette_mode)
+
+    def create_gemini(self, model_name: Optional[str] = None) -> BaseLlm:
+        from google.adk.models.google_llm import Gemini
+
+        model_name = model_name or self.config.gemini_model
+        logger.debug(f"Creating Gemini model: {model_name}")
+        return self.wrap(Gemini(
+            model=model_name,
+            retry_options=self.config.http_retry_options,
+        ))
+
+    def create_litellm(self, model_name: Optional[str] = None) -> BaseLlm:
+        # litellm is by far the slowest import; only pay for it when used
+        import litellm
+        from google.adk.models.lite_llm import LiteLlm
+
         # Set global LiteLLM settings
         litellm.use_litellm_proxy = self.config.enable_proxy
         if self.config.enable_proxy:
             logger.info("LiteLLM Proxy enabled.")
 
-    def create_gemini(self) -> Gemini:
-        logger.debug(f"Creating Gemini model: {self.config.gemini_model}")
-        return Gemini(
-            model=self.config.gemini_model,
-            retry_options=self.config.http_retry_options,
+        model_name = model_name or self.config.gpt_model
+        logger.debug(f"Creating LiteLLM model: {model_name}")
+        return self.wrap(LiteLlm(model=model_name))
+
+    def create_model(self, model_name: str) -> BaseLlm:
+        """Gemini for ``gemini-*`` names, LiteLLM otherwise; one instance per name."""
+        if model_name not in self._models:
+            if model_name.startswith("gemini-"):
+                self._models[model_name] = self.create_gemini(model_name)
+            else:
+                self._models[model_name] = self.create_litellm(model_name)
+        return self._models[model_name]
+
+    def create_cascade(self, hat: str) -> Optional[BaseLlm]:
+        """The configured model cascade for ``hat``, or None without tiers."""
+        tiers = self.config.hat_tiers.get(hat, self.config.cascade_tiers)
+        if not tiers:
+            return None
+        if len(tiers) == 1:
+            return self.create_model(tiers[0])
+        if hat not in self.cascades:
+            models = [self.create_model(name) for name in tiers]
+            logger.debug(f"Cascading {hat} hat over {tiers}")
+            self.cascades[hat] = CascadeLlm(
+                model=models[0].model,
+                tiers=models,
+                check=QualityCheck(
+                    min_chars=self.config.cascade_min_chars,
+                    required_sections=tuple(self.config.cascade_required_sections.get(hat, [])),
+                    min_confidence=self.config.cascade_min_confidence,
+                ),
+            )
+        return self.cascades[hat]
+
+    def create_router(self) -> Optional[BaseLlm]:
+        """The latency-aware router over ``routing_models``, or None without them."""
+        names = self.config.routing_models
+        if not names:
+            return None
+        if len(names) == 1:
+            return self.create_model(names[0])
+        if self.router is None:
+            models = [self.create_model(name) for name in names]
+            logger.debug(f"Routing calls over {names}")
+            self.router = RoutedLlm(
+                model=models[0].model,
+                providers=models,
+                latency_slo_seconds=self.config.routing_latency_slo_seconds,
+            )
+        return self.router
+
+    def wrap(self, model: BaseLlm) -> BaseLlm:
+        """Applies the configured model wrappers (e.g. hedging, cassettes) to ``model``."""
+        limit = self.config.rate_limits.get(model.model)
+        if limit is not None:
+            # Innermost, so hedge requests count against the quota too
+            logger.debug(f"Rate limiting {model.model} to {limit}")
+            model = RateLimitedLlm(
+                model=model.model,
+                inner=model,
+                limit=limit,
+                expected_output_tokens=self.config.rate_limit_output_tokens,
+            )
+        if self.config.hedge_percentile is not None:
+            logger.debug(f"Hedging {model.model} at p{self.config.hedge_percentile:g}")
+            model = HedgedLlm(
+                model=model.model,
+                inner=model,
+                hedge_percentile=self.config.hedge_percentile,
+                min_samples=self.config.hedge_min_samples,
+            )
+        backend = backend_of(model)
+        if backend in self.config.admission_limits:
+            # Outside hedging, so a hedged pair takes a single slot
+            limits = self.config.admission_limits[backend]
+            logger.debug(f"Scheduling {model.model} calls on the {backend} backend ({limits})")
+            model = ScheduledLlm(model=model.model, inner=model, backend=backend, limits=limits)
+        if self.cassette is not None:
+            from agents_intensive_capstone.cassettes import CassetteLlm
+
+            # Outside rate limits, hedging and scheduling, so replayed calls skip them
+            model = CassetteLlm(model=model.model, inner=model, cassette=self.cassette)
+        if self.config.request_budget is not None:
+            # Outermost: a hedged pair counts as one call, replayed calls count too
+            model = BudgetedLlm(model=model.model, inner=model)
+        return model
+
+    def wrap_tool(self, tool: Any) -> Any:
+        """Records/replays a client-side tool through the cassette, if one is configured."""
+        if self.cassette is None or tool is None:
+            return tool
+        from agents_intensive_capstone.cassettes import CassetteTool
+
+        return CassetteTool(tool, self.cassette)
+
+def build_response_cache(config: AgentConfig) -> Optional[ResponseCache]:
+    """Creates the shared hat response cache, or None when caching is disabled."""
+    if not config.enable_response_cache:
+        return None
+    if config.response_cache_path:
+        logger.info(f"Response cache enabled (sqlite: {config.response_cache_path})")
+        backend = SqliteCacheBackend(
+            config.response_cache_path,
+            max_entries=config.response_cache_max_entries,
+            ttl_seconds=config.response_cache_ttl_seconds,
         )
+    else:
+        logger.info("Response cache enabled (in-memory)")
+        backend = InMemoryCacheBackend(
+            max_entries=config.response_cache_max_entries,
+            ttl_seconds=config.response_cache_ttl_seconds,
+        )
+    return ResponseCache(backend)
+
+def build_search_cache(config: AgentConfig) -> Optional[Any]:
+    """Creates the search cache shared by the searching hats, or None when disabled."""
+    if config.search_cache_scope is None:
+        return None
+
+    from agents_intensive_capstone.tools.search_cache import (
+        PROCESS_SCOPE,
+        SearchCache,
+        process_search_cache,
+    )
+
+    logger.info(f"Shared search cache enabled ({config.search_cache_scope} scope)")
+    if config.search_cache_scope == PROCESS_SCOPE:
+        return process_search_cache(ttl_seconds=config.search_cache_ttl_seconds)
+    return SearchCache(
+        scope=config.search_cache_scope, ttl_seconds=config.search_cache_ttl_seconds
+    )
+
+def build_local_index(config: AgentConfig) -> Optional[Any]:
+    """Opens the offline corpus index, or None when no corpus is configured."""
+    if config.local_corpus_dir is None:
+        return None
+
+    from agents_intensive_capstone.tools.local_search import LocalCorpusIndex
+
+    index = LocalCorpusIndex.open(config.local_corpus_dir, config.local_index_dir)
+    logger.info(
+        f"Local search enabled: {index.passages} passages from {index.documents} documents"
+    )
+    return index
 
-    def create_litellm(self) -> LiteLlm:
-        logger.debug(f"Creating LiteLLM model: {self.config.gpt_model}")
-        return LiteLlm(model=self.config.gpt_model)
+def build_local_search(config: AgentConfig, index: Optional[Any] = None) -> Optional[Any]:
+    """Creates the offline corpus search tool, or None when no corpus is configured."""
+    if index is None:
+        index = build_local_index(config)
+    if index is None:
+        return None
+
+    from agents_intensive_capstone.tools.local_search import create_local_search_tool
+
+    return create_local_search_tool(index, top_k=config.local_search_top_k)
+
+def build_yellow_search(config: AgentConfig, index: Optional[Any]) -> Optional[Any]:
+    """The Yellow Hat's direct search tool, or None for the nested search agent."""
+    if config.yellow_search_mode == "nested":
+        return None
+    if config.yellow_search_mode != "direct":
+        raise ValueError(f"Unknown Yellow Hat search mode {config.yellow_search_mode!r}")
+    if index is None:
+        # google_search grounding only runs inside a model call
+        raise ValueError("The direct Yellow Hat search needs a local_corpus_dir")
+
+    from agents_intensive_capstone.tools.positive_framing import create_optimist_search_tool
+
+    return create_optimist_search_tool(index.search, top_k=config.local_search_top_k)
 
 # ==========================================
 # WORKFLOW ASSEMBLY
 # ==========================================
 
-def build_six_hats_agent() -> SequentialAgent:
-    """Instantiates all hats and assembles the Parallel->Sequential workflow."""
+# Thinking hats run in the brainstorm stage, in their default order.
+BRAINSTORM_HATS = ("white", "red", "black", "yellow", "green")
+
+def build_six_hats_agent(
+    config: Optional[AgentConfig] = None,
+    model: Optional[Any] = None,
+    hats: Optional[Sequence[str]] = None,
+) -> BaseAgent:
+    """Instantiates all hats and assembles the Parallel->Sequential workflow.
+
+    ``model`` overrides the Gemini model for every hat (e.g. a ``StubLlm`` for
+    offline benchmarks) and ``hats`` restricts the brainstorm fan-out to a
+    subset of ``BRAINSTORM_HATS``.
+    """
+    # Custom Hat Factories
+    from agents_intensive_capstone.agents import (
+        black_hat_factory,
+        blue_hat_factory,
+        green_hat_factory,
+        red_hat_factory,
+        white_hat_factory,
+        yellow_hat_factory,
+    )
+    from agents_intensive_capstone.agents.search_agent_factory import SearchAgentFactory
+
     logger.info("Initializing Six Hats Agent Workflow...")
     
-    config = AgentConfig()
+    config = config or AgentConfig()
     builder = ModelBuilder(config)
     
-    # Instantiate Models
-    gemini = builder.create_gemini()
-    gpt = builder.create_litellm()
-
-    try:
-        # --- Instantiate The 6 Hats ---
-        
-        # WHITE HAT: Facts & Data
-        white_hat = white_hat_factory.WhiteHatFactory.create(model=gemini)
-        
-        # RED HAT: Emotions & Intuition
-        red_hat = red_hat_factory.RedHatFactory.create(model=gemini)
-        
-        # BLACK HAT: Caution & Risk
-        black_hat = black_hat_factory.BlackHatFactory.create(model=gemini)
-        
-        # YELLOW HAT: Optimism & Benefits
-        yellow_hat = yellow_hat_factory.YellowHatFactory.create(
-            model=gemini, 
-            search_model=gemini
+    # Instantiate Models (the LiteLLM model is created by ModelBuilder on
+    # demand; no hat uses it by default)
+    gemini = builder.wrap(model) if model is not None else builder.create_gemini()
+    cache = build_response_cache(config)
+
+    # Read every bundled prompt in one pass before the factories ask for them
+    preload_prompts()
+    search_cache = build_search_cache(config)
+
+    def model_for(hat: str) -> BaseLlm:
+        """The hat's cascade, else the provider router, else ``gemini`` (always with a model)."""
+        if model is not None:
+            return gemini
+        return builder.create_cascade(hat) or builder.create_router() or gemini
+
+    # Searches shared by the White and Red hats: the local corpus when
+    # configured, else the cached search helper (built-in grounding otherwise)
+    local_index = build_local_index(config)
+    shared_search = build_local_search(config, local_index)
+    yellow_search = build_yellow_search(config, local_index)
+    if shared_search is None and search_cache is not None:
+        shared_search = builder.wrap_tool(SearchAgentFactory.create_tool(
+            model=gemini, search_cache=search_cache, cache=cache
+        ))
+
+    def schema(module: Any) -> Optional[Any]:
+        return module.OUTPUT_SCHEMA if config.structured_hat_outputs else None
+
+    def create_hats(selected: Sequence[str]) -> Dict[str, Any]:
+        """Instantiates the selected thinking hats (fresh agents on every call)."""
+        constructors = {
+            # WHITE HAT: Facts & Data
+            "white": lambda: white_hat_factory.WhiteHatFactory.create(
+                model=model_for("white"),
+                search_tool=shared_search,
+                cache=cache,
+                output_schema=schema(white_hat_factory),
+            ),
+            # RED HAT: Emotions & Intuition
+            "red": lambda: red_hat_factory.RedHatFactory.create(
+                model=model_for("red"),
+                search_tool=shared_search,
+                cache=cache,
+                output_schema=schema(red_hat_factory),
+            ),
+            # BLACK HAT: Caution & Risk
+            "black": lambda: black_hat_factory.BlackHatFactory.create(
+                model=model_for("black"), cache=cache, output_schema=schema(black_hat_factory)
+            ),
+            # YELLOW HAT: Optimism & Benefits
+            "yellow": lambda: yellow_hat_factory.YellowHatFactory.create(
+                model=model_for("yellow"),
+                search_model=gemini,
+                search_cache=search_cache,
+                search_tool=yellow_search,
+                cache=cache,
+                output_schema=schema(yellow_hat_factory),
+            ),
+            # GREEN HAT: Creativity & Alternatives
+            "green": lambda: green_hat_factory.GreenHatFactory.create(
+                model=model_for("green"), cache=cache, output_schema=schema(green_hat_factory)
+            ),
+        }
+        try:
+            return {hat: constructors[hat]() for hat in selected}
+        except Exception as e:
+            logger.critical(f"Error creating sub-agents: {e}")
+            raise e
+
+    def build_brainstorm(selected: Sequence[str]) -> BaseAgent:
+        """Step 1: Brainstorm (Parallel) over ``selected`` hats."""
+        brainstorm_hats = create_hats(selected)
+        team = [brainstorm_hats[hat] for hat in selected]
+
+        if config.topology == "incremental":
+            # Blue Hat drafts its synthesis while the slower hats are still running
+            return IncrementalSynthesisAgent(
+                name="SixHatsBrainstorm",
+                sub_agents=team,
+                synthesizer=blue_hat_factory.BlueHatFactory.create_incremental(
+                    model=gemini, cache=cache
+                ),
+            )
+        if config.uses_quorum_brainstorm:
+            # A stuck hat is cut off instead of stalling the Blue Hat
+            return QuorumParallelAgent(
+                name="SixHatsBrainstorm",
+                sub_agents=team,
+                hat_timeouts={
+                    brainstorm_hats[hat].name: seconds
+                    for hat, seconds in config.hat_timeout_seconds.items()
+                    if hat in brainstorm_hats
+                },
+                default_hat_timeout=config.default_hat_timeout_seconds,
+                deadline=config.brainstorm_deadline_seconds,
+                quorum=config.brainstorm_quorum,
+                quorum_grace=config.quorum_grace_seconds,
+                budget=config.request_budget,
+            )
+        return ParallelAgent(name="SixHatsBrainstorm", sub_agents=team)
+
+    # --- Validate Configuration ---
+
+    selected = list(hats) if hats is not None else list(BRAINSTORM_HATS)
+    unknown = set(selected) - set(BRAINSTORM_HATS)
+    if unknown or not selected:
+        raise ValueError(f"Invalid hat selection {selected!r}; choose from {BRAINSTORM_HATS}")
+
+    if config.topology not in ("barrier", "incremental"):
+        raise ValueError(f"Unknown topology {config.topology!r}")
+    if config.topology == "incremental" and config.uses_quorum_brainstorm:
+        raise ValueError(
+            "Hat timeouts, deadline, quorum and request budget apply to the barrier topology only"
         )
-        
-        # GREEN HAT: Creativity & Alternatives
-        green_hat = green_hat_factory.GreenHatFactory.create(model=gemini)
-        
-        # BLUE HAT: The Manager/Synthesizer
-        blue_hat = blue_hat_factory.BlueHatFactory.create(model=gemini)
+    if config.topology == "incremental" and config.blue_hat_token_budget is not None:
+        raise ValueError("The Blue Hat token budget applies to the barrier topology only")
+    if config.decompose_problems and (
+        config.decomposition_workers < 1 or config.decomposition_fan_in < 2
+    ):
+        raise ValueError("Decomposition needs at least 1 worker and a fan-in of at least 2")
+    unknown_backends = set(config.admission_limits) - {GEMINI, LITELLM}
+    if unknown_backends:
+        raise ValueError(f"Unknown admission backends {sorted(unknown_backends)}")
 
-        logger.info("All Hat sub-agents created successfully.")
+    # BLUE HAT: The Manager/Synthesizer
+    blue_model = model_for("blue")
+    compact_brief = config.blue_hat_token_budget is not None or config.structured_hat_outputs
+    if config.topology == "incremental":
+        blue_hat = blue_hat_factory.BlueHatFactory.create_reconciler(model=blue_model, cache=cache)
+    elif compact_brief:
+        blue_hat = blue_hat_factory.BlueHatFactory.create_compact(model=blue_model, cache=cache)
+    else:
+        blue_hat = blue_hat_factory.BlueHatFactory.create(model=blue_model, cache=cache)
 
-    except Exception as e:
-        logger.critical(f"Error creating sub-agents: {e}")
-        raise e
+    # Root agent callbacks: let the rate limiters queue each session's model
+    # calls fairly and the schedulers admit them by the request's priority
+    root_callbacks = []
+    if config.rate_limits:
+        root_callbacks.append(bind_rate_limit_session)
+    if config.admission_limits:
+        root_callbacks.append(priority_callback(config.default_priority))
 
     # --- Define Topology ---
 
-    # Step 1: Brainstorm (Parallel)
-    thinking_team = ParallelAgent(
-        name="SixHatsBrainstorm",
-        sub_agents=[white_hat, red_hat, black_hat, yellow_hat, green_hat]
-    )
+    all_output_keys = {
+        "white": white_hat_factory.OUTPUT_KEY,
+        "red": red_hat_factory.OUTPUT_KEY,
+        "black": black_hat_factory.OUTPUT_KEY,
+        "yellow": yellow_hat_factory.OUTPUT_KEY,
+        "green": green_hat_factory.OUTPUT_KEY,
+    }
+    output_keys = {hat: all_output_keys[hat] for hat in selected}
+    if config.route_questions:
+        # Only the hats a question needs run; the brainstorm is built per subset
+        router_model = (
+            builder.create_gemini(config.router_model) if config.router_model else None
+        )
+        thinking_team = QuestionRouterAgent(
+            name="SixHatsRouter",
+            router=HatRouter(
+                selected, model=router_model, min_confidence=config.router_min_confidence
+            ),
+            build_stage=build_brainstorm,
+            output_keys=output_keys,
+        )
+    else:
+        thinking_team = build_brainstorm(selected)
+    logger.info("All Hat sub-agents created successfully.")
+
+    # Step 2 (optional): Compact the hat outputs into the Blue Hat's budget
+    # (structured outputs are condensed here too, budget or not)
+    stages = [thinking_team]
+    solver_callbacks = list(root_callbacks)
+    if compact_brief and config.topology != "incremental":
+        # The brief is built from state, so outputs of earlier turns go first
+        solver_callbacks.append(clear_outputs_callback(list(output_keys.values())))
+        stages.append(ContextCompactionAgent(
+            name="BlueHatContextCompaction",
+            sources={key: f"{hat.title()} Hat" for hat, key in output_keys.items()},
+            token_budget=config.blue_hat_token_budget,
+        ))
 
-    # Step 2: Solve (Sequential)
+    # Step 3: Solve (Sequential)
     # The Blue Hat takes the output of the thinking_team and finalizes it
     main_agent = SequentialAgent(
         name="SixHatsSolver",
-        sub_agents=[thinking_team, blue_hat]
+        sub_agents=[*stages, blue_hat],
+        before_agent_callback=solver_callbacks or None,
     )
+
+    # Optional front-end: large problems are split and solved per part (map),
+    # then the Blue Hat merges the plans (reduce)
+    if config.decompose_problems:
+        decomposer_model = (
+            builder.create_model(config.decomposer_model) if config.decomposer_model else None
+        )
+        main_agent = DecompositionAgent(
+            name="SixHatsDecomposer",
+            sub_agents=[
+                main_agent,
+                blue_hat_factory.BlueHatFactory.create_merger(model=blue_model, cache=cache),
+            ],
+            decomposer=ProblemDecomposer(
+                model=decomposer_model, max_parts=config.decomposition_max_parts
+            ),
+            max_workers=config.decomposition_workers,
+            fan_in=config.decomposition_fan_in,
+            before_agent_callback=root_callbacks or None,
+            # Sub-problem plans share the response cache's storage when it is on
+            cache=cache.backend if cache is not None else InMemoryCacheBackend(
+                max_entries=config.response_cache_max_entries,
+                ttl_seconds=config.response_cache_ttl_seconds,
+            ),
+        )
     
     logger.info("Agent assembly complete. Ready to serve.")
     return main_agent
@@ -148,9 +678,29 @@ def build_six_hats_agent() -> SequentialAgent:
 # EXPORT FOR ADK WEBUI
 # ==========================================
 
-# The WebUI expects an 'agent' object to exist in the global scope.
-try:
-    root_agent = build_six_hats_agent()
-except Exception as e:
-    logger.critical("Failed to load agent for WebUI.", exc_info=True)
-    raise e
\ No newline at end of file
+_root_agent: Optional[BaseAgent] = None
+_root_agent_lock = threading.Lock()
+
+def get_root_agent() -> BaseAgent:
+    """Builds the default agent tree on first call and returns it afterwards."""
+    global _root_agent
+    with _root_agent_lock:
+        if _root_agent is None:
+            try:
+                _root_agent = build_six_hats_agent()
+            except Exception as e:
+                logger.critical("Failed to load agent for WebUI.", exc_info=True)
+                raise e
+    return _root_agent
+
+def __getattr__(name: str) -> Any:
+    # The WebUI expects a 'root_agent' object in the global scope. It is
+    # built on first access (the first request) instead of at import time.
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# SIX_HATS_EAGER_INIT=1 restores building the tree at import, e.g. to fail
+# fast on configuration errors in long-running deployments.
+if os.environ.get("SIX_HATS_EAGER_INIT", "").lower() in ("1", "true", "yes"):
+    root_agent = get_root_agent()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Cold-start benchmark for the ADK app module ``adk_app.SixHatsSolver.agent``.
+
+Every run starts a fresh interpreter, imports the module and then touches
+``root_agent`` as the first request would, timing both phases separately
+along with the whole process. ``--eager`` measures ``SIX_HATS_EAGER_INIT=1``
+and ``--top-modules`` lists the slowest imports reported by
+``python -X importtime``, which helps pinpoint startup regressions.
+
+Usage::
+
+    python -m benchmarks.cold_start --runs 10 --top-modules 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .common import format_ms, summarize
+
+MODULE = "adk_app.SixHatsSolver.agent"
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import {MODULE} as app
+imported = time.perf_counter()
+app.root_agent
+built = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "first_request": built - imported,
+    "litellm_loaded": "litellm" in sys.modules,
+}}))
+"""
+
+
+def _env(eager: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["SIX_HATS_EAGER_INIT"] = "1" if eager else "0"
+    return env
+
+
+def run_once(eager: bool) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=_env(eager),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process"] = time.perf_counter() - started
+    return sample
+
+
+def top_imports(limit: int, eager: bool) -> List[Tuple[float, str]]:
+    """The ``limit`` slowest imports by cumulative time (seconds, module)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        env=_env(eager),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings.append((int(cumulative) / 1_000_000, name))
+    return sorted(timings, reverse=True)[:limit]
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    run_once(args.eager)  # warm the OS file cache so runs are comparable
+    samples = [run_once(args.eager) for _ in range(args.runs)]
+
+    mode = "eager" if args.eager else "lazy"
+    print(f"{MODULE} cold start ({mode}, {args.runs} runs)")
+    print(f"{'phase':<15} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    phases = {}
+    for phase in ("import", "first_request", "process"):
+        stats = summarize([sample[phase] for sample in samples])
+        phases[phase] = stats
+        print(
+            f"{phase:<15} {format_ms(stats['p50'])} {format_ms(stats['p95'])} "
+            f"{format_ms(stats['max'])}"
+        )
+    litellm_loaded = any(sample["litellm_loaded"] for sample in samples)
+    print(f"litellm imported: {'yes' if litellm_loaded else 'no'}")
+
+    slowest = top_imports(args.top_modules, args.eager) if args.top_modules else []
+    if slowest:
+        print(f"\nSlowest imports (cumulative ms, {mode}):")
+        for seconds, name in slowest:
+            print(f"{format_ms(seconds)}  {name}")
+
+    return {
+        "mode": mode,
+        "phases": phases,
+        "litellm_loaded": litellm_loaded,
+        "top_imports": [{"module": name, "seconds": seconds} for seconds, name in slowest],
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--eager", action="store_true", help="build root_agent at import")
+    parser.add_argument("--top-modules", type=int, default=0, metavar="N")
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = main(arguments)
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
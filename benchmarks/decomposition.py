@@ -0,0 +1,115 @@
+"""
+Throughput benchmark of map-reduce decomposition on the offline stub model.
+
+Runs a problem of ``--parts`` independent sub-questions through
+``AgentConfig(decompose_problems=True)`` once per worker limit and reports
+wall time and sub-problems solved per second, then re-runs the problem to show
+the per-sub-problem cache. No network access or API key is required.
+
+Usage::
+
+    python -m benchmarks.decomposition --parts 8 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_app.SixHatsSolver.agent import AgentConfig, build_six_hats_agent
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+
+TOPICS = [
+    "Which city should host our second office?",
+    "Should the new team work remotely or on site?",
+    "How do we staff the new office in its first six months?",
+    "What budget should we set aside for the move?",
+    "How do we keep one company culture across both offices?",
+    "Should we rent or buy the office building?",
+    "How do we split customer accounts between the offices?",
+    "Which tools do both offices need to share?",
+    "How do we measure whether the new office works out?",
+    "Should the founders relocate to the new office?",
+]
+
+
+def problem(parts: int) -> str:
+    topics = [TOPICS[i % len(TOPICS)] for i in range(parts)]
+    numbered = [
+        f"{i}. {topic}" if i <= len(TOPICS) else f"{i}. {topic[:-1]} (round {i})?"
+        for i, topic in enumerate(topics, start=1)
+    ]
+    return "We are opening a second office next year. Please advise on:\n" + "\n".join(numbered)
+
+
+async def run_once(agent: Any, question: str) -> float:
+    runner = InMemoryRunner(agent=agent, app_name="benchmark")
+    session = await runner.session_service.create_session(app_name="benchmark", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+    return time.perf_counter() - start
+
+
+async def run_workers(workers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    model = StubLlm(latency=LatencyDistribution.constant(args.latency_ms / 1000))
+    config = AgentConfig(
+        decompose_problems=True,
+        decomposition_workers=workers,
+        decomposition_fan_in=args.fan_in,
+        decomposition_max_parts=args.parts,
+    )
+    agent = build_six_hats_agent(config=config, model=model)
+    question = problem(args.parts)
+
+    cold = await run_once(agent, question)
+    calls = len(model.calls)
+    warm = await run_once(agent, question)
+    return {
+        "workers": workers,
+        "parts": args.parts,
+        "cold_seconds": round(cold, 3),
+        "sub_problems_per_second": round(args.parts / cold, 2),
+        "cold_model_calls": calls,
+        "cached_seconds": round(warm, 3),
+        "cached_model_calls": len(model.calls) - calls,
+    }
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    print(f"{'workers':>7} | {'wall (s)':>8} | {'parts/s':>7} | {'calls':>5} | cached wall, calls")
+    for workers in args.workers:
+        result = await run_workers(workers, args)
+        print(
+            f"{workers:>7} | {result['cold_seconds']:>8.2f} | "
+            f"{result['sub_problems_per_second']:>7.2f} | {result['cold_model_calls']:>5} | "
+            f"{result['cached_seconds']:.2f}s, {result['cached_model_calls']}"
+        )
+        results.append(result)
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--parts", type=int, default=8, help="sub-questions in the problem")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--fan-in", type=int, default=4, help="plans merged per reduce call")
+    parser.add_argument(
+        "--latency-ms", type=float, default=200.0, help="simulated latency of every model call"
+    )
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = asyncio.run(main(arguments))
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
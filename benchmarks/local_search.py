@@ -0,0 +1,129 @@
+"""
+Benchmark for the offline ``LocalCorpusIndex``.
+
+Generates a synthetic corpus (passages of Zipf-distributed words spread over
+many files), builds the index, then reports cold open time, query latency
+percentiles and the cost of an incremental refresh after one file changes.
+Query cost is bounded by ``max_postings_per_term`` rather than corpus size,
+so latency should stay flat as ``--passages`` grows.
+
+Usage::
+
+    python -m benchmarks.local_search --passages 100000 1000000 --queries 500
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from agents_intensive_capstone.tools.local_search import PASSAGE_WORDS, LocalCorpusIndex
+
+PASSAGES_PER_FILE = 1000
+VOCABULARY = 200_000
+
+
+def zipf_words(rng: random.Random, vocabulary: List[str], count: int) -> List[str]:
+    # Rank r is drawn with probability ~ 1/r
+    return [vocabulary[int(len(vocabulary) ** rng.random()) - 1] for _ in range(count)]
+
+
+def write_corpus(path: str, passages: int, rng: random.Random, vocabulary: List[str]) -> None:
+    for number, start in enumerate(range(0, passages, PASSAGES_PER_FILE)):
+        count = min(PASSAGES_PER_FILE, passages - start)
+        paragraphs = (
+            " ".join(zipf_words(rng, vocabulary, rng.randint(20, PASSAGE_WORDS)))
+            for _ in range(count)
+        )
+        with open(os.path.join(path, f"doc-{number:05d}.txt"), "w", encoding="utf-8") as fh:
+            fh.write("\n\n".join(paragraphs))
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(passages: int, args: argparse.Namespace, rng: random.Random) -> Dict[str, Any]:
+    vocabulary = [f"w{i}" for i in range(VOCABULARY)]
+    corpus = tempfile.mkdtemp(prefix="local-search-bench-")
+    try:
+        write_corpus(corpus, passages, rng, vocabulary)
+
+        started = time.perf_counter()
+        index = LocalCorpusIndex.open(corpus)
+        build_s = time.perf_counter() - started
+        index.close()
+
+        started = time.perf_counter()
+        index = LocalCorpusIndex(corpus)
+        open_ms = (time.perf_counter() - started) * 1e3
+
+        queries = [
+            " ".join(zipf_words(rng, vocabulary, rng.randint(2, 5))) for _ in range(args.queries)
+        ]
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, top_k=args.top_k)
+            latencies.append((time.perf_counter() - started) * 1e3)
+
+        with open(os.path.join(corpus, "doc-00000.txt"), "a", encoding="utf-8") as fh:
+            fh.write("\n\nfreshly appended passage")
+        started = time.perf_counter()
+        index.refresh()
+        refresh_ms = (time.perf_counter() - started) * 1e3
+        index.close()
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+    return {
+        "passages": passages,
+        "build_s": build_s,
+        "open_ms": open_ms,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": percentile(latencies, 0.95),
+        "query_max_ms": max(latencies),
+        "refresh_one_file_ms": refresh_ms,
+    }
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    results = {str(size): run(size, args, rng) for size in args.passages}
+
+    print(f"Local search, {args.queries} queries, top {args.top_k}")
+    print(
+        f"{'passages':>9} {'build s':>8} {'open ms':>8} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'max ms':>7} {'refresh ms':>10}"
+    )
+    for row in results.values():
+        print(
+            f"{row['passages']:>9} {row['build_s']:>8.1f} {row['open_ms']:>8.2f} "
+            f"{row['query_p50_ms']:>7.2f} {row['query_p95_ms']:>7.2f} {row['query_max_ms']:>7.2f} "
+            f"{row['refresh_one_file_ms']:>10.1f}"
+        )
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--passages", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = main(arguments)
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
@@ -0,0 +1,185 @@
+"""
+End-to-end latency benchmark for ``build_six_hats_agent()`` on the offline stub model.
+
+Runs the full SixHatsSolver pipeline under a grid of brainstorm fan-outs and
+session concurrency levels and reports p50/p95/p99 wall time, per-hat time and
+event-loop overhead (wall time not explained by simulated model latency on the
+critical path). No network access or API key is required.
+
+Usage::
+
+    python -m benchmarks.pipeline_latency --fan-out 1 3 5 --concurrency 1 8 32 --runs 64
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_app.SixHatsSolver.agent import BRAINSTORM_HATS, AgentConfig, build_six_hats_agent
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+
+from .common import format_ms, percentile, summarize
+
+QUESTION = "Should we switch our backend database from PostgreSQL to a NoSQL solution?"
+BLUE_HAT = "BlueHatAgent"
+
+
+class TimingPlugin(BasePlugin):
+    """Records per-agent wall time and model time for every invocation."""
+
+    def __init__(self) -> None:
+        super().__init__(name="benchmark_timing")
+        self.agent_time: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.model_time: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._agent_start: Dict[Tuple[str, str], float] = {}
+        self._model_start: Dict[Tuple[str, str], float] = {}
+
+    async def before_agent_callback(self, *, agent: Any, callback_context: Any) -> None:
+        self._agent_start[(callback_context.invocation_id, agent.name)] = time.perf_counter()
+
+    async def after_agent_callback(self, *, agent: Any, callback_context: Any) -> None:
+        key = (callback_context.invocation_id, agent.name)
+        start = self._agent_start.pop(key, None)
+        if start is not None:
+            self.agent_time[key[0]][agent.name] = time.perf_counter() - start
+
+    async def before_model_callback(self, *, callback_context: Any, llm_request: Any) -> None:
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._model_start[key] = time.perf_counter()
+
+    async def after_model_callback(self, *, callback_context: Any, llm_response: Any) -> None:
+        if llm_response.partial:
+            return
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        start = self._model_start.pop(key, None)
+        if start is not None:
+            self.model_time[key[0]][key[1]] += time.perf_counter() - start
+
+
+async def _sample_loop_lag(samples: List[float], interval: float = 0.005) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def _run_once(runner: InMemoryRunner, user_id: str) -> Tuple[Optional[str], float]:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id
+    )
+    message = types.Content(role="user", parts=[types.Part(text=QUESTION)])
+    invocation_id = None
+    start = time.perf_counter()
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session.id, new_message=message
+    ):
+        invocation_id = event.invocation_id
+    return invocation_id, time.perf_counter() - start
+
+
+async def run_scenario(
+    fan_out: int, concurrency: int, runs: int, model: StubLlm
+) -> Dict[str, Any]:
+    model.reset()
+    agent = build_six_hats_agent(
+        config=AgentConfig(), model=model, hats=BRAINSTORM_HATS[:fan_out]
+    )
+    timing = TimingPlugin()
+    runner = InMemoryRunner(agent=agent, app_name="benchmark", plugins=[timing])
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> Tuple[Optional[str], float]:
+        async with semaphore:
+            return await _run_once(runner, user_id=f"user-{i}")
+
+    lag: List[float] = []
+    monitor = asyncio.create_task(_sample_loop_lag(lag))
+    try:
+        results = await asyncio.gather(*(bounded(i) for i in range(runs)), return_exceptions=True)
+    finally:
+        monitor.cancel()
+
+    walls, overheads = [], []
+    per_hat: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    for result in results:
+        if isinstance(result, BaseException):
+            errors += 1
+            continue
+        invocation_id, wall = result
+        walls.append(wall)
+        for name, seconds in timing.agent_time.get(invocation_id, {}).items():
+            per_hat[name].append(seconds)
+        model_time = timing.model_time.get(invocation_id, {})
+        brainstorm = max((t for name, t in model_time.items() if name != BLUE_HAT), default=0.0)
+        overheads.append(wall - brainstorm - model_time.get(BLUE_HAT, 0.0))
+
+    return {
+        "fan_out": fan_out,
+        "concurrency": concurrency,
+        "runs": runs,
+        "errors": errors,
+        "wall": summarize(walls),
+        "overhead": summarize(overheads),
+        "loop_lag_p99": percentile(lag, 99),
+        "per_agent_p50": {name: percentile(v, 50) for name, v in sorted(per_hat.items())},
+        "model_calls": len(model.calls),
+    }
+
+
+def _print_row(result: Dict[str, Any]) -> None:
+    wall, overhead = result["wall"], result["overhead"]
+    print(
+        f"fan-out={result['fan_out']} conc={result['concurrency']:>3} "
+        f"runs={result['runs']:>4} err={result['errors']:>3} | wall p50/p95/p99 ms "
+        f"{format_ms(wall['p50'])}{format_ms(wall['p95'])}{format_ms(wall['p99'])} | "
+        f"overhead p50/p99 ms {format_ms(overhead['p50'])}{format_ms(overhead['p99'])} | "
+        f"loop lag p99 ms {format_ms(result['loop_lag_p99'])}"
+    )
+    for name, seconds in result["per_agent_p50"].items():
+        print(f"    {name:<24} p50 ms {format_ms(seconds)}")
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    model = StubLlm(
+        latency=LatencyDistribution.lognormal(args.latency_median, args.latency_sigma),
+        output_tokens=args.output_tokens,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    results = []
+    for fan_out in args.fan_out:
+        for concurrency in args.concurrency:
+            result = await run_scenario(fan_out, concurrency, args.runs, model)
+            _print_row(result)
+            results.append(result)
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fan-out", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--runs", type=int, default=32)
+    parser.add_argument("--latency-median", type=float, default=0.05, help="seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--output-tokens", type=int, default=64)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = asyncio.run(main(arguments))
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
@@ -0,0 +1,155 @@
+"""
+Token benchmark of structured (JSON schema) hat outputs against prose outputs.
+
+Runs the SixHatsSolver pipeline on the offline stub model twice: once with
+free-form prose hats and once with ``AgentConfig(structured_hat_outputs=True)``.
+In structured mode the stub fills every schema field up to its length cap,
+so the structured figures are a worst case. Reports hat output tokens and
+Blue Hat input tokens (estimated from the text) per mode. No network access
+or API key is required.
+
+Usage::
+
+    python -m benchmarks.structured_outputs --prose-words 300 450 700
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from adk_app.SixHatsSolver.agent import AgentConfig, build_six_hats_agent
+from agents_intensive_capstone.models import StubLlm, estimate_tokens
+from agents_intensive_capstone.models.tokens import request_text
+
+QUESTION = "Should we switch our backend database from PostgreSQL to a NoSQL solution?"
+BLUE_HAT = "BlueHatAgent"
+SCHEMA_MARKER = "Output format: reply with a single JSON object"
+
+_FIELD = re.compile(
+    r"^- (\w+) \((?:list of at most (\d+) strings of at most (\d+)|string of at most (\d+))"
+    r" characters\)",
+    re.M,
+)
+_WORDS = itertools.cycle(
+    "latency cost migration schema team risk benefit data scale index query "
+    "consistency budget vendor hiring roadmap customer churn pilot".split()
+)
+
+
+def _filler(chars: int) -> str:
+    text = ""
+    while len(text) < chars:
+        text += next(_WORDS) + " "
+    return text[:chars].strip()
+
+
+class TokenPlugin(BasePlugin):
+    """Estimated input and output tokens of every model call, per agent."""
+
+    def __init__(self) -> None:
+        super().__init__(name="benchmark_tokens")
+        self.input_tokens: Dict[str, int] = defaultdict(int)
+        self.output_tokens: Dict[str, int] = defaultdict(int)
+
+    async def before_model_callback(self, *, callback_context: Any, llm_request: Any) -> None:
+        self.input_tokens[callback_context.agent_name] += estimate_tokens(
+            request_text(llm_request)
+        )
+
+    async def after_model_callback(self, *, callback_context: Any, llm_response: Any) -> None:
+        if llm_response.partial or not llm_response.content:
+            return
+        text = "".join(part.text or "" for part in llm_response.content.parts or [])
+        self.output_tokens[callback_context.agent_name] += estimate_tokens(text)
+
+
+def responder(prose_words: int):
+    """Prose of ``prose_words`` words, or JSON filling the requested schema to its caps."""
+
+    def respond(llm_request: LlmRequest) -> str:
+        text = request_text(llm_request)
+        if SCHEMA_MARKER not in text:
+            return " ".join(next(_WORDS) for _ in range(prose_words))
+        reply: Dict[str, Any] = {}
+        for name, items, item_chars, chars in _FIELD.findall(text):
+            if items:
+                reply[name] = [_filler(int(item_chars)) for _ in range(int(items))]
+            else:
+                reply[name] = _filler(int(chars))
+        return json.dumps(reply, indent=2)
+
+    return respond
+
+
+async def run_mode(structured: bool, prose_words: int) -> Dict[str, Any]:
+    model = StubLlm(responder=responder(prose_words))
+    agent = build_six_hats_agent(
+        config=AgentConfig(structured_hat_outputs=structured), model=model
+    )
+    tokens = TokenPlugin()
+    runner = InMemoryRunner(agent=agent, app_name="benchmark", plugins=[tokens])
+    session = await runner.session_service.create_session(app_name="benchmark", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text=QUESTION)])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+
+    hats = [name for name in tokens.output_tokens if name != BLUE_HAT]
+    return {
+        "mode": "structured" if structured else "prose",
+        "prose_words": prose_words,
+        "hat_output_tokens": sum(tokens.output_tokens[name] for name in hats),
+        "blue_hat_input_tokens": tokens.input_tokens[BLUE_HAT],
+        "total_input_tokens": sum(tokens.input_tokens.values()),
+    }
+
+
+def _reduction(before: int, after: int) -> str:
+    return f"{(1 - after / before) * 100:5.1f}%" if before else "  n/a"
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    print(f"{'prose words':>11} | {'mode':<10} | hat output tok | blue hat input tok | total in")
+    for prose_words in args.prose_words:
+        prose = await run_mode(False, prose_words)
+        structured = await run_mode(True, prose_words)
+        for result in (prose, structured):
+            print(
+                f"{prose_words:>11} | {result['mode']:<10} | {result['hat_output_tokens']:>14} | "
+                f"{result['blue_hat_input_tokens']:>18} | {result['total_input_tokens']:>8}"
+            )
+        print(
+            f"{'':>11} | {'reduction':<10} | "
+            f"{_reduction(prose['hat_output_tokens'], structured['hat_output_tokens']):>14} | "
+            f"{_reduction(prose['blue_hat_input_tokens'], structured['blue_hat_input_tokens']):>18}"
+            f" | {_reduction(prose['total_input_tokens'], structured['total_input_tokens']):>8}"
+        )
+        results.extend([prose, structured])
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--prose-words", type=int, nargs="+", default=[300, 450, 700],
+        help="length of each prose hat answer",
+    )
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = asyncio.run(main(arguments))
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
@@ -0,0 +1,167 @@
+"""
+Micro-benchmark for ``get_positive_data`` topic matching.
+
+Compares the original ``if``/``elif`` branch chain (over the bundled catalog,
+and an equivalent linear scan over synthetic catalogs) with the Aho-Corasick
+``KeywordIndex`` as the number of datasets grows. Topics are short phrases
+like the ones the Yellow Hat passes in; half of them match nothing, which is
+the worst case for the linear scan.
+
+Usage::
+
+    python -m benchmarks.topic_lookup --datasets 4 100 1000 5000 --lookups 20000
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from agents_intensive_capstone.tools.positive_data import (
+    PositiveDataCatalog,
+    PositiveDataset,
+    get_catalog,
+)
+
+
+def legacy_get_positive_data(topic: str) -> Optional[str]:
+    """The branch chain ``get_positive_data`` used before the catalog (reports elided)."""
+    topic_lower = topic.lower()
+    if "pilot" in topic_lower or "six hat solver" in topic_lower or "decision" in topic_lower:
+        return "pilot"
+    elif (
+        "energy" in topic_lower
+        or "renewable" in topic_lower
+        or "growth" in topic_lower
+        or "cagr" in topic_lower
+    ):
+        return "energy"
+    elif (
+        "supply chain" in topic_lower
+        or "bottlenecks" in topic_lower
+        or "solutions" in topic_lower
+        or "logistics" in topic_lower
+    ):
+        return "supply chain"
+    elif (
+        "team" in topic_lower
+        or "morale" in topic_lower
+        or "productivity" in topic_lower
+        or "collaboration" in topic_lower
+    ):
+        return "team"
+    return None
+
+
+def linear_scan(datasets: Sequence[PositiveDataset]) -> Callable[[str], Optional[str]]:
+    """The branch chain generalized to ``datasets``: first dataset with a keyword in the topic."""
+
+    def lookup(topic: str) -> Optional[str]:
+        topic_lower = topic.lower()
+        for dataset in datasets:
+            if any(keyword in topic_lower for keyword in dataset.keywords):
+                return dataset.report
+        return None
+
+    return lookup
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+
+def synthetic_catalog(size: int, rng: random.Random) -> PositiveDataCatalog:
+    datasets = [
+        PositiveDataset(
+            f"dataset-{i}",
+            tuple(" ".join(_word(rng) for _ in range(rng.randint(1, 2))) for _ in range(4)),
+            f"report {i}",
+        )
+        for i in range(size)
+    ]
+    return PositiveDataCatalog(datasets, fallback="none")
+
+
+def sample_topics(catalog: PositiveDataCatalog, count: int, rng: random.Random) -> List[str]:
+    topics = []
+    for i in range(count):
+        words = [_word(rng) for _ in range(rng.randint(2, 6))]
+        if i % 2 == 0:
+            dataset = rng.choice(catalog.datasets)
+            words.insert(rng.randint(0, len(words)), rng.choice(dataset.keywords))
+        topics.append(" ".join(words))
+    return topics
+
+
+def time_per_lookup(lookup: Callable[[str], Any], topics: Sequence[str]) -> float:
+    started = time.perf_counter()
+    for topic in topics:
+        lookup(topic)
+    return (time.perf_counter() - started) / len(topics)
+
+
+def batch_time_per_lookup(catalog: PositiveDataCatalog, topics: Sequence[str]) -> float:
+    started = time.perf_counter()
+    catalog.lookup_many(topics)
+    return (time.perf_counter() - started) / len(topics)
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    results: Dict[str, Any] = {}
+
+    bundled = get_catalog()
+    topics = sample_topics(bundled, args.lookups, rng)
+    for topic in topics:
+        expected = legacy_get_positive_data(topic)
+        found = bundled.match(topic)
+        if (expected is None) != (found is None):
+            raise RuntimeError(f"Catalog and branch chain disagree on {topic!r}")
+    results["bundled"] = {
+        "datasets": len(bundled.datasets),
+        "branch_chain_us": time_per_lookup(legacy_get_positive_data, topics) * 1e6,
+        "index_us": time_per_lookup(bundled.lookup, topics) * 1e6,
+        "index_batch_us": batch_time_per_lookup(bundled, topics) * 1e6,
+    }
+
+    for size in args.datasets:
+        catalog = synthetic_catalog(size, rng)
+        topics = sample_topics(catalog, args.lookups, rng)
+        started = time.perf_counter()
+        PositiveDataCatalog(catalog.datasets, catalog.fallback)
+        results[str(size)] = {
+            "datasets": size,
+            "build_ms": (time.perf_counter() - started) * 1e3,
+            "linear_scan_us": time_per_lookup(linear_scan(catalog.datasets), topics) * 1e6,
+            "index_us": time_per_lookup(catalog.lookup, topics) * 1e6,
+            "index_batch_us": batch_time_per_lookup(catalog, topics) * 1e6,
+        }
+
+    print(f"Topic lookup, {args.lookups} lookups per catalog (microseconds per lookup)")
+    print(f"{'catalog':<10} {'datasets':>8} {'chain/scan':>11} {'index':>8} {'batch':>8}")
+    for name, row in results.items():
+        baseline = row.get("branch_chain_us", row.get("linear_scan_us"))
+        print(
+            f"{name:<10} {row['datasets']:>8} {baseline:>11.2f} {row['index_us']:>8.2f} "
+            f"{row['index_batch_us']:>8.2f}"
+        )
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--datasets", type=int, nargs="+", default=[4, 100, 1000, 5000])
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = main(arguments)
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
@@ -0,0 +1,152 @@
+"""
+Latency and token benchmark of the Yellow Hat's two search modes.
+
+Runs the Yellow Hat alone on the offline stub model, scripted to make one
+search per question, with either the nested ``google_optimist`` agent
+(``AgentConfig(yellow_search_mode="nested")``) or the direct, positively
+filtered search over a generated local corpus (``"direct"``). Reports wall
+time percentiles, model calls and model tokens per question. No network
+access or API key is required.
+
+Usage::
+
+    python -m benchmarks.yellow_search --questions 20 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agents_intensive_capstone.agents.yellow_hat_factory import YellowHatFactory
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+from agents_intensive_capstone.tools.local_search import LocalCorpusIndex
+from agents_intensive_capstone.tools.positive_framing import create_optimist_search_tool
+
+from .common import format_ms, summarize
+
+MODES = ("nested", "direct")
+TOPICS = ["office", "pilot", "hiring", "pricing", "migration", "support", "training", "launch"]
+OUTCOMES = [
+    "succeeded and saved money",
+    "improved customer retention",
+    "failed after repeated delays",
+    "was an opportunity for growth",
+    "ran into budget problems",
+    "was completed on schedule",
+]
+
+
+class SearchingStub(StubLlm):
+    """StubLlm that answers a question's first turn with a call to the search tool."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses = [r async for r in super().generate_content_async(llm_request, stream=False)]
+        response = responses[-1]
+        last = llm_request.contents[-1] if llm_request.contents else None
+        searched = last is not None and any(p.function_response for p in last.parts or [])
+        tool = next((name for name in llm_request.tools_dict if "optimist" in name), None)
+        if searched or tool is None:
+            yield response
+            return
+        question = "".join(part.text or "" for part in last.parts or [])
+        args = {"query": question} if tool == "optimist_search" else {"request": question}
+        call = types.FunctionCall(name=tool, args=args)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(function_call=call)]),
+            usage_metadata=response.usage_metadata,
+        )
+
+
+def write_corpus(path: str, passages: int, rng: random.Random) -> None:
+    paragraphs = [
+        f"The {rng.choice(TOPICS)} project in region {i} {rng.choice(OUTCOMES)}."
+        for i in range(passages)
+    ]
+    with open(os.path.join(path, "projects.txt"), "w", encoding="utf-8") as fh:
+        fh.write("\n\n".join(paragraphs))
+
+
+async def run_mode(mode: str, index: LocalCorpusIndex, args: argparse.Namespace) -> Dict[str, Any]:
+    latency = LatencyDistribution.constant(args.latency_ms / 1000)
+    hat_model = SearchingStub(latency=latency)
+    search_model = StubLlm(latency=latency)
+    search_tool = create_optimist_search_tool(index.search) if mode == "direct" else None
+    agent = YellowHatFactory.create(
+        model=hat_model, search_model=search_model, search_tool=search_tool
+    )
+    runner = InMemoryRunner(agent=agent, app_name="benchmark")
+
+    walls = []
+    for number in range(args.questions):
+        topic = TOPICS[number % len(TOPICS)]
+        session = await runner.session_service.create_session(app_name="benchmark", user_id="u")
+        message = types.Content(
+            role="user", parts=[types.Part(text=f"What went well with the {topic} project?")]
+        )
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+        walls.append(time.perf_counter() - start)
+
+    calls = hat_model.calls + search_model.calls
+    return {
+        "mode": mode,
+        "questions": args.questions,
+        "wall_seconds": summarize(walls),
+        "model_calls_per_question": len(calls) / args.questions,
+        "tokens_per_question": sum(c.input_tokens + c.output_tokens for c in calls)
+        / args.questions,
+    }
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    corpus = tempfile.mkdtemp(prefix="yellow-search-bench-")
+    try:
+        write_corpus(corpus, args.passages, random.Random(args.seed))
+        index = LocalCorpusIndex.open(corpus)
+        results = [await run_mode(mode, index, args) for mode in MODES]
+        index.close()
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+    print(f"{'mode':<7} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | calls/q | tokens/q")
+    for result in results:
+        wall = result["wall_seconds"]
+        print(
+            f"{result['mode']:<7} | {format_ms(wall['p50'])} | {format_ms(wall['p95'])} | "
+            f"{result['model_calls_per_question']:>7.1f} | {result['tokens_per_question']:>8.0f}"
+        )
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=20, help="questions per mode")
+    parser.add_argument("--passages", type=int, default=2000, help="passages in the corpus")
+    parser.add_argument(
+        "--latency-ms", type=float, default=300.0, help="simulated latency of every model call"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    output = asyncio.run(main(arguments))
+    if arguments.json_path:
+        with open(arguments.json_path, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2)
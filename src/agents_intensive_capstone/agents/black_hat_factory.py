@@ -1,6 +1,7 @@
 from typing import Any, List
 
 from . import factory
+from .hat_schemas import BlackHatOutput
 
 # ---------------------------------------------------------------------------
 # Configuration Constants
@@ -9,6 +10,7 @@ from . import factory
 AGENT_NAME = "BlackHatAgent"
 PROMPT_FILENAME = "black_hat_prompt.txt"
 OUTPUT_KEY = "black_hat_plan"
+OUTPUT_SCHEMA = BlackHatOutput  # with structured outputs on
 
 class BlackHatFactory:
     """
@@ -10,6 +10,21 @@ AGENT_NAME = "BlueHatAgent"
 PROMPT_FILENAME = "blue_hat_prompt.txt"
 OUTPUT_KEY = "blue_hat_final_plan"
 
+# Incremental Topology Config
+INCREMENTAL_AGENT_NAME = "BlueHatIncrementalAgent"
+INCREMENTAL_PROMPT_FILENAME = "blue_hat_incremental_prompt.txt"
+DRAFT_OUTPUT_KEY = "blue_hat_draft"
+
+RECONCILE_AGENT_NAME = "BlueHatAgent"
+RECONCILE_PROMPT_FILENAME = "blue_hat_reconcile_prompt.txt"
+
+# Compacted Context Config
+COMPACT_PROMPT_FILENAME = "blue_hat_compact_prompt.txt"
+
+# Decomposition Config
+MERGE_AGENT_NAME = "BlueHatMergeAgent"
+MERGE_PROMPT_FILENAME = "blue_hat_merge_prompt.txt"
+
 class BlueHatFactory:
     """
     Factory for creating the Blue Hat Agent (Manager/Coordinator).
@@ -29,6 +44,77 @@ class BlueHatFactory:
             **kwargs
         )
 
+    @classmethod
+    def create_incremental(cls, model: Any, **kwargs: Any) -> Any:
+        """
+        Blue Hat step that folds one finished hat at a time into the
+        ``blue_hat_draft`` working synthesis (incremental topology).
+
+        It reads everything it needs from session state, so prior
+        conversation contents are not sent to the model.
+        """
+        kwargs.setdefault("include_contents", "none")
+
+        return factory.build_agent(
+            name=INCREMENTAL_AGENT_NAME,
+            model=model,
+            tools=cls._build_tools(model),
+            prompt_filename=INCREMENTAL_PROMPT_FILENAME,
+            output_key=DRAFT_OUTPUT_KEY,
+            **kwargs
+        )
+
+    @classmethod
+    def create_reconciler(cls, model: Any, **kwargs: Any) -> Any:
+        """
+        Final, cheap Blue Hat pass of the incremental topology: turns the
+        working draft into ``blue_hat_final_plan``.
+        """
+        kwargs.setdefault("include_contents", "none")
+
+        return factory.build_agent(
+            name=RECONCILE_AGENT_NAME,
+            model=model,
+            tools=cls._build_tools(model),
+            prompt_filename=RECONCILE_PROMPT_FILENAME,
+            output_key=OUTPUT_KEY,
+            **kwargs
+        )
+
+    @classmethod
+    def create_compact(cls, model: Any, **kwargs: Any) -> Any:
+        """
+        Blue Hat that synthesizes from the token-budgeted ``blue_hat_brief``
+        written by ``ContextCompactionAgent`` instead of the full history.
+        """
+        kwargs.setdefault("include_contents", "none")
+
+        return factory.build_agent(
+            name=AGENT_NAME,
+            model=model,
+            tools=cls._build_tools(model),
+            prompt_filename=COMPACT_PROMPT_FILENAME,
+            output_key=OUTPUT_KEY,
+            **kwargs
+        )
+
+    @classmethod
+    def create_merger(cls, model: Any, **kwargs: Any) -> Any:
+        """
+        Blue Hat that merges the per-sub-problem plans of a decomposed
+        problem (``decomposition_brief``) into ``blue_hat_final_plan``.
+        """
+        kwargs.setdefault("include_contents", "none")
+
+        return factory.build_agent(
+            name=MERGE_AGENT_NAME,
+            model=model,
+            tools=cls._build_tools(model),
+            prompt_filename=MERGE_PROMPT_FILENAME,
+            output_key=OUTPUT_KEY,
+            **kwargs
+        )
+
     @staticmethod
     def _build_tools(model: Any) -> List[Any]:
         """
@@ -0,0 +1,291 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from agents_intensive_capstone.models.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+from .hat_schemas import load_output, render_condensed
+from .incremental_synthesis import QUESTION_KEY
+from .orchestration import content_text, join_names, state_event
+from .question_router import SKIPPED_HATS_KEY, SKIPPED_TEXT_KEY
+from .quorum_parallel_agent import MISSING_PERSPECTIVES_KEY
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# State keys written for the compact Blue Hat prompt and for reporting
+BRIEF_KEY = "blue_hat_brief"
+COMPACTION_STATS_KEY = "compaction_stats"
+# Readable ("Black Hat, Green Hat") form of the missing_perspectives list
+MISSING_TEXT_KEY = "blue_hat_missing_perspectives"
+
+# Points sharing at least this fraction of their words count as duplicates
+DUPLICATE_SIMILARITY = 0.8
+# Shorter points (e.g. "Costs rise") are only dropped when identical
+MIN_WORDS_FOR_SIMILARITY = 4
+
+_BULLET = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+_HEADING = re.compile(r"^\s*(?:#{1,6}\s+\S|\*\*[^*]+\*\*:?\s*$)")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+_KIND_PRIORITY = {"heading": 3, "bullet": 2, "sentence": 1}
+
+
+@dataclass(frozen=True)
+class Point:
+    text: str
+    kind: str  # "heading", "bullet" or "sentence"
+    position: int
+
+    @property
+    def words(self) -> Set[str]:
+        return set(_WORD.findall(self.text.lower()))
+
+    def render(self) -> str:
+        return f"- {self.text}" if self.kind == "sentence" else self.text
+
+
+@dataclass
+class CompactionResult:
+    brief: str
+    original_tokens: int
+    compacted_tokens: int
+    budget: Optional[int]
+    # "none", "dedup", "key_points" or "truncate": the last step that was needed
+    strategy: str
+    duplicates_dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.compacted_tokens)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "original_tokens": self.original_tokens,
+            "compacted_tokens": self.compacted_tokens,
+            "tokens_saved": self.tokens_saved,
+            "budget": self.budget,
+            "strategy": self.strategy,
+            "duplicates_dropped": self.duplicates_dropped,
+        }
+
+
+def split_points(text: str) -> List[Point]:
+    """Split a hat's output into headings, bullets and prose sentences."""
+    points: List[Point] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if _HEADING.match(line):
+            points.append(Point(line, "heading", len(points)))
+        elif _BULLET.match(line):
+            points.append(Point(line, "bullet", len(points)))
+        else:
+            for sentence in _SENTENCE_END.split(line):
+                if sentence.strip():
+                    points.append(Point(sentence.strip(), "sentence", len(points)))
+    return points
+
+
+def _is_duplicate(point: Point, kept: List[Set[str]]) -> bool:
+    words = point.words
+    if not words:
+        return False
+    for other in kept:
+        if words == other:
+            return True
+        if min(len(words), len(other)) < MIN_WORDS_FOR_SIMILARITY:
+            continue
+        if len(words & other) / len(words | other) >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def deduplicate(sections: Dict[str, List[Point]]) -> int:
+    """Drop points that repeat an earlier point (across all hats), in place.
+
+    Earlier sections win, so the order of ``sections`` sets precedence.
+    Headings are kept, since they only structure their own section.
+    Returns the number of points dropped.
+    """
+    kept: List[Set[str]] = []
+    dropped = 0
+    for title, points in sections.items():
+        unique = []
+        for point in points:
+            if point.kind != "heading" and _is_duplicate(point, kept):
+                dropped += 1
+                continue
+            unique.append(point)
+            if point.kind != "heading":
+                kept.append(point.words)
+        sections[title] = unique
+    return dropped
+
+
+def _section_header(title: str) -> str:
+    return f"## {title}"
+
+
+def render(sections: Dict[str, List[Point]]) -> str:
+    blocks = []
+    for title, points in sections.items():
+        body = "\n".join(point.render() for point in points)
+        blocks.append(f"{_section_header(title)}\n{body}".rstrip())
+    return "\n\n".join(blocks)
+
+
+def _allocate(needs: Dict[str, int], budget: int) -> Dict[str, int]:
+    """Split ``budget`` fairly; sections needing less than a share donate the rest."""
+    shares = {}
+    remaining = budget
+    for index, (title, need) in enumerate(sorted(needs.items(), key=lambda item: item[1])):
+        share = remaining // (len(needs) - index)
+        shares[title] = min(need, share)
+        remaining -= shares[title]
+    return shares
+
+
+def _key_points(points: List[Point], budget: int) -> List[Point]:
+    """Highest-priority points that fit ``budget`` tokens, in their original order."""
+    ranked = sorted(
+        points,
+        key=lambda p: (
+            -_KIND_PRIORITY[p.kind],
+            not any(ch.isdigit() for ch in p.text),  # figures are usually worth keeping
+            p.position,
+        ),
+    )
+    chosen, used = [], 0
+    for point in ranked:
+        cost = estimate_tokens(point.render()) + 1
+        if used + cost <= budget:
+            chosen.append(point)
+            used += cost
+    if not chosen and ranked and budget > 0:
+        # Nothing fits whole: keep the most important point, truncated
+        best = ranked[0]
+        chosen = [Point(_truncate(best.text, budget - 1), best.kind, best.position)]
+    return sorted(chosen, key=lambda p: p.position)
+
+
+def _truncate(text: str, budget: int) -> str:
+    limit = max(0, budget * CHARS_PER_TOKEN - 1)
+    return text if len(text) <= limit + 1 else text[:limit].rstrip() + "…"
+
+
+def compact_outputs(outputs: Dict[str, str], budget: Optional[int]) -> CompactionResult:
+    """Fit hat outputs (``{section title: text}``) into ``budget`` tokens.
+
+    Steps, applied only while the brief is still over budget: deduplicate
+    overlapping points across hats, keep each hat's key points within a fair
+    share of the budget, and finally truncate. Without a budget the outputs
+    are only joined into one brief.
+    """
+    full = "\n\n".join(
+        f"{_section_header(title)}\n{text.strip()}" for title, text in outputs.items()
+    )
+    original = estimate_tokens(full)
+    if budget is None or original <= budget:
+        return CompactionResult(full, original, original, budget, "none")
+
+    sections = {title: split_points(text) for title, text in outputs.items()}
+    dropped = deduplicate(sections)
+    brief = render(sections)
+    strategy = "dedup"
+
+    if estimate_tokens(brief) > budget:
+        strategy = "key_points"
+        overhead = {
+            title: estimate_tokens(_section_header(title)) + 2 for title in sections
+        }
+        needs = {
+            title: sum(estimate_tokens(point.render()) + 1 for point in points)
+            for title, points in sections.items()
+        }
+        shares = _allocate(needs, max(0, budget - sum(overhead.values())))
+        sections = {
+            title: _key_points(points, shares[title]) for title, points in sections.items()
+        }
+        brief = render(sections)
+
+    if estimate_tokens(brief) > budget:
+        strategy = "truncate"
+        brief = _truncate(brief, budget)
+
+    return CompactionResult(brief, original, estimate_tokens(brief), budget, strategy, dropped)
+
+
+def clear_outputs_callback(keys: Sequence[str]) -> Callable[[CallbackContext], None]:
+    """``before_agent_callback`` clearing hat outputs left by earlier turns.
+
+    Without it, a hat that fails or times out on this turn would still be
+    compacted from its previous turn's output.
+    """
+
+    def clear(callback_context: CallbackContext) -> None:
+        for key in keys:
+            if callback_context.state.get(key) is not None:
+                callback_context.state[key] = None
+
+    return clear
+
+
+class ContextCompactionAgent(BaseAgent):
+    """
+    Stage between ``SixHatsBrainstorm`` and the Blue Hat that bounds the
+    Blue Hat's input.
+
+    Reads each hat's ``output_key`` (``sources`` maps keys to section
+    titles), compacts them into ``token_budget`` tokens and stores the
+    result under ``blue_hat_brief`` for the compact Blue Hat prompt, plus
+    ``compaction_stats`` with the tokens saved. Structured (JSON) hat outputs
+    are rendered condensed first; a ``token_budget`` of None keeps them whole.
+    Outputs of earlier turns must be cleared before the brainstorm (see
+    :func:`clear_outputs_callback`).
+    """
+
+    sources: Dict[str, str] = {}
+    token_budget: Optional[int] = 2000
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        outputs = {}
+        for key, title in self.sources.items():
+            text = ctx.session.state.get(key)
+            structured = load_output(text)
+            if structured is not None:
+                text = render_condensed(structured)
+            if text and str(text).strip():
+                outputs[title] = str(text)
+
+        result = compact_outputs(outputs, self.token_budget)
+        logger.info(
+            "Blue Hat context compacted from %d to %d tokens (saved %d, strategy=%s)",
+            result.original_tokens,
+            result.compacted_tokens,
+            result.tokens_saved,
+            result.strategy,
+        )
+        yield state_event(
+            self,
+            ctx,
+            {
+                QUESTION_KEY: content_text(ctx.user_content),
+                BRIEF_KEY: result.brief,
+                COMPACTION_STATS_KEY: result.stats,
+                MISSING_TEXT_KEY: join_names(ctx.session.state.get(MISSING_PERSPECTIVES_KEY)),
+                SKIPPED_TEXT_KEY: join_names(ctx.session.state.get(SKIPPED_HATS_KEY)),
+            },
+        )
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agents_intensive_capstone.cache.response_cache import content_hash, model_id, normalize_text
+from agents_intensive_capstone.models.scheduler import PRIORITY_KEY
+from agents_intensive_capstone.prompts import get_registry
+
+from .blue_hat_factory import MERGE_PROMPT_FILENAME, OUTPUT_KEY
+from .orchestration import content_text, state_event, text_event
+from .question_router import QuestionRouterAgent
+from .quorum_parallel_agent import REQUEST_BUDGET_KEY
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# State keys read by the merge Blue Hat prompt, and the per-sub-problem results
+QUESTION_KEY = "decomposition_question"
+BRIEF_KEY = "decomposition_brief"
+SUBPROBLEMS_KEY = "decomposition_subproblems"
+
+DECOMPOSER_PROMPT_FILENAME = "decomposer_prompt.txt"
+
+# Sub-problems run in their own throwaway sessions of this app
+SUBPROBLEM_APP_NAME = "six_hats_subproblem"
+SUBPROBLEM_USER_ID = "six_hats_decomposition"
+
+# Per-request settings the sub-problem sessions inherit from the request's session
+INHERITED_STATE_KEYS = (PRIORITY_KEY, REQUEST_BUDGET_KEY)
+
+# Fragments shorter than this are not worth a pipeline run of their own
+MIN_PART_CHARS = 12
+
+_LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*•]|\(?[a-z]\))\s+(\S.*)$", re.IGNORECASE | re.M)
+_QUESTION = re.compile(r"[^.?!\n]*\?")
+_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+
+
+@dataclass(frozen=True)
+class Decomposition:
+    parts: Tuple[str, ...]
+    # "heuristic", "model" or "single" (the problem is solved as a whole)
+    source: str
+
+    @property
+    def is_split(self) -> bool:
+        return len(self.parts) > 1
+
+
+def _clean_parts(parts: List[str], max_parts: int) -> List[str]:
+    """Drops fragments and duplicates; parts beyond ``max_parts`` join the last one."""
+    cleaned: List[str] = []
+    seen = set()
+    for part in parts:
+        part = " ".join(part.split())
+        if len(part) < MIN_PART_CHARS or normalize_text(part) in seen:
+            continue
+        seen.add(normalize_text(part))
+        cleaned.append(part)
+    if len(cleaned) > max_parts:
+        cleaned[max_parts - 1 :] = [" ".join(cleaned[max_parts - 1 :])]
+    return cleaned
+
+
+def split_question(question: str, max_parts: int = 8) -> List[str]:
+    """Heuristic sub-questions: the items of a list, else the separate questions asked.
+
+    Returns a single part when the problem does not split.
+    """
+    items = _LIST_ITEM.findall(question)
+    if len(items) < 2:
+        items = [match.strip() for match in _QUESTION.findall(question)]
+    parts = _clean_parts(items, max_parts)
+    return parts if len(parts) > 1 else [question]
+
+
+class ProblemDecomposer:
+    """
+    Splits a problem into independent sub-questions.
+
+    Numbered or bulleted lists and several question marks are split locally;
+    otherwise a (small, cheap) ``model``, if given, is asked. Anything that
+    does not split is solved as a whole.
+    """
+
+    def __init__(self, model: Optional[Any] = None, max_parts: int = 8):
+        if max_parts < 2:
+            raise ValueError("max_parts must be >= 2")
+        self.model = model
+        self.max_parts = max_parts
+
+    async def decompose(self, question: str) -> Decomposition:
+        parts = split_question(question, self.max_parts)
+        if len(parts) > 1:
+            return Decomposition(tuple(parts), "heuristic")
+
+        if self.model is not None:
+            try:
+                parts = _clean_parts(await self._ask_model(question), self.max_parts)
+                if len(parts) > 1:
+                    return Decomposition(tuple(parts), "model")
+            except Exception:
+                logger.warning("Decomposer model failed; solving the problem whole", exc_info=True)
+
+        return Decomposition((question,), "single")
+
+    async def _ask_model(self, question: str) -> List[str]:
+        prompt = (
+            get_registry()
+            .text(DECOMPOSER_PROMPT_FILENAME)
+            .replace("{max_parts}", str(self.max_parts))
+            .replace("{question}", question)
+        )
+        answer = await generate_text(self.model, prompt)
+        return [_MARKER.sub("", line) for line in answer.splitlines() if line.strip()]
+
+
+async def generate_text(model: Any, prompt: str) -> str:
+    """One non-streamed call of ``model`` on ``prompt``; returns the reply text."""
+    request = LlmRequest(
+        model=model.model,
+        contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+    )
+    answer = ""
+    async for response in model.generate_content_async(request, stream=False):
+        answer += content_text(response.content)
+    return answer
+
+
+def _walk(agent: BaseAgent) -> Iterator[BaseAgent]:
+    yield agent
+    children = list(agent.sub_agents)
+    if isinstance(agent, QuestionRouterAgent):
+        # The stage running every hat, which a routed question may pick
+        children.append(agent.stage_for(agent.router.available_hats))
+    for child in children:
+        yield from _walk(child)
+
+
+def _callback_names(callback: Any) -> List[str]:
+    callbacks = callback if isinstance(callback, list) else [callback] if callback else []
+    return [getattr(item, "__qualname__", type(item).__name__) for item in callbacks]
+
+
+def solver_fingerprint(solver: BaseAgent) -> str:
+    """Hash of what shapes the solver's plans besides the question.
+
+    Covers the agent tree, each model agent's model, instruction, output key
+    and callbacks (structured outputs add one), the router's model and the
+    hashes of the current prompts, so a changed prompt, model or pipeline
+    never reuses plans cached for the previous one.
+    """
+    agents = []
+    for agent in _walk(solver):
+        entry: List[Any] = [type(agent).__name__, agent.name]
+        if isinstance(agent, LlmAgent):
+            entry += [
+                model_id(agent.canonical_model),
+                agent.instruction if isinstance(agent.instruction, str) else "",
+                agent.output_key,
+                _callback_names(agent.before_model_callback),
+                _callback_names(agent.after_agent_callback),
+            ]
+        if isinstance(agent, QuestionRouterAgent) and agent.router.model is not None:
+            entry.append(model_id(agent.router.model))
+        agents.append(entry)
+    prompts = sorted((name, prompt.sha256) for name, prompt in get_registry().prompts.items())
+    return content_hash(json.dumps([agents, prompts]))
+
+
+def subproblem_cache_key(question: str, fingerprint: str = "") -> str:
+    """Cache key of one sub-question's plan from the solver with ``fingerprint``."""
+    return "subproblem:" + content_hash(json.dumps([fingerprint, normalize_text(question)]))
+
+
+def render_plans(plans: List[Tuple[int, int, str, str]]) -> str:
+    return "\n\n".join(f"## {heading}\n{plan or '(no plan)'}" for _, _, heading, plan in plans)
+
+
+class DecompositionAgent(BaseAgent):
+    """
+    Map-reduce front-end for large, multi-part problems.
+
+    ``sub_agents`` are the solver (the brainstorm plus Blue Hat pipeline) and
+    the merge Blue Hat. ``decomposer`` splits the problem into independent
+    sub-questions. Each sub-question goes through the solver in its own
+    session, at most ``max_workers`` at a time, and its plan is cached
+    separately in ``cache`` (any backend with ``get``/``set``), keyed by the
+    sub-question and the solver's fingerprint (its prompts, models and
+    agents; see ``solver_fingerprint``). The plans are
+    then merged hierarchically, ``fan_in`` at a time with direct model calls,
+    until the merger can write the final ``blue_hat_final_plan`` from one
+    brief. A problem that does not split goes through the solver unchanged.
+    """
+
+    decomposer: ProblemDecomposer
+    max_workers: int = 4
+    fan_in: int = 4
+    cache: Optional[Any] = None
+
+    @property
+    def solver(self) -> BaseAgent:
+        return self.sub_agents[0]
+
+    @property
+    def merger(self) -> BaseAgent:
+        return self.sub_agents[1]
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        question = content_text(ctx.user_content)
+        decomposition = await self.decomposer.decompose(question)
+        if not decomposition.is_split:
+            async for event in self.solver.run_async(ctx):
+                yield event
+            return
+
+        parts = decomposition.parts
+        logger.info(
+            "Decomposed problem into %d sub-problems (%s); %d workers",
+            len(parts),
+            decomposition.source,
+            self.max_workers,
+        )
+        workers = asyncio.Semaphore(self.max_workers)
+        runner = Runner(
+            app_name=SUBPROBLEM_APP_NAME,
+            agent=self.solver,
+            session_service=InMemorySessionService(),
+            plugins=list(ctx.plugin_manager.plugins),
+        )
+
+        fingerprint = solver_fingerprint(self.solver)
+        inherited = {
+            key: ctx.session.state[key] for key in INHERITED_STATE_KEYS if key in ctx.session.state
+        }
+
+        async def solve(index: int) -> Tuple[int, str, bool]:
+            plan, cached = await self._solve(
+                runner, parts[index], fingerprint, inherited, workers
+            )
+            return index, plan, cached
+
+        plans: List[str] = [""] * len(parts)
+        results: List[Dict[str, Any]] = [{} for _ in parts]
+        tasks = [asyncio.create_task(solve(index)) for index in range(len(parts))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, plan, cached = await next_done
+                plans[index] = plan
+                results[index] = {"question": parts[index], "plan": plan, "cached": cached}
+                yield text_event(
+                    self,
+                    ctx,
+                    f"## Sub-problem {index + 1} of {len(parts)}: {parts[index]}\n\n{plan}",
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        brief = await self._reduce(question, parts, plans, workers)
+        yield state_event(
+            self, ctx, {QUESTION_KEY: question, BRIEF_KEY: brief, SUBPROBLEMS_KEY: results}
+        )
+        async for event in self.merger.run_async(ctx):
+            yield event
+
+    async def _solve(
+        self,
+        runner: Runner,
+        question: str,
+        fingerprint: str,
+        state: Dict[str, Any],
+        workers: asyncio.Semaphore,
+    ) -> Tuple[str, bool]:
+        """The solver's plan for one sub-question and whether it came from the cache."""
+        key = subproblem_cache_key(question, fingerprint)
+        if self.cache is not None:
+            plan = self.cache.get(key)
+            if plan is not None:
+                logger.info("Sub-problem cache hit: %s", question)
+                return plan, True
+
+        async with workers:
+            sessions = runner.session_service
+            session = await sessions.create_session(
+                app_name=SUBPROBLEM_APP_NAME, user_id=SUBPROBLEM_USER_ID, state=dict(state)
+            )
+            message = types.Content(role="user", parts=[types.Part(text=question)])
+            try:
+                async for _ in runner.run_async(
+                    user_id=SUBPROBLEM_USER_ID, session_id=session.id, new_message=message
+                ):
+                    pass
+                finished = await sessions.get_session(
+                    app_name=SUBPROBLEM_APP_NAME,
+                    user_id=SUBPROBLEM_USER_ID,
+                    session_id=session.id,
+                )
+            finally:
+                await sessions.delete_session(
+                    app_name=SUBPROBLEM_APP_NAME,
+                    user_id=SUBPROBLEM_USER_ID,
+                    session_id=session.id,
+                )
+
+        plan = str(finished.state.get(OUTPUT_KEY) or "") if finished else ""
+        if plan and self.cache is not None:
+            self.cache.set(key, plan)
+        return plan, False
+
+    async def _reduce(
+        self,
+        question: str,
+        parts: Tuple[str, ...],
+        plans: List[str],
+        workers: asyncio.Semaphore,
+    ) -> str:
+        """Merges ``plans`` ``fan_in`` at a time until one brief fits the merger."""
+        # (first, last) sub-problem numbers covered, heading, plan
+        level = [
+            (number, number, f"Sub-problem {number}: {part}", plan)
+            for number, (part, plan) in enumerate(zip(parts, plans, strict=True), start=1)
+        ]
+        while len(level) > self.fan_in:
+            groups = [level[i : i + self.fan_in] for i in range(0, len(level), self.fan_in)]
+            merged = await asyncio.gather(
+                *(self._merge(question, group, workers) for group in groups)
+            )
+            level = [
+                (group[0][0], group[-1][1], f"Sub-problems {group[0][0]}-{group[-1][1]}", plan)
+                if len(group) > 1
+                else group[0]
+                for group, plan in zip(groups, merged, strict=True)
+            ]
+        return render_plans(level)
+
+    async def _merge(
+        self, question: str, group: List[Tuple[int, int, str, str]], workers: asyncio.Semaphore
+    ) -> str:
+        if len(group) == 1:
+            # A leftover plan moves up a level as it is
+            return group[0][3]
+        prompt = (
+            get_registry()
+            .text(MERGE_PROMPT_FILENAME)
+            .replace("{decomposition_question?}", question)
+            .replace("{decomposition_brief?}", render_plans(group))
+        )
+        merger = self.merger
+        if not isinstance(merger, LlmAgent):
+            raise TypeError(f"{self.name} merges plans with the model of an LlmAgent merger")
+        async with workers:
+            return await generate_text(merger.canonical_model, prompt)
@@ -1,26 +1,78 @@
 import logging
-from typing import Any, List
+from typing import Any, Callable, Dict, List, Optional, Type, Union
 
 from google.adk.agents import LlmAgent
 
-from agents_intensive_capstone.prompts import load_prompt_text
+from agents_intensive_capstone.cache import ResponseCache
+from agents_intensive_capstone.prompts import get_registry
+
+from .hat_schemas import HatOutput, schema_instruction, structured_output_callback
 
 logger = logging.getLogger(__name__)
 
 
+def add_callback(kwargs: Dict[str, Any], name: str, callback: Callable) -> None:
+    """Append ``callback`` to the (possibly already set) agent callback ``name``.
+
+    ADK accepts either a single callable or a list; existing callbacks run first.
+    """
+    existing = kwargs.get(name)
+    if existing is None:
+        kwargs[name] = callback
+    elif isinstance(existing, list):
+        kwargs[name] = [*existing, callback]
+    else:
+        kwargs[name] = [existing, callback]
+
+
 def build_agent(
     name: str,
     model: Any,
     tools: List[Any],
     prompt_filename: str,
     output_key: str,
+    cache: Optional[ResponseCache] = None,
+    output_schema: Optional[Type[HatOutput]] = None,
     **kwargs
 ) -> LlmAgent:
     """
     Generic constructor that ensures all Hats are built identically.
+
+    Passing a ``cache`` wires the agent's model calls through it: repeated
+    inputs are answered from the cache without calling the model.
+
+    Passing an ``output_schema`` asks the model for JSON in that schema and
+    stores it in ``output_key`` as compact, length-capped JSON. Unlike
+    ADK's own ``output_schema`` it leaves the agent's tools usable.
+
+    Prompts come from the shared prompt registry. While it watches for
+    prompt overrides, the instruction is re-read on every turn so edits apply
+    without rebuilding the agent.
     """
-    instruction = load_prompt_text(prompt_filename)
-    
+    registry = get_registry()
+    prompt = registry.get(prompt_filename)
+    suffix = "\n\n" + schema_instruction(output_schema) if output_schema is not None else ""
+    instruction: Union[str, Callable[[Any], Any]]
+    if registry.watching:
+        instruction = registry.instruction_provider(prompt_filename, suffix)
+    else:
+        instruction = prompt.text + suffix
+
+    if output_schema is not None:
+        add_callback(
+            kwargs,
+            "after_agent_callback",
+            structured_output_callback(output_key, output_schema),
+        )
+
+    if cache is not None:
+        # Cache keys also cover the rendered instruction, so hot-reloaded
+        # prompts never hit entries stored for their previous text
+        callbacks = cache.bind(name, prompt.sha256, model)
+        add_callback(kwargs, "before_model_callback", callbacks.before_model)
+        add_callback(kwargs, "after_model_callback", callbacks.after_model)
+        add_callback(kwargs, "on_model_error_callback", callbacks.on_model_error)
+
     return LlmAgent(
         name=name,
         model=model,
@@ -28,4 +80,4 @@ def build_agent(
         instruction=instruction,
         output_key=output_key,
         **kwargs
-    )
\ No newline at end of file
+    )
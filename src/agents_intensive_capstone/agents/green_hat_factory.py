@@ -3,6 +3,7 @@ from typing import Any, List, Optional
 # from google.adk.tools import AgentTool, google_search
 # Internal Project Imports
 from . import factory
+from .hat_schemas import GreenHatOutput
 
 # ---------------------------------------------------------------------------
 # Configuration Constants
@@ -11,6 +12,7 @@ from . import factory
 AGENT_NAME = "GreenHatAgent"
 PROMPT_FILENAME = "green_hat_prompt.txt"
 OUTPUT_KEY = "green_hat_plan"
+OUTPUT_SCHEMA = GreenHatOutput  # with structured outputs on
 
 class GreenHatFactory:
     
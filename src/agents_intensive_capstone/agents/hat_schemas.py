@@ -0,0 +1,190 @@
+"""Typed, length-capped output schemas for the brainstorm hats."""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Annotated, Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+
+logger = logging.getLogger(__name__)
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+@dataclass(frozen=True)
+class Cap:
+    """Length cap of a field: ``chars`` per string, at most ``items`` list entries."""
+
+    chars: int
+    items: Optional[int] = None
+
+
+def clip_text(text: str, chars: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= chars else text[: chars - 1].rstrip() + "…"
+
+
+def _clip(value: Any, cap: Cap) -> Any:
+    if isinstance(value, (list, tuple)):
+        items = [clip_text(item, cap.chars) for item in value if str(item).strip()]
+        return items[: cap.items] if cap.items is not None else items
+    if isinstance(value, str):
+        return clip_text(value, cap.chars)
+    return value
+
+
+def field_cap(model: Type[BaseModel], name: str) -> Optional[Cap]:
+    return next((m for m in model.model_fields[name].metadata if isinstance(m, Cap)), None)
+
+
+class HatOutput(BaseModel):
+    """
+    Base of the hat schemas. Fields over their :class:`Cap` are clipped rather
+    than rejected, so a verbose model still yields a valid (bounded) output.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    summary: Annotated[str, Cap(300)] = Field(
+        "", description="the hat's overall take in one or two sentences"
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def _apply_caps(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        capped = dict(data)
+        for name in cls.model_fields:
+            cap = field_cap(cls, name)
+            if cap is not None and name in capped:
+                capped[name] = _clip(capped[name], cap)
+        return capped
+
+
+class WhiteHatOutput(HatOutput):
+    findings: Annotated[List[str], Cap(200, 6)] = Field(
+        default_factory=list, description="verified facts and figures, each with its source"
+    )
+    data_gaps: Annotated[List[str], Cap(160, 3)] = Field(
+        default_factory=list, description="information that is missing and would matter"
+    )
+
+
+class RedHatOutput(HatOutput):
+    feelings: Annotated[List[str], Cap(160, 5)] = Field(
+        default_factory=list, description="emotional reactions of the people affected"
+    )
+    intuition: Annotated[str, Cap(300)] = Field("", description="the gut-feeling verdict")
+
+
+class BlackHatOutput(HatOutput):
+    risks: Annotated[List[str], Cap(200, 6)] = Field(
+        default_factory=list, description="risks and weaknesses, most serious first"
+    )
+    weak_assumptions: Annotated[List[str], Cap(160, 3)] = Field(
+        default_factory=list, description="assumptions that may not hold"
+    )
+
+
+class YellowHatOutput(HatOutput):
+    benefits: Annotated[List[str], Cap(200, 6)] = Field(
+        default_factory=list, description="benefits and the value they bring, strongest first"
+    )
+    opportunities: Annotated[List[str], Cap(160, 3)] = Field(
+        default_factory=list, description="opportunities the decision opens up"
+    )
+
+
+class GreenHatOutput(HatOutput):
+    alternatives: Annotated[List[str], Cap(200, 6)] = Field(
+        default_factory=list, description="alternative options and creative ideas"
+    )
+    experiments: Annotated[List[str], Cap(160, 3)] = Field(
+        default_factory=list, description="small experiments to test them"
+    )
+
+
+def schema_instruction(schema: Type[HatOutput]) -> str:
+    """Prompt suffix asking for ``schema`` as JSON.
+
+    Written without braces, which ADK would read as state placeholders.
+    """
+    lines = [
+        "Output format: reply with a single JSON object and nothing else, "
+        "with these fields (omit empty ones):"
+    ]
+    for name, info in schema.model_fields.items():
+        cap = field_cap(schema, name)
+        if cap is not None and cap.items is not None:
+            shape = f"list of at most {cap.items} strings of at most {cap.chars} characters"
+        else:
+            shape = f"string of at most {cap.chars if cap else 300} characters"
+        lines.append(f"- {name} ({shape}): {info.description}")
+    lines.append("Be terse: short phrases, no repetition across fields.")
+    return "\n".join(lines)
+
+
+def parse_output(schema: Type[HatOutput], text: str) -> HatOutput:
+    """Validate a hat's reply against ``schema``.
+
+    Tolerates Markdown code fences and text around the JSON object. A reply
+    that is not valid JSON is kept, clipped, as the summary.
+    """
+    body = _FENCE.sub("", text or "")
+    start, end = body.find("{"), body.rfind("}")
+    try:
+        if start < 0 or end < start:
+            raise ValueError("no JSON object in the reply")
+        return schema.model_validate(json.loads(body[start : end + 1]))
+    except (ValueError, ValidationError) as e:
+        logger.warning("%s reply is not JSON (%s); kept as the summary", schema.__name__, e)
+        return schema(summary=text or "")
+
+
+def to_json(output: HatOutput) -> str:
+    """Compact JSON of ``output``, empty fields left out."""
+    data = {k: v for k, v in output.model_dump().items() if v not in ("", [], None)}
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def load_output(value: Any) -> Optional[Dict[str, Any]]:
+    """The structured output stored in session state, or None for prose."""
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value.lstrip().startswith("{"):
+        try:
+            data = json.loads(value)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return None
+
+
+def render_condensed(data: Dict[str, Any]) -> str:
+    """Markdown rendering of a structured output for the Blue Hat's brief."""
+    lines = []
+    for name, value in data.items():
+        label = name.replace("_", " ").capitalize()
+        if isinstance(value, list):
+            if value:
+                lines.append(f"**{label}**")
+                lines.extend(f"- {item}" for item in value)
+        elif value not in ("", None):
+            lines.append(f"{label}: {value}")
+    return "\n".join(lines)
+
+
+def structured_output_callback(
+    output_key: str, schema: Type[HatOutput]
+) -> Callable[[Any], None]:
+    """``after_agent_callback`` replacing the hat's reply in ``output_key`` with compact JSON."""
+
+    def store_structured_output(callback_context: Any) -> None:
+        text = callback_context.state.get(output_key)
+        if isinstance(text, str) and text.strip():
+            callback_context.state[output_key] = to_json(parse_output(schema, text))
+
+    return store_structured_output
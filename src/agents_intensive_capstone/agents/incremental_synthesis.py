@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from .blue_hat_factory import DRAFT_OUTPUT_KEY
+from .orchestration import branch_context, content_text, forward_events, state_event
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# State keys read by the incremental/reconcile Blue Hat prompts
+QUESTION_KEY = "blue_hat_question"
+PENDING_HAT_KEY = "blue_hat_pending_hat"
+PENDING_OUTPUT_KEY = "blue_hat_pending_output"
+
+_DONE = object()
+
+
+class IncrementalSynthesisAgent(BaseAgent):
+    """
+    Brainstorm stage that removes the barrier before the Blue Hat.
+
+    Runs the thinking hats concurrently (like ``ParallelAgent``) and, as soon
+    as a hat finishes, hands its ``output_key`` to ``synthesizer`` which folds
+    it into the running ``blue_hat_draft``. Folds run one at a time in their
+    own task while the slower hats keep working, so only the last hat's fold
+    and the final reconciliation pass remain on the critical path.
+    """
+
+    synthesizer: BaseAgent
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self.synthesizer.parent_agent = self
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        yield state_event(
+            self, ctx, {QUESTION_KEY: content_text(ctx.user_content), DRAFT_OUTPUT_KEY: ""}
+        )
+
+        events: asyncio.Queue = asyncio.Queue()
+        finished: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(
+                self._run_hat(hat, branch_context(self, hat, ctx), events, finished)
+            )
+            for hat in self.sub_agents
+        ]
+        tasks.append(
+            asyncio.create_task(self._run_synthesis(ctx, len(self.sub_agents), events, finished))
+        )
+
+        running = len(tasks)
+        try:
+            while running:
+                item = await events.get()
+                if item is _DONE:
+                    running -= 1
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    event, resume = item
+                    yield event
+                    # The event is now in the session; let its producer continue.
+                    resume.set()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _run_hat(
+        hat: BaseAgent, ctx: InvocationContext, events: asyncio.Queue, finished: asyncio.Queue
+    ) -> None:
+        try:
+            await forward_events(hat.run_async(ctx), events)
+            await finished.put(hat)
+        except Exception as exc:
+            await finished.put(None)
+            await events.put(exc)
+        finally:
+            await events.put(_DONE)
+
+    async def _run_synthesis(
+        self,
+        ctx: InvocationContext,
+        expected: int,
+        events: asyncio.Queue,
+        finished: asyncio.Queue,
+    ) -> None:
+        try:
+            for _ in range(expected):
+                hat = await finished.get()
+                if hat is None:
+                    continue
+                output = ctx.session.state.get(getattr(hat, "output_key", None) or "")
+                if not output:
+                    logger.warning("%s finished without output; nothing to fold in", hat.name)
+                    continue
+
+                logger.info("Folding %s into the Blue Hat draft", hat.name)
+                await forward_events(self._fold(ctx, hat.name, output), events)
+        except Exception as exc:
+            await events.put(exc)
+        finally:
+            await events.put(_DONE)
+
+    async def _fold(
+        self, ctx: InvocationContext, hat_name: str, output: str
+    ) -> AsyncIterator[Event]:
+        yield state_event(self, ctx, {PENDING_HAT_KEY: hat_name, PENDING_OUTPUT_KEY: output})
+        async for event in self.synthesizer.run_async(ctx):
+            yield event
@@ -0,0 +1,77 @@
+"""Helpers shared by the custom workflow agents (brainstorm stages, synthesis)."""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+
+def branch_context(
+    agent: BaseAgent, sub_agent: BaseAgent, ctx: InvocationContext
+) -> InvocationContext:
+    """Isolated branch for a concurrently running sub-agent.
+
+    Mirrors ``ParallelAgent`` so sibling hats never see each other's events
+    while later stages on the parent branch still see all of them.
+    """
+    branch_ctx = ctx.model_copy()
+    suffix = f"{agent.name}.{sub_agent.name}"
+    branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+    return branch_ctx
+
+
+def state_event(agent: BaseAgent, ctx: InvocationContext, state_delta: Dict[str, Any]) -> Event:
+    """Content-less event whose only effect is to update session state."""
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=agent.name,
+        branch=ctx.branch,
+        actions=EventActions(state_delta=state_delta),
+    )
+
+
+def text_event(
+    agent: BaseAgent,
+    ctx: InvocationContext,
+    text: str,
+    state_delta: Optional[Dict[str, Any]] = None,
+) -> Event:
+    """Model-role text event (optionally carrying a state delta) from ``agent``."""
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=agent.name,
+        branch=ctx.branch,
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+async def forward_events(events: AsyncIterator[Event], queue: asyncio.Queue) -> None:
+    """Push ``events`` onto ``queue`` as ``(event, resume)`` pairs.
+
+    Each event waits for the consumer to set ``resume`` after yielding it, so
+    an agent never runs ahead of the session (same contract as ``ParallelAgent``).
+    """
+    async for event in events:
+        resume = asyncio.Event()
+        await queue.put((event, resume))
+        await resume.wait()
+
+
+def join_names(value: Any) -> str:
+    """A list from session state as prompt text, e.g. ``"Red Hat, Black Hat"``."""
+    if not value:
+        return "none"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+def content_text(content: Optional[types.Content]) -> str:
+    """Plain text of a ``types.Content`` (thought parts excluded)."""
+    if content is None or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if part.text and not part.thought)
@@ -0,0 +1,269 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from pydantic import PrivateAttr
+
+from agents_intensive_capstone.prompts import get_registry
+
+from .orchestration import content_text, join_names, state_event, text_event
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# State keys written by the router for the Blue Hat and for reporting
+ROUTING_KEY = "routing_decision"
+SKIPPED_HATS_KEY = "skipped_hats"
+# Readable ("Black Hat, Green Hat") form of SKIPPED_HATS_KEY for the Blue Hat prompts
+SKIPPED_TEXT_KEY = "blue_hat_skipped_hats"
+
+ROUTER_PROMPT_FILENAME = "question_router_prompt.txt"
+
+# Hats each kind of question needs, in brainstorm order
+QUESTION_PROFILES: Dict[str, Tuple[str, ...]] = {
+    "factual": ("white",),
+    "risk": ("white", "black", "green"),
+    "ideation": ("white", "yellow", "green"),
+    "people": ("white", "red", "black", "yellow"),
+    "decision": ("white", "red", "black", "yellow", "green"),
+}
+
+# Keyword patterns scored per question kind; "decision" is also the fallback
+_SIGNALS: Dict[str, Tuple[str, ...]] = {
+    "factual": (
+        r"^(what|when|who|where|which|how (many|much|long|old))\b",
+        r"^(define|list|name)\b",
+        r"\b(definition|meaning|statistic|population|capital|date)\b",
+    ),
+    "risk": (
+        r"\b(risks?|risky|dangers?|safe(ty)?|threats?|fail(ure)?s?|downsides?|pitfalls?)\b",
+        r"\b(could go wrong|worst case|mitigat\w*|complian\w*|securit\w*)\b",
+    ),
+    "ideation": (
+        r"\b(ideas?|brainstorm|creative|innovat\w*|alternatives?|ways to|improve)\b",
+        r"^how (can|could|might) (we|i)\b",
+    ),
+    "people": (
+        r"\b(feel\w*|morale|emotions?|team|employees?|staff|culture|customers? react\w*)\b",
+        r"\b(motivat\w*|burnout|trust|perceiv\w*|stakeholders?)\b",
+    ),
+    "decision": (
+        r"\b(should|whether|decide|decision|choose|adopt|switch|invest|worth)\b",
+        r"\b(vs\.?|versus|or not|pros and cons|trade-?offs?)\b",
+    ),
+}
+_COMPILED = {
+    kind: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for kind, patterns in _SIGNALS.items()
+}
+
+# Lower bound of model calls per hat (the Yellow Hat's nested search agent
+# adds a tool round trip), used to report the calls a routing decision saved
+HAT_MODEL_CALLS: Dict[str, int] = {"white": 1, "red": 1, "black": 1, "yellow": 3, "green": 1}
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    hats: Tuple[str, ...]
+    skipped: Tuple[str, ...]
+    kind: str
+    confidence: float
+    # "heuristic", "model" or "default" (nothing matched, all hats run)
+    source: str
+
+    @property
+    def calls_saved(self) -> int:
+        saved = sum(HAT_MODEL_CALLS.get(hat, 1) for hat in self.skipped)
+        return saved - (1 if self.source == "model" else 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hats": list(self.hats),
+            "skipped": list(self.skipped),
+            "kind": self.kind,
+            "confidence": round(self.confidence, 3),
+            "source": self.source,
+            "calls_saved": self.calls_saved,
+        }
+
+
+def classify_question(question: str) -> Tuple[str, float]:
+    """Heuristic question kind and a confidence in [0, 1].
+
+    Confidence is the winning kind's share of all keyword matches, halved
+    when only one signal matched.
+    """
+    text = " ".join(question.split())
+    scores = {
+        kind: sum(1 for pattern in patterns if pattern.search(text))
+        for kind, patterns in _COMPILED.items()
+    }
+    total = sum(scores.values())
+    if total == 0:
+        return "decision", 0.0
+
+    # A decision signal always needs every perspective, whatever else matched;
+    # ties go to the kind that consults more hats
+    if scores["decision"]:
+        kind = "decision"
+    else:
+        kind = max(scores, key=lambda k: (scores[k], len(QUESTION_PROFILES[k])))
+    confidence = scores[kind] / total
+    if scores[kind] == 1:
+        confidence /= 2
+    return kind, confidence
+
+
+def _parse_hats(text: str, available: Sequence[str]) -> Tuple[str, ...]:
+    mentioned = set(re.findall(r"[a-z]+", text.lower()))
+    return tuple(hat for hat in available if hat in mentioned)
+
+
+class HatRouter:
+    """
+    Picks the thinking hats a question needs.
+
+    A local keyword classifier decides first; when its confidence is below
+    ``min_confidence`` and a (small, cheap) ``model`` is given, the model is
+    asked instead. Anything unclear falls back to running every hat.
+    """
+
+    def __init__(
+        self,
+        available_hats: Sequence[str],
+        model: Optional[Any] = None,
+        min_confidence: float = 0.5,
+    ):
+        self.available_hats = tuple(available_hats)
+        self.model = model
+        self.min_confidence = min_confidence
+
+    def decide(
+        self, hats: Sequence[str], kind: str, confidence: float, source: str
+    ) -> RoutingDecision:
+        selected = tuple(hat for hat in self.available_hats if hat in set(hats))
+        if not selected:
+            selected, source = self.available_hats, "default"
+        skipped = tuple(hat for hat in self.available_hats if hat not in selected)
+        return RoutingDecision(selected, skipped, kind, confidence, source)
+
+    async def route(self, question: str) -> RoutingDecision:
+        kind, confidence = classify_question(question)
+        if confidence >= self.min_confidence:
+            return self.decide(QUESTION_PROFILES[kind], kind, confidence, "heuristic")
+
+        if self.model is not None:
+            try:
+                hats = await self._ask_model(question)
+                if hats:
+                    return self.decide(hats, kind, confidence, "model")
+            except Exception:
+                logger.warning("Router model failed; running every hat", exc_info=True)
+
+        return self.decide(self.available_hats, kind, confidence, "default")
+
+    async def _ask_model(self, question: str) -> Tuple[str, ...]:
+        model = self.model
+        if model is None:
+            return ()
+        prompt = (
+            get_registry()
+            .text(ROUTER_PROMPT_FILENAME)
+            .replace("{hats}", ", ".join(self.available_hats))
+            .replace("{question}", question)
+        )
+        request = LlmRequest(
+            model=model.model,
+            contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+        )
+        answer = ""
+        async for response in model.generate_content_async(request, stream=False):
+            answer += content_text(response.content)
+        return _parse_hats(answer, self.available_hats)
+
+
+class QuestionRouterAgent(BaseAgent):
+    """
+    Routing stage in front of the brainstorm.
+
+    Routes each question with ``router`` and runs a brainstorm stage built
+    by ``build_stage`` for exactly the selected hats (memoized per subset,
+    since an ADK agent can belong to only one parent). Skipped hats are
+    recorded under ``skipped_hats``, their stale outputs are cleared, and
+    the Blue Hat gets a note that they were not consulted on purpose.
+
+    The stages are not ``sub_agents``, so tree walkers read the hats' keys
+    from :attr:`declared_output_keys` instead.
+    """
+
+    router: HatRouter
+    build_stage: Callable[[Tuple[str, ...]], BaseAgent]
+    # Hat -> output_key, to clear outputs of skipped hats left by earlier turns
+    output_keys: Dict[str, str] = {}
+
+    _stages: Dict[Tuple[str, ...], BaseAgent] = PrivateAttr(default_factory=dict)
+
+    @property
+    def declared_output_keys(self) -> List[str]:
+        """Output keys of the hats any stage may run, in routing order."""
+        return list(self.output_keys.values())
+
+    @property
+    def stages(self) -> List[BaseAgent]:
+        """Brainstorm stages built so far, one per routed hat subset."""
+        return list(self._stages.values())
+
+    def stage_for(self, hats: Tuple[str, ...]) -> BaseAgent:
+        stage = self._stages.get(hats)
+        if stage is None:
+            stage = self.build_stage(hats)
+            stage.parent_agent = self
+            self._stages[hats] = stage
+        return stage
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        decision = await self.router.route(content_text(ctx.user_content))
+        logger.info(
+            "Routed %s question to %s (%s, confidence %.2f); skipped %s, ~%d model calls saved",
+            decision.kind,
+            ", ".join(decision.hats),
+            decision.source,
+            decision.confidence,
+            ", ".join(decision.skipped) or "none",
+            decision.calls_saved,
+        )
+
+        skipped = [f"{hat.title()} Hat" for hat in decision.skipped]
+        delta: Dict[str, Any] = {
+            ROUTING_KEY: decision.as_dict(),
+            SKIPPED_HATS_KEY: skipped,
+            SKIPPED_TEXT_KEY: join_names(skipped),
+        }
+        for hat in decision.skipped:
+            if hat in self.output_keys:
+                delta[self.output_keys[hat]] = None
+        if decision.skipped:
+            yield text_event(
+                self,
+                ctx,
+                "Note for the Blue Hat: this question was routed to the "
+                f"{', '.join(hat.title() for hat in decision.hats)} hat(s) only. The "
+                f"{', '.join(hat.title() for hat in decision.skipped)} hat(s) were not "
+                "consulted because the question does not need them; do not invent "
+                "their perspective.",
+                state_delta=delta,
+            )
+        else:
+            yield state_event(self, ctx, delta)
+
+        async for event in self.stage_for(decision.hats).run_async(ctx):
+            yield event
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from agents_intensive_capstone.models.budget import (
+    BudgetExceeded,
+    BudgetTracker,
+    RequestBudget,
+    set_budget_tracker,
+)
+
+from .orchestration import branch_context, forward_events, state_event, text_event
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# State key listing the hats whose perspective is missing from the brainstorm
+MISSING_PERSPECTIVES_KEY = "missing_perspectives"
+
+# Optional state key with per-request budget limits (RequestBudget fields)
+# overriding the agent's ``budget``, e.g. {"max_tokens": 20000}
+REQUEST_BUDGET_KEY = "request_budget"
+# State key receiving the brainstorm's usage against its budget
+BUDGET_USAGE_KEY = "request_budget_usage"
+
+
+class _HatDone:
+    def __init__(self, hat: BaseAgent, status: str):
+        self.hat = hat
+        self.status = status
+
+
+def _has_output(hat: BaseAgent, ctx: InvocationContext) -> bool:
+    """Whether a hat cut off while wrapping up had already saved its answer."""
+    output_key = getattr(hat, "output_key", None)
+    return bool(output_key and ctx.session.state.get(output_key))
+
+
+class QuorumParallelAgent(BaseAgent):
+    """
+    Drop-in replacement for the ``SixHatsBrainstorm`` ParallelAgent that never
+    lets one stuck hat stall the pipeline.
+
+    * ``hat_timeouts`` / ``default_hat_timeout``: per-hat time limits (seconds).
+    * ``deadline``: limit for the whole stage (seconds).
+    * ``quorum``: stop once this many hats have completed; stragglers
+      get ``quorum_grace`` more seconds before they are cancelled.
+    * ``budget``: token, model call, tool call and wall time limits for all
+      hats together, nested AgentTool agents included (models must be
+      wrapped in ``BudgetedLlm``). Once it is spent every hat still running
+      is cancelled. The ``request_budget`` state key overrides it per request.
+
+    Hats that time out, fail or are cancelled are listed in the
+    ``missing_perspectives`` state key and in a note addressed to the Blue Hat.
+    """
+
+    hat_timeouts: Dict[str, float] = {}
+    default_hat_timeout: Optional[float] = None
+    deadline: Optional[float] = None
+    quorum: Optional[int] = None
+    quorum_grace: float = 0.0
+    budget: Optional[RequestBudget] = None
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        loop = asyncio.get_running_loop()
+        stop_at = loop.time() + self.deadline if self.deadline is not None else None
+        quorum = min(self.quorum or len(self.sub_agents), len(self.sub_agents))
+
+        tracker = self._start_budget(ctx)
+        budget_stop_at = None
+        if tracker is not None and tracker.budget.max_wall_seconds is not None:
+            budget_stop_at = loop.time() + tracker.budget.max_wall_seconds
+            stop_at = budget_stop_at if stop_at is None else min(stop_at, budget_stop_at)
+        exhausted = asyncio.ensure_future(
+            tracker.exhausted.wait() if tracker is not None else asyncio.Event().wait()
+        )
+
+        events: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(
+                self._run_hat(hat, branch_context(self, hat, ctx), events, tracker)
+            )
+            for hat in self.sub_agents
+        ]
+        statuses: Dict[str, str] = {}
+        completed = 0
+        try:
+            while len(statuses) < len(tasks):
+                timeout = None if stop_at is None else max(0.0, stop_at - loop.time())
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait(
+                    {getter, exhausted}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not getter.done():
+                    # Deadline reached or budget spent: cut off the hats still running
+                    getter.cancel()
+                    if (
+                        tracker is not None
+                        and budget_stop_at is not None
+                        and loop.time() >= budget_stop_at
+                    ):
+                        tracker.exhaust("wall time")
+                    break
+                item = getter.result()
+
+                if isinstance(item, _HatDone):
+                    statuses[item.hat.name] = item.status
+                    if item.status == "completed":
+                        completed += 1
+                    if completed >= quorum and len(statuses) < len(tasks):
+                        grace_end = loop.time() + self.quorum_grace
+                        stop_at = grace_end if stop_at is None else min(stop_at, grace_end)
+                    continue
+
+                event, resume = item
+                yield event
+                resume.set()
+        finally:
+            exhausted.cancel()
+            for task in tasks:
+                task.cancel()
+
+        if tracker is not None and tracker.reason is not None:
+            cut_off = f"cancelled (budget exhausted: {tracker.reason})"
+        elif completed >= quorum:
+            cut_off = "cancelled (quorum reached)"
+        else:
+            cut_off = "cancelled (deadline)"
+        missing = [
+            f"{hat.name} ({statuses.get(hat.name, cut_off)})"
+            for hat in self.sub_agents
+            if statuses.get(hat.name) != "completed"
+            and not (hat.name not in statuses and _has_output(hat, ctx))
+        ]
+        state_delta: Dict[str, Any] = {MISSING_PERSPECTIVES_KEY: missing}
+        if tracker is not None:
+            state_delta[BUDGET_USAGE_KEY] = tracker.usage
+        if not missing:
+            yield state_event(self, ctx, state_delta)
+            return
+
+        logger.warning("Brainstorm finished without: %s", ", ".join(missing))
+        yield text_event(
+            self,
+            ctx,
+            "Note for the Blue Hat: the following perspectives are missing from this "
+            f"brainstorm and must be treated as unavailable: {', '.join(missing)}. "
+            "Do not invent their content; state explicitly which viewpoints your "
+            "synthesis could not take into account.",
+            state_delta=state_delta,
+        )
+
+    def _timeout_for(self, hat: BaseAgent) -> Optional[float]:
+        return self.hat_timeouts.get(hat.name, self.default_hat_timeout)
+
+    def _start_budget(self, ctx: InvocationContext) -> Optional[BudgetTracker]:
+        if self.budget is None:
+            return None
+        budget = self.budget.merge(ctx.session.state.get(REQUEST_BUDGET_KEY))
+        return BudgetTracker(budget)
+
+    async def _run_hat(
+        self,
+        hat: BaseAgent,
+        ctx: InvocationContext,
+        events: asyncio.Queue,
+        tracker: Optional[BudgetTracker] = None,
+    ) -> None:
+        # Each hat runs in its own task, so this binds the tracker for the hat
+        # (and anything it starts) without leaking into the parent context
+        set_budget_tracker(tracker)
+        timeout = self._timeout_for(hat)
+        status = "completed"
+        try:
+            await asyncio.wait_for(forward_events(hat.run_async(ctx), events), timeout)
+        except asyncio.TimeoutError:
+            status = f"timed out after {timeout:g}s"
+            logger.warning("%s %s", hat.name, status)
+        except asyncio.CancelledError:
+            raise
+        except BudgetExceeded as e:
+            status = f"stopped ({e})"
+            logger.warning("%s %s", hat.name, status)
+        except Exception:
+            status = "failed"
+            logger.warning("%s failed during brainstorm", hat.name, exc_info=True)
+        await events.put(_HatDone(hat, status))
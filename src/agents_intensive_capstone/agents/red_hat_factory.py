@@ -1,9 +1,10 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
 from google.adk.tools import google_search
 
 # Internal Project Imports
 from . import factory
+from .hat_schemas import RedHatOutput
 
 # ---------------------------------------------------------------------------
 # Configuration Constants
@@ -12,14 +13,15 @@ from . import factory
 AGENT_NAME = "RedHatAgent"
 PROMPT_FILENAME = "red_hat_prompt.txt"
 OUTPUT_KEY = "red_hat_plan"
+OUTPUT_SCHEMA = RedHatOutput  # with structured outputs on
 
 class RedHatFactory:
     
     @classmethod
-    def create(cls, model: Any, **kwargs) -> Any:
+    def create(cls, model: Any, search_tool: Optional[Any] = None, **kwargs) -> Any:
         # We don't need a separate search_model here since we aren't 
         # creating a sub-agent.
-        tools = cls._build_tools()
+        tools = cls._build_tools(search_tool)
 
         return factory.build_agent(
             name=AGENT_NAME,
@@ -31,8 +33,9 @@ class RedHatFactory:
         )
 
     @staticmethod
-    def _build_tools() -> List[Any]:
-        # Return google_search directly as a simple tool
+    def _build_tools(search_tool: Optional[Any] = None) -> List[Any]:
+        # Return google_search directly as a simple tool, unless a shared
+        # search tool (see SearchAgentFactory) was passed in
         return [
-            google_search,
+            search_tool or google_search,
         ]
\ No newline at end of file
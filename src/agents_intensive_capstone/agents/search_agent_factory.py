@@ -0,0 +1,55 @@
+from typing import Any, Optional
+
+from google.adk.tools import AgentTool, google_search
+
+from agents_intensive_capstone.cache import ResponseCache
+from agents_intensive_capstone.tools.search_cache import (
+    SEARCH_NAMESPACE,
+    CachedSearchTool,
+    SearchCache,
+)
+
+# Internal Project Imports
+from . import factory
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+AGENT_NAME = "web_search"
+PROMPT_FILENAME = "web_search_prompt.txt"
+OUTPUT_KEY = "web_search_output"
+
+class SearchAgentFactory:
+    """
+    Builds the neutral search helper that hats can share as a tool.
+
+    ``google_search`` grounding runs inside the model call, so identical
+    searches from different hats cannot be deduplicated. Routing them through
+    this helper instead turns each search into a tool call that a
+    :class:`SearchCache` can coalesce and cache. The price is one extra model
+    call per search (the helper's own), on top of the hat's.
+    """
+
+    @classmethod
+    def create(cls, model: Any, **kwargs: Any) -> Any:
+        return factory.build_agent(
+            name=AGENT_NAME,
+            model=model,
+            tools=[google_search],
+            prompt_filename=PROMPT_FILENAME,
+            output_key=OUTPUT_KEY,
+            **kwargs
+        )
+
+    @classmethod
+    def create_tool(
+        cls,
+        model: Any,
+        search_cache: Optional[SearchCache] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> Any:
+        tool = AgentTool(agent=cls.create(model=model, cache=cache))
+        if search_cache is None:
+            return tool
+        return CachedSearchTool(tool, search_cache, namespace=SEARCH_NAMESPACE)
@@ -1,9 +1,10 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
 from google.adk.tools import google_search
 
 # Internal Project Imports
 from . import factory
+from .hat_schemas import WhiteHatOutput
 
 # ---------------------------------------------------------------------------
 # Configuration Constants
@@ -13,12 +14,13 @@ from . import factory
 AGENT_NAME = "WhiteHatAgent"
 PROMPT_FILENAME = "white_hat_prompt.txt"
 OUTPUT_KEY = "whitehat_findings"
+OUTPUT_SCHEMA = WhiteHatOutput  # with structured outputs on
 
 class WhiteHatFactory:
     
     @classmethod
-    def create(cls, model: Any, **kwargs) -> Any:
-        tools = cls._build_tools()
+    def create(cls, model: Any, search_tool: Optional[Any] = None, **kwargs) -> Any:
+        tools = cls._build_tools(search_tool)
 
         return factory.build_agent(
             name=AGENT_NAME,
@@ -30,7 +32,8 @@ class WhiteHatFactory:
         )
 
     @staticmethod
-    def _build_tools() -> List[Any]:
+    def _build_tools(search_tool: Optional[Any] = None) -> List[Any]:
+        # A shared search tool (see SearchAgentFactory) replaces built-in grounding
         return [
-            google_search,
+            search_tool or google_search,
         ]
\ No newline at end of file
@@ -2,10 +2,17 @@ from typing import Any, List, Optional
 
 from google.adk.tools import AgentTool, google_search
 
+from agents_intensive_capstone.cache import ResponseCache
+from agents_intensive_capstone.tools.search_cache import (
+    SEARCH_NAMESPACE,
+    CachedSearchTool,
+    SearchCache,
+)
 from agents_intensive_capstone.tools.tools import get_positive_data
 
 # Internal Project Imports
 from . import factory
+from .hat_schemas import YellowHatOutput
 
 # ---------------------------------------------------------------------------
 # Configuration Constants
@@ -15,6 +22,7 @@ from . import factory
 AGENT_NAME = "YellowHatAgent"
 PROMPT_FILENAME = "yellow_hat_prompt.txt"
 OUTPUT_KEY = "yellow_hat_plan"
+OUTPUT_SCHEMA = YellowHatOutput  # with structured outputs on
 
 # Sub-Agent Config
 SEARCH_AGENT_NAME = "google_optimist"
@@ -24,9 +32,21 @@ SEARCH_OUTPUT_KEY = "yellow_hat_search_output"
 class YellowHatFactory:
     
     @classmethod
-    def create(cls, model: Any, search_model: Optional[Any] = None, **kwargs) -> Any:
+    def create(
+        cls,
+        model: Any,
+        search_model: Optional[Any] = None,
+        search_cache: Optional[SearchCache] = None,
+        search_tool: Optional[Any] = None,
+        **kwargs
+    ) -> Any:
         search_llm = search_model if search_model else model
-        tools = cls._build_tools(search_llm)
+        tools = cls._build_tools(
+            search_llm,
+            cache=kwargs.get("cache"),
+            search_cache=search_cache,
+            search_tool=search_tool,
+        )
 
         return factory.build_agent(
             name=AGENT_NAME,
@@ -38,7 +58,20 @@ class YellowHatFactory:
         )
 
     @staticmethod
-    def _build_tools(model: Any) -> List[Any]:
+    def _build_tools(
+        model: Any,
+        cache: Optional[ResponseCache] = None,
+        search_cache: Optional[SearchCache] = None,
+        search_tool: Optional[Any] = None,
+    ) -> List[Any]:
+        if search_tool is not None:
+            # Direct mode: a function tool (see create_optimist_search_tool)
+            # replaces the nested agent, saving its model call per search
+            return [
+                get_positive_data,
+                search_tool,
+            ]
+
         # Using factory to build the sub-agent
         google_agent = factory.build_agent(
             name=SEARCH_AGENT_NAME,
@@ -47,10 +80,16 @@ class YellowHatFactory:
             prompt_filename=SEARCH_PROMPT_FILENAME,
             
             # The sub-agent will store its final answer in this key
-            output_key=SEARCH_OUTPUT_KEY 
+            output_key=SEARCH_OUTPUT_KEY,
+            cache=cache,
         )
 
+        search_tool = AgentTool(agent=google_agent)
+        if search_cache is not None:
+            # Shares results with the White and Red hats' web_search tool
+            search_tool = CachedSearchTool(search_tool, search_cache, namespace=SEARCH_NAMESPACE)
+
         return [
             get_positive_data,
-            AgentTool(agent=google_agent),
+            search_tool,
         ]
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""Offline batch solving with bounded concurrency and resumable checkpoints."""
+
+from .runner import BatchItem, BatchRunner, load_checkpoint, read_questions
+
+__all__ = ["BatchItem", "BatchRunner", "load_checkpoint", "read_questions"]
@@ -0,0 +1,79 @@
+"""
+Batch-solve decision questions through the SixHatsSolver pipeline.
+
+Usage (from the repository root)::
+
+    python -m agents_intensive_capstone.batch questions.jsonl answers.jsonl --concurrency 8
+
+Re-running the same command after a crash or Ctrl-C resumes the batch:
+items already recorded as ``ok`` in the output file are skipped.
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import logging
+import sys
+from typing import Any, List, Optional
+
+from agents_intensive_capstone.models.scheduler import BATCH, PRIORITIES
+from agents_intensive_capstone.plugins import InstrumentationPlugin
+from agents_intensive_capstone.sessions import SqliteSessionService
+
+from .runner import BatchRunner, read_questions
+
+DEFAULT_AGENT = "adk_app.SixHatsSolver.agent:root_agent"
+
+
+def load_agent(spec: str) -> Any:
+    """Resolve ``package.module:attribute`` (attribute defaults to ``root_agent``)."""
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "root_agent")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch-solve questions with SixHatsSolver.")
+    parser.add_argument("input", help="JSONL or CSV file of questions")
+    parser.add_argument("output", help="JSONL results file (also the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions in flight")
+    parser.add_argument("--agent", default=DEFAULT_AGENT, help="module:attribute of the agent")
+    parser.add_argument("--question-field", default="question")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--limit", type=int, help="stop after this many input items")
+    parser.add_argument("--traces", help="append instrumentation spans to this JSONL file")
+    parser.add_argument("--sessions-db", help="keep sessions in this SQLite file, not in memory")
+    parser.add_argument(
+        "--priority", default=BATCH, choices=PRIORITIES, help="admission priority class"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    plugins = [InstrumentationPlugin(trace_path=args.traces)] if args.traces else []
+    session_service = SqliteSessionService(args.sessions_db) if args.sessions_db else None
+    runner = BatchRunner(
+        load_agent(args.agent),
+        args.output,
+        concurrency=args.concurrency,
+        plugins=plugins,
+        session_service=session_service,
+        priority=args.priority,
+    )
+    items = read_questions(args.input, args.question_field, args.id_field)
+    if args.limit is not None:
+        items = itertools.islice(items, args.limit)
+
+    try:
+        stats = asyncio.run(runner.run(items))
+    finally:
+        if session_service is not None:
+            session_service.close()
+    return 0 if stats["error"] == 0 else 1
@@ -0,0 +1,240 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner, Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+
+from agents_intensive_capstone.models.scheduler import BATCH, PRIORITIES, PRIORITY_KEY
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+APP_NAME = "six_hats_batch"
+FINAL_OUTPUT_KEY = "blue_hat_final_plan"
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    id: str
+    question: str
+
+
+def read_questions(
+    path: str, question_field: str = "question", id_field: str = "id"
+) -> Iterator[BatchItem]:
+    """Stream items from a JSONL or CSV file without loading it into memory.
+
+    JSONL lines may be objects (``{"id": ..., "question": ...}``) or bare
+    strings. Items without an id are numbered by their 1-based position.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as fh:
+            for index, row in enumerate(csv.DictReader(fh), start=1):
+                yield BatchItem(str(row.get(id_field) or index), row[question_field])
+        return
+
+    with open(path, encoding="utf-8") as fh:
+        for index, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield BatchItem(str(index), record)
+            else:
+                yield BatchItem(str(record.get(id_field) or index), record[question_field])
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Ids already solved successfully according to the output file.
+
+    The output file doubles as the checkpoint. A torn final line left by a
+    crash is truncated so the file stays valid JSONL, and a missing final
+    newline is added so the next record starts on a line of its own. Other
+    unreadable lines are skipped (and logged); records after them still count.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    done: Set[str] = set()
+    offset = 0
+    torn_at: Optional[int] = None
+    ends_with_newline = True
+    with open(path, "rb") as fh:
+        for number, raw in enumerate(fh, start=1):
+            start, offset = offset, offset + len(raw)
+            ends_with_newline = raw.endswith(b"\n")
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                if ends_with_newline:
+                    logger.warning("Skipping unreadable line %d of %s", number, path)
+                else:
+                    torn_at = start
+                continue
+            if isinstance(record, dict) and record.get("status") == "ok":
+                done.add(str(record["id"]))
+
+    if torn_at is not None:
+        logger.warning("Truncating partial record at the end of %s", path)
+        with open(path, "r+b") as fh:
+            fh.truncate(torn_at)
+    elif not ends_with_newline:
+        with open(path, "ab") as fh:
+            fh.write(b"\n")
+    return done
+
+
+def output_keys(agent: BaseAgent) -> List[str]:
+    """All ``output_key`` values in an agent tree, in definition order.
+
+    Agents that build their children per run (``QuestionRouterAgent``) list
+    them in ``declared_output_keys``.
+    """
+    key = getattr(agent, "output_key", None)
+    keys = [key] if key else []
+    keys.extend(getattr(agent, "declared_output_keys", []))
+    for sub_agent in agent.sub_agents:
+        keys.extend(output_keys(sub_agent))
+    return keys
+
+
+class BatchRunner:
+    """
+    Runs questions through an agent (normally the SixHatsSolver ``root_agent``)
+    with at most ``concurrency`` sessions in flight.
+
+    Every finished item is appended to ``output_path`` as one JSON line
+    holding ``blue_hat_final_plan`` and each hat's output. Items already
+    recorded as ``ok`` there are skipped, so an interrupted run resumes
+    where it stopped. Sessions are deleted once their result is written.
+
+    Sessions live in memory unless a ``session_service`` (e.g.
+    ``SqliteSessionService``) is given. Their ``request_priority`` is
+    ``priority``, so with admission limits configured, interactive requests
+    are served before the batch.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        output_path: str,
+        concurrency: int = 4,
+        plugins: Optional[Sequence[Any]] = None,
+        session_service: Optional[BaseSessionService] = None,
+        priority: str = BATCH,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; choose from {PRIORITIES}")
+        self.agent = agent
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.priority = priority
+        self.runner: Runner
+        if session_service is None:
+            self.runner = InMemoryRunner(
+                agent=agent, app_name=APP_NAME, plugins=list(plugins or [])
+            )
+        else:
+            self.runner = Runner(
+                agent=agent,
+                app_name=APP_NAME,
+                session_service=session_service,
+                plugins=list(plugins or []),
+            )
+        self.hat_keys = [key for key in output_keys(agent) if key != FINAL_OUTPUT_KEY]
+        self.stats = {"ok": 0, "error": 0, "skipped": 0}
+        self._write_lock = asyncio.Lock()
+
+    async def run(self, items: Iterator[BatchItem]) -> Dict[str, int]:
+        done = load_checkpoint(self.output_path)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        started = time.perf_counter()
+
+        with open(self.output_path, "a", encoding="utf-8") as out:
+            workers = [
+                asyncio.create_task(self._worker(queue, out)) for _ in range(self.concurrency)
+            ]
+            try:
+                for item in items:
+                    if item.id in done:
+                        self.stats["skipped"] += 1
+                        continue
+                    done.add(item.id)  # guards against duplicate ids in the input
+                    await queue.put(item)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+
+        logger.info(
+            "Batch finished in %.1fs: %d ok, %d errors, %d skipped",
+            time.perf_counter() - started,
+            self.stats["ok"],
+            self.stats["error"],
+            self.stats["skipped"],
+        )
+        return dict(self.stats)
+
+    async def _worker(self, queue: asyncio.Queue, out: Any) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record = await self.solve(item)
+            async with self._write_lock:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                self.stats[record["status"]] += 1
+                finished = self.stats["ok"] + self.stats["error"]
+                if finished % 50 == 0:
+                    logger.info("Batch progress: %d items written", finished)
+
+    async def solve(self, item: BatchItem) -> Dict[str, Any]:
+        user_id = f"batch-{item.id}"
+        session = await self.runner.session_service.create_session(
+            app_name=APP_NAME, user_id=user_id, state={PRIORITY_KEY: self.priority}
+        )
+        message = types.Content(role="user", parts=[types.Part(text=item.question)])
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"id": item.id, "question": item.question}
+        try:
+            async for _ in self.runner.run_async(
+                user_id=user_id, session_id=session.id, new_message=message
+            ):
+                pass
+            final = await self.runner.session_service.get_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session.id
+            )
+            state = final.state if final else {}
+            record[FINAL_OUTPUT_KEY] = state.get(FINAL_OUTPUT_KEY)
+            record["hat_outputs"] = {key: state.get(key) for key in self.hat_keys}
+            record["status"] = "ok" if record[FINAL_OUTPUT_KEY] else "error"
+            if not record[FINAL_OUTPUT_KEY]:
+                record["error"] = f"no {FINAL_OUTPUT_KEY} produced"
+        except Exception as exc:
+            logger.warning("Item %s failed: %s", item.id, exc)
+            record["status"] = "error"
+            record["error"] = repr(exc)
+        finally:
+            await self.runner.session_service.delete_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session.id
+            )
+        record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return record
@@ -0,0 +1,6 @@
+"""Response caching for the hat agents."""
+
+from .backends import InMemoryCacheBackend, SqliteCacheBackend
+from .response_cache import ResponseCache
+
+__all__ = ["InMemoryCacheBackend", "ResponseCache", "SqliteCacheBackend"]
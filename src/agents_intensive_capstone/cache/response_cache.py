@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from ..models.tokens import request_text
+from .backends import InMemoryCacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Turns whose first call missed and whose answer is not stored yet; the oldest
+# are dropped beyond this (turns cancelled before answering never finish)
+MAX_PENDING_TURNS = 1024
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different inputs share a key."""
+    return " ".join(text.split()).casefold()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_id(model: Any) -> str:
+    """Best-effort identifier for a model string or ``BaseLlm`` instance."""
+    if isinstance(model, str):
+        return model
+    return getattr(model, "model", None) or type(model).__name__
+
+
+def make_cache_key(agent_name: str, prompt_hash: str, model: str, user_input: str) -> str:
+    payload = json.dumps([agent_name, prompt_hash, model, normalize_text(user_input)])
+    return content_hash(payload)
+
+
+def _is_final_text(llm_response: LlmResponse) -> bool:
+    content = llm_response.content
+    if llm_response.partial or llm_response.error_code or not content or not content.parts:
+        return False
+    if any(part.function_call for part in content.parts):
+        return False
+    return any(part.text for part in content.parts)
+
+
+class ResponseCache:
+    """Opt-in response cache shared by any number of hats.
+
+    The cache is attached per agent through :meth:`bind`, which returns the
+    ``before_model_callback``/``after_model_callback`` pair used by
+    ``factory.build_agent``. Only the first model call of an agent turn is
+    looked up; on a hit the cached content is returned from the callback so
+    the model is never called and ADK still writes the agent's
+    ``output_key`` from the resulting final-response event.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend if backend is not None else InMemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+        # (invocation_id, agent_name) -> key computed on the turn's first call
+        self._pending: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def bind(self, agent_name: str, prompt_hash: str, model: Any) -> "HatCacheCallbacks":
+        """Callbacks for one agent; ``prompt_hash`` is its prompt's registry hash."""
+        return HatCacheCallbacks(
+            cache=self,
+            agent_name=agent_name,
+            prompt_hash=prompt_hash,
+            model=model_id(model),
+        )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _start(self, turn: Tuple[str, str], key: str) -> None:
+        self._pending[turn] = key
+        while len(self._pending) > MAX_PENDING_TURNS:
+            self._pending.popitem(last=False)
+
+
+class HatCacheCallbacks:
+    """Model callbacks that route one agent's calls through a ResponseCache."""
+
+    def __init__(self, cache: ResponseCache, agent_name: str, prompt_hash: str, model: str):
+        self.cache = cache
+        self.agent_name = agent_name
+        self.prompt_hash = prompt_hash
+        self.model = model
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        turn = (callback_context.invocation_id, callback_context.agent_name)
+        if turn in self.cache._pending:
+            # Follow-up call after a tool round trip: never served from cache.
+            return None
+
+        key = make_cache_key(
+            self.agent_name, self.prompt_hash, self.model, request_text(llm_request)
+        )
+        cached = self.cache.backend.get(key)
+        if cached is None:
+            self.cache.misses += 1
+            self.cache._start(turn, key)
+            return None
+
+        self.cache.hits += 1
+        logger.info("Response cache hit for %s", self.agent_name)
+        return LlmResponse(content=types.Content.model_validate_json(cached))
+
+    def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        turn = (callback_context.invocation_id, callback_context.agent_name)
+        if llm_response.error_code:
+            self.cache._pending.pop(turn, None)
+            return None
+        if not _is_final_text(llm_response):
+            return None
+        key = self.cache._pending.pop(turn, None)
+        if key is not None and llm_response.content is not None:
+            self.cache.backend.set(
+                key, llm_response.content.model_dump_json(exclude_none=True)
+            )
+        return None
+
+    def on_model_error(
+        self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> Optional[LlmResponse]:
+        # A failed turn stores nothing; a retry starts over with a fresh lookup
+        self.cache._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        return None
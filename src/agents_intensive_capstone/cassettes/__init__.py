@@ -0,0 +1,14 @@
+"""Record/replay of model and tool traffic for fast, deterministic offline runs."""
+
+from .cassette import AUTO, RECORD, REPLAY, Cassette, CassetteMissError
+from .wrappers import CassetteLlm, CassetteTool
+
+__all__ = [
+    "AUTO",
+    "RECORD",
+    "REPLAY",
+    "Cassette",
+    "CassetteLlm",
+    "CassetteMissError",
+    "CassetteTool",
+]
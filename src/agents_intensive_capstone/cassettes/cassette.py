@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from agents_intensive_capstone.cache.response_cache import content_hash, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# "record": call live and (re)write the cassette; "replay": serve recordings
+# only, failing on unrecorded requests; "auto": replay when recorded, else
+# call live and append
+RECORD = "record"
+REPLAY = "replay"
+AUTO = "auto"
+MODES = (RECORD, REPLAY, AUTO)
+
+# Environment variables read by AgentConfig
+CASSETTE_PATH_ENV = "SIX_HATS_CASSETTE"
+CASSETTE_MODE_ENV = "SIX_HATS_CASSETTE_MODE"
+
+
+class CassetteMissError(LookupError):
+    """A request in replay mode that the cassette has no recording for."""
+
+
+def request_key(kind: str, name: str, fingerprint: Any) -> str:
+    """Stable hash of a normalized request (see ``model_fingerprint``/``tool_fingerprint``)."""
+    return content_hash(json.dumps([kind, name, fingerprint], sort_keys=True, default=str))
+
+
+def normalize_value(value: Any) -> Any:
+    """Recursively normalize strings (whitespace, case) in JSON-like ``value``."""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {k: normalize_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+    return value
+
+
+class Cassette:
+    """
+    Recorded model and tool interactions, stored as one JSON line each.
+
+    Interactions are keyed by a hash of the normalized request. A request
+    made several times in a run is replayed in recording order (the last
+    recording repeats once they run out), so a re-run sees the same sequence
+    of answers the recorded run did.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r} (expected one of {MODES})")
+        self.path = path
+        self.mode = mode
+        self._recordings: Dict[str, List[Any]] = defaultdict(list)
+        self._played: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+        if mode == RECORD:
+            open(path, "w", encoding="utf-8").close()
+        elif os.path.exists(path):
+            self._load()
+        elif mode == REPLAY:
+            raise FileNotFoundError(f"Cassette {path} does not exist; record it first")
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+    @property
+    def recording(self) -> bool:
+        return self.mode != REPLAY
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._recordings.values())
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._recordings[entry["key"]].append(entry["data"])
+        logger.info("Loaded %d recordings from cassette %s", len(self), self.path)
+
+    def play(self, key: str) -> Optional[Any]:
+        """The next recording for ``key``, or None when it has none (outside replay mode).
+
+        Raises :class:`CassetteMissError` for unrecorded requests in replay mode.
+        """
+        with self._lock:
+            entries = self._recordings.get(key)
+            if self.mode == RECORD or not entries:
+                self.misses += 1
+                if self.mode == REPLAY:
+                    raise CassetteMissError(
+                        f"No recording for request {key[:12]} in {self.path}; "
+                        f"re-record with {CASSETTE_MODE_ENV}={AUTO} or {RECORD}"
+                    )
+                return None
+            index = self._played[key]
+            self._played[key] = index + 1
+            self.hits += 1
+            return entries[min(index, len(entries) - 1)]
+
+    def record(self, key: str, kind: str, name: str, data: Any) -> None:
+        """Append a recording for ``key`` to memory and to the cassette file."""
+        line = json.dumps(
+            {"key": key, "kind": kind, "name": name, "data": data},
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        with self._lock:
+            self._recordings[key].append(data)
+            self._played[key] = len(self._recordings[key])
+            self.recorded += 1
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
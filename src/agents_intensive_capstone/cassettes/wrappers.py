@@ -0,0 +1,107 @@
+import logging
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from .cassette import Cassette, normalize_value, request_key
+
+logger = logging.getLogger(__name__)
+
+
+def _part_fingerprint(part: types.Part) -> Optional[Dict[str, Any]]:
+    # Function call ids are random per run, so only names and arguments count
+    if part.function_call:
+        return {"call": part.function_call.name, "args": normalize_value(part.function_call.args)}
+    if part.function_response:
+        return {
+            "result": part.function_response.name,
+            "response": normalize_value(part.function_response.response),
+        }
+    if part.text is not None and not part.thought:
+        return {"text": normalize_value(part.text)}
+    return None
+
+
+def model_fingerprint(llm_request: LlmRequest, stream: bool = False) -> Dict[str, Any]:
+    """The parts of a model request that determine its answer, normalized."""
+    config = llm_request.config
+    system_instruction = config.system_instruction if config else None
+    contents = []
+    for content in llm_request.contents or []:
+        parts = [p for p in map(_part_fingerprint, content.parts or []) if p is not None]
+        if parts:
+            contents.append({"role": content.role, "parts": parts})
+    return {
+        "system": normalize_value(system_instruction)
+        if isinstance(system_instruction, str)
+        else None,
+        "contents": contents,
+        "tools": sorted(llm_request.tools_dict),
+        "stream": stream,
+    }
+
+
+class CassetteLlm(BaseLlm):
+    """Wraps a model so its calls are recorded to, or replayed from, a cassette.
+
+    Replayed calls never reach ``inner``: responses (text, function calls,
+    grounding metadata from built-in tools such as ``google_search``, usage)
+    come back exactly as recorded, without delay.
+    """
+
+    inner: BaseLlm
+    cassette: Cassette
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key("model", self.model, model_fingerprint(llm_request, stream))
+        recorded = self.cassette.play(key)
+        if recorded is not None:
+            for data in recorded:
+                yield LlmResponse.model_validate(data)
+            return
+
+        responses: List[Dict[str, Any]] = []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+        self.cassette.record(key, "model", self.model, responses)
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.inner.connect(llm_request)
+
+
+class CassetteTool(BaseTool):
+    """
+    Records a client-side tool (e.g. an ``AgentTool`` over a search agent)
+    to a cassette and replays its results by normalized arguments.
+
+    As with ``CachedSearchTool``, only the return value is replayed: state
+    changes the wrapped tool would make are not.
+    """
+
+    def __init__(self, tool: BaseTool, cassette: Cassette):
+        super().__init__(name=tool.name, description=tool.description)
+        self.tool = tool
+        self.cassette = cassette
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        key = request_key("tool", self.name, normalize_value(args))
+        recorded = self.cassette.play(key)
+        if recorded is not None:
+            return recorded["result"]
+        result = await self.tool.run_async(args=args, tool_context=tool_context)
+        self.cassette.record(key, "tool", self.name, {"result": result})
+        return result
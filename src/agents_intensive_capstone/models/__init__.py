@@ -0,0 +1,42 @@
+"""Model backends and wrappers usable in place of ``Gemini``/``LiteLlm``."""
+
+from .budget import BudgetedLlm, BudgetExceeded, RequestBudget
+from .cascade import CascadeLlm, QualityCheck, cascade_stats
+from .hedging import HedgedLlm
+from .rate_limit import RateLimit, RateLimitedLlm, RateLimiter, rate_limiter_stats
+from .routing import RoutedLlm
+from .scheduler import (
+    AdmissionLimits,
+    AdmissionRejected,
+    AdmissionScheduler,
+    ScheduledLlm,
+    scheduler_prometheus_text,
+    scheduler_stats,
+)
+from .stub import LatencyDistribution, StubLlm, StubModelError
+from .tokens import estimate_tokens
+
+__all__ = [
+    "AdmissionLimits",
+    "AdmissionRejected",
+    "AdmissionScheduler",
+    "BudgetExceeded",
+    "BudgetedLlm",
+    "CascadeLlm",
+    "HedgedLlm",
+    "LatencyDistribution",
+    "QualityCheck",
+    "RateLimit",
+    "RateLimitedLlm",
+    "RateLimiter",
+    "RequestBudget",
+    "RoutedLlm",
+    "ScheduledLlm",
+    "StubLlm",
+    "StubModelError",
+    "cascade_stats",
+    "estimate_tokens",
+    "rate_limiter_stats",
+    "scheduler_prometheus_text",
+    "scheduler_stats",
+]
@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import AbstractAsyncContextManager
+from dataclasses import asdict, dataclass, fields
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .tokens import estimate_tokens, request_text
+
+logger = logging.getLogger(__name__)
+
+# Tracker charged by model calls made from the current context. Tasks started
+# from it (parallel hats, nested AgentTool runs) inherit it.
+_current_tracker: contextvars.ContextVar[Optional["BudgetTracker"]] = contextvars.ContextVar(
+    "request_budget_tracker", default=None
+)
+
+
+@dataclass(frozen=True)
+class RequestBudget:
+    """Spending limits for one request; None leaves that dimension unlimited."""
+
+    max_tokens: Optional[int] = None
+    max_model_calls: Optional[int] = None
+    max_tool_calls: Optional[int] = None
+    max_wall_seconds: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestBudget":
+        names = {f.name for f in fields(cls)}
+        unknown = set(data) - names
+        if unknown:
+            raise ValueError(f"Unknown request budget fields: {sorted(unknown)}")
+        return cls(**data)
+
+    def merge(self, override: Optional[Dict[str, Any]]) -> "RequestBudget":
+        """This budget with the (non-None) limits in ``override`` replacing its own."""
+        if not override:
+            return self
+        limits = asdict(self)
+        limits.update({k: v for k, v in override.items() if v is not None})
+        return RequestBudget.from_dict(limits)
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised for a model call attempted after the request budget ran out."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"request budget exhausted ({reason})")
+        self.reason = reason
+
+
+class BudgetTracker:
+    """
+    Usage of one request against its :class:`RequestBudget`.
+
+    Model wrappers charge it through :func:`current_tracker`. A limit is the
+    most that may be spent: once usage goes past any of them :attr:`exhausted`
+    is set, so whoever runs the request can cancel the work still in flight,
+    and further model calls are refused.
+    """
+
+    def __init__(self, budget: RequestBudget, clock: Callable[[], float] = time.monotonic):
+        self.budget = budget
+        self._clock = clock
+        self.started = clock()
+        self.tokens = 0
+        self.model_calls = 0
+        self.tool_calls = 0
+        self.refused = 0
+        self.reason: Optional[str] = None
+        self.exhausted = asyncio.Event()
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """Clock time at which the wall-time limit runs out, if any."""
+        if self.budget.max_wall_seconds is None:
+            return None
+        return self.started + self.budget.max_wall_seconds
+
+    @property
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "model_calls": self.model_calls,
+            "tool_calls": self.tool_calls,
+            "wall_seconds": round(self._clock() - self.started, 3),
+            "exhausted": self.reason,
+            "refused_model_calls": self.refused,
+        }
+
+    def exhaust(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+            logger.warning("Request budget exhausted (%s): %s", reason, self.usage)
+        self.exhausted.set()
+
+    def start_model_call(self) -> None:
+        """Count a model call about to be made; raises once the budget is spent.
+
+        Running out of model calls only refuses new calls: unlike overspent
+        tokens, tool calls or wall time, it does not cut off calls in flight.
+        """
+        deadline = self.deadline
+        if deadline is not None and self._clock() >= deadline:
+            self.exhaust("wall time")
+        limit = self.budget.max_model_calls
+        if self.reason is not None or (limit is not None and self.model_calls >= limit):
+            self.refused += 1
+            raise BudgetExceeded(self.reason or "model calls")
+        self.model_calls += 1
+
+    def charge(self, tokens: int = 0, tool_calls: int = 0) -> None:
+        self.tokens += tokens
+        self.tool_calls += tool_calls
+        budget = self.budget
+        if budget.max_tokens is not None and self.tokens > budget.max_tokens:
+            self.exhaust("tokens")
+        elif budget.max_tool_calls is not None and self.tool_calls > budget.max_tool_calls:
+            self.exhaust("tool calls")
+
+
+def current_tracker() -> Optional[BudgetTracker]:
+    return _current_tracker.get()
+
+
+def set_budget_tracker(tracker: Optional[BudgetTracker]) -> contextvars.Token:
+    """Charge model calls made from the current context (and its tasks) to ``tracker``."""
+    return _current_tracker.set(tracker)
+
+
+def _tool_calls(response: LlmResponse) -> int:
+    if response.partial or not response.content:
+        return 0
+    return sum(1 for part in response.content.parts or [] if part.function_call)
+
+
+def _response_text(response: LlmResponse) -> str:
+    if not response.content:
+        return ""
+    return "".join(part.text or "" for part in response.content.parts or [])
+
+
+class BudgetedLlm(BaseLlm):
+    """Wraps a model so its calls are charged to the current request budget.
+
+    Tokens come from the response's usage metadata (estimated when absent)
+    and tool calls from the function calls the model asks for, so tool loops
+    in nested AgentTool agents are counted too. Outside a budgeted request
+    calls pass straight through.
+    """
+
+    inner: BaseLlm
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        tracker = current_tracker()
+        if tracker is None:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        tracker.start_model_call()
+        usage, text, tool_calls = None, [], 0
+        try:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                usage = response.usage_metadata or usage
+                tool_calls += _tool_calls(response)
+                if not response.partial:
+                    text.append(_response_text(response))
+                yield response
+        finally:
+            # Charged even when cut off mid-call: the provider bills it anyway
+            if usage is not None and usage.total_token_count:
+                tokens = usage.total_token_count
+            else:
+                tokens = estimate_tokens(request_text(llm_request)) + estimate_tokens("".join(text))
+            tracker.charge(tokens=tokens, tool_calls=tool_calls)
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.inner.connect(llm_request)
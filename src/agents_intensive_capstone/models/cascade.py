@@ -0,0 +1,211 @@
+import logging
+import re
+import time
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from .pricing import ModelPrice, estimate_cost
+from .tokens import estimate_tokens, request_text
+
+logger = logging.getLogger(__name__)
+
+# Appended to the instruction when a self-rated confidence is required
+CONFIDENCE_INSTRUCTION = (
+    "On the last line of your final answer, rate how confident you are in it as "
+    "'Confidence: <number between 0 and 1>'."
+)
+_CONFIDENCE_LINE = re.compile(
+    r"^\W*confidence\W*:?\s*([0-9]*\.?[0-9]+)\s*(%|/\s*10|/\s*100)?\W*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def parse_confidence(text: str) -> Optional[float]:
+    """Last ``Confidence: x`` rating in ``text`` normalized to [0, 1], or None."""
+    matches = list(_CONFIDENCE_LINE.finditer(text))
+    if not matches:
+        return None
+    value, scale = float(matches[-1].group(1)), (matches[-1].group(2) or "").replace(" ", "")
+    if scale in ("%", "/100") or (not scale and value > 10):
+        value /= 100
+    elif scale == "/10" or value > 1:
+        value /= 10
+    return max(0.0, min(1.0, value))
+
+
+def strip_confidence(text: str) -> str:
+    return _CONFIDENCE_LINE.sub("", text).rstrip()
+
+
+@dataclass(frozen=True)
+class QualityCheck:
+    """Decides whether a tier's final answer is good enough to keep.
+
+    All configured criteria must pass: at least ``min_chars`` characters,
+    every heading in ``required_sections`` present (case-insensitive) and, if
+    ``min_confidence`` is set, a self-rated confidence at least that high.
+    """
+
+    min_chars: int = 0
+    required_sections: Tuple[str, ...] = ()
+    min_confidence: Optional[float] = None
+
+    def failures(self, text: str) -> List[str]:
+        reasons = []
+        if len(text.strip()) < self.min_chars:
+            reasons.append(f"shorter than {self.min_chars} chars")
+        lowered = text.lower()
+        missing = [s for s in self.required_sections if s.lower() not in lowered]
+        if missing:
+            reasons.append(f"missing sections {missing}")
+        if self.min_confidence is not None:
+            confidence = parse_confidence(text)
+            if confidence is None or confidence < self.min_confidence:
+                reasons.append(f"confidence {confidence} below {self.min_confidence:g}")
+        return reasons
+
+
+@dataclass
+class TierStats:
+    calls: int = 0
+    accepted: int = 0
+    seconds: float = 0.0
+    cost_usd: float = 0.0
+    rejections: Dict[str, int] = field(default_factory=dict)
+
+
+def _final_text(responses: List[LlmResponse]) -> Optional[str]:
+    """Text of a final answer, or None when the model asked for a tool call."""
+    parts = [part for r in responses if r.content for part in (r.content.parts or [])]
+    if any(part.function_call for part in parts):
+        return None
+    return "".join(part.text for part in parts if part.text and not part.thought)
+
+
+class CascadeLlm(BaseLlm):
+    """Answers with the cheapest tier first and escalates when the answer is weak.
+
+    ``tiers`` are ordered cheapest first. A final text answer that fails
+    ``check`` is retried on the next tier; tool-call turns are never
+    re-run. The last tier's answer is always kept. Streaming calls use the
+    first tier only.
+    """
+
+    tiers: List[BaseLlm]
+    check: QualityCheck = QualityCheck()
+    prices: Optional[Dict[str, ModelPrice]] = None
+
+    _calls: int = PrivateAttr(default=0)
+    _escalations: int = PrivateAttr(default=0)
+    _tier_stats: Dict[str, TierStats] = PrivateAttr(default_factory=dict)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self._calls,
+            "escalations": self._escalations,
+            "escalation_rate": self._escalations / self._calls if self._calls else 0.0,
+            "tiers": {
+                name: {
+                    "calls": tier.calls,
+                    "accepted": tier.accepted,
+                    "seconds": round(tier.seconds, 3),
+                    "cost_usd": round(tier.cost_usd, 6),
+                    "rejections": dict(tier.rejections),
+                }
+                for name, tier in self._tier_stats.items()
+            },
+        }
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            async for response in self.tiers[0].generate_content_async(llm_request, stream=True):
+                yield response
+            return
+
+        self._calls += 1
+        if self.check.min_confidence is not None:
+            llm_request.append_instructions([CONFIDENCE_INSTRUCTION])
+
+        for index, tier in enumerate(self.tiers):
+            responses = await self._call_tier(tier, llm_request)
+            text = _final_text(responses)
+            last = index == len(self.tiers) - 1
+            reasons = [] if text is None or last else self.check.failures(text)
+            if not reasons:
+                self._tier_stats[tier.model].accepted += 1
+                for response in self._finalize(responses, text):
+                    yield response
+                return
+
+            rejections = self._tier_stats[tier.model].rejections
+            for reason in reasons:
+                key = reason.split(" ")[0]
+                rejections[key] = rejections.get(key, 0) + 1
+            if index == 0:
+                self._escalations += 1
+            logger.info(
+                "Escalating from %s to %s: %s",
+                tier.model,
+                self.tiers[index + 1].model,
+                "; ".join(reasons),
+            )
+
+    async def _call_tier(self, tier: BaseLlm, llm_request: LlmRequest) -> List[LlmResponse]:
+        request = llm_request.model_copy(deep=True)
+        request.model = tier.model
+        stats = self._tier_stats.setdefault(tier.model, TierStats())
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            responses = [r async for r in tier.generate_content_async(request, stream=False)]
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+        usage = next((r.usage_metadata for r in reversed(responses) if r.usage_metadata), None)
+        if usage is not None:
+            input_tokens = usage.prompt_token_count or 0
+            output_tokens = usage.candidates_token_count or 0
+        else:
+            input_tokens = estimate_tokens(request_text(request))
+            output_tokens = estimate_tokens(_final_text(responses) or "")
+        stats.cost_usd += estimate_cost(tier.model, input_tokens, output_tokens, self.prices)
+        return responses
+
+    def _finalize(self, responses: List[LlmResponse], text: Optional[str]) -> List[LlmResponse]:
+        if text is None or self.check.min_confidence is None:
+            return responses
+        # The rating is for the cascade, not for the reader
+        final = responses[-1].model_copy(deep=True)
+        final.content = types.Content(
+            role="model", parts=[types.Part(text=strip_confidence(text))]
+        )
+        return [final]
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.tiers[0].connect(llm_request)
+
+
+def cascade_stats(agent: Any) -> Dict[str, Dict[str, Any]]:
+    """``CascadeLlm.stats`` for every agent in the tree that uses a cascade."""
+    report = {}
+    if isinstance(getattr(agent, "model", None), CascadeLlm):
+        report[agent.name] = agent.model.stats
+    children = [*agent.sub_agents, *getattr(agent, "stages", [])]
+    if getattr(agent, "synthesizer", None) is not None:
+        children.append(agent.synthesizer)
+    for child in children:
+        report.update(cascade_stats(child))
+    return report
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class HedgedLlm(BaseLlm):
+    """Wraps a model and fires a second, identical request when the first is slow.
+
+    Once ``min_samples`` latencies have been observed, a call still running
+    after the ``hedge_percentile`` latency gets a hedge request; whichever
+    finishes first wins and the other is cancelled. Hedging trades a few
+    duplicate calls (typically ``100 - hedge_percentile`` percent) for a
+    shorter tail. Streaming calls are hedged the same way up to their first
+    chunk, against the time-to-first-chunk percentile: the first attempt to
+    send a chunk is streamed to the end and the other is cancelled.
+    """
+
+    inner: BaseLlm
+    hedge_percentile: float = 95.0
+    min_samples: int = 20
+    window: int = 200
+
+    _latencies: Deque[float] = PrivateAttr()
+    # Time to the first chunk of streamed calls, which hedge on their own delay
+    _first_chunk_latencies: Deque[float] = PrivateAttr()
+    _hedges_fired: int = PrivateAttr(default=0)
+    _hedges_won: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._latencies = deque(maxlen=self.window)
+        self._first_chunk_latencies = deque(maxlen=self.window)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hedges_fired": self._hedges_fired, "hedges_won": self._hedges_won}
+
+    @property
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a hedge fires, or None while still warming up."""
+        return self._delay(self._latencies)
+
+    @property
+    def stream_hedge_delay(self) -> Optional[float]:
+        """Seconds without a first chunk after which a streamed call is hedged."""
+        return self._delay(self._first_chunk_latencies)
+
+    def _delay(self, latencies: Deque[float]) -> Optional[float]:
+        if len(latencies) < self.min_samples:
+            return None
+        return _percentile(list(latencies), self.hedge_percentile)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            async for response in self._hedged_stream(llm_request, self.stream_hedge_delay):
+                yield response
+            return
+
+        delay = self.hedge_delay
+        if delay is None:
+            start = time.perf_counter()
+            async for response in self.inner.generate_content_async(llm_request):
+                yield response
+            self._latencies.append(time.perf_counter() - start)
+            return
+
+        for response in await self._hedged(llm_request, delay):
+            yield response
+
+    async def _hedged(self, llm_request: LlmRequest, delay: float) -> List[LlmResponse]:
+        primary_start = time.perf_counter()
+        primary = asyncio.create_task(self._collect(llm_request))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._hedges_fired += 1
+                logger.debug("Hedging %s call after %.3fs", self.model, delay)
+                tasks.add(asyncio.create_task(self._collect(llm_request.model_copy(deep=True))))
+
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._hedges_won += 1
+                        # Always the primary's latency, never the hedge's own:
+                        # when the hedge wins the primary is still running, so
+                        # this is a lower bound on it (and at least ``delay``).
+                        # Feeding back hedge latencies would pull the percentile,
+                        # and with it the hedge delay, down over time
+                        self._latencies.append(time.perf_counter() - primary_start)
+                        return task.result()
+                if not tasks:
+                    # Every attempt failed: surface the primary's error.
+                    return primary.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _hedged_stream(
+        self, llm_request: LlmRequest, delay: Optional[float]
+    ) -> AsyncGenerator[LlmResponse, None]:
+        primary_start = time.perf_counter()
+        primary = self.inner.generate_content_async(llm_request, stream=True)
+        # Pending first chunk of each attempt -> that attempt's stream
+        attempts = {asyncio.ensure_future(primary.__anext__()): primary}
+        winner: Optional["asyncio.Task[LlmResponse]"] = None
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                self._hedges_fired += 1
+                logger.debug("Hedging streamed %s call after %.3fs", self.model, delay)
+                hedge = self.inner.generate_content_async(
+                    llm_request.model_copy(deep=True), stream=True
+                )
+                attempts[asyncio.ensure_future(hedge.__anext__())] = hedge
+
+            pending = set(attempts)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # A stream that ends without a chunk is a (empty) success too
+                winner = next(
+                    (
+                        task
+                        for task in done
+                        if task.exception() is None
+                        or isinstance(task.exception(), StopAsyncIteration)
+                    ),
+                    None,
+                )
+            if winner is None:
+                # Every attempt failed: surface the primary's error
+                next(iter(attempts)).result()
+                return
+        finally:
+            for task, responses in attempts.items():
+                if task is not winner:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    await responses.aclose()
+
+        # As in _hedged, the primary's time to first chunk (a lower bound when the hedge won)
+        self._first_chunk_latencies.append(time.perf_counter() - primary_start)
+        if isinstance(winner.exception(), StopAsyncIteration):
+            return
+        if attempts[winner] is not primary:
+            self._hedges_won += 1
+        yield winner.result()
+        async for response in attempts[winner]:
+            yield response
+
+    async def _collect(self, llm_request: LlmRequest) -> List[LlmResponse]:
+        return [r async for r in self.inner.generate_content_async(llm_request, stream=False)]
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.inner.connect(llm_request)
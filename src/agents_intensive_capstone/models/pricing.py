@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per one million tokens."""
+
+    input_per_million: float
+    output_per_million: float
+
+
+# Public list prices at the time of writing; override per deployment as needed.
+# ``gpt-oss-20b`` is served through our LiteLLM proxy, priced at its hosting cost.
+DEFAULT_PRICES: Dict[str, ModelPrice] = {
+    "gemini-2.5-flash-lite": ModelPrice(0.10, 0.40),
+    "gemini-2.5-flash": ModelPrice(0.30, 2.50),
+    "gemini-2.5-pro": ModelPrice(1.25, 10.00),
+    "gpt-oss-20b": ModelPrice(0.05, 0.20),
+}
+
+
+def find_price(model: str, prices: Optional[Dict[str, ModelPrice]] = None) -> Optional[ModelPrice]:
+    """Exact match first, then the longest known name that prefixes ``model``."""
+    prices = DEFAULT_PRICES if prices is None else prices
+    name = model.rsplit("/", 1)[-1]
+    if name in prices:
+        return prices[name]
+    candidates = [known for known in prices if name.startswith(known)]
+    return prices[max(candidates, key=len)] if candidates else None
+
+
+def estimate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    prices: Optional[Dict[str, ModelPrice]] = None,
+) -> float:
+    """Estimated USD cost of one call; unknown models cost 0."""
+    price = find_price(model, prices)
+    if price is None:
+        return 0.0
+    return (
+        input_tokens * price.input_per_million + output_tokens * price.output_per_million
+    ) / 1_000_000
@@ -0,0 +1,280 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+from .hedging import _percentile
+from .tokens import estimate_tokens, request_text
+
+logger = logging.getLogger(__name__)
+
+# Session the current model call is made for; requests are queued fairly
+# between sessions. Unset (e.g. outside a runner) means one shared queue.
+DEFAULT_SESSION = "default"
+_current_session: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "rate_limit_session", default=DEFAULT_SESSION
+)
+
+
+def set_rate_limit_session(session_id: str) -> contextvars.Token:
+    """Attribute model calls made from the current context to ``session_id``."""
+    return _current_session.set(session_id)
+
+
+def bind_rate_limit_session(callback_context: Any) -> None:
+    """``before_agent_callback`` for the root agent that sets the session.
+
+    Sub-agents, including those ParallelAgent runs in their own tasks,
+    inherit the value.
+    """
+    set_rate_limit_session(callback_context._invocation_context.session.id)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Provider quota for one model; None leaves that dimension unlimited."""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """Holds up to ``per_minute`` units, refilled continuously at that rate.
+
+    The level may go negative when actual usage turns out higher than the
+    amount taken up front; later takers then wait for the debt to refill.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def level(self) -> float:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._level
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` (capped at the capacity) can be taken."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._level = self.level - amount
+
+
+@dataclass
+class _Waiter:
+    tokens: int
+    future: "asyncio.Future[None]"
+    enqueued: float
+    # Whether the limit (rather than just dispatch) held this call back
+    throttled: bool = False
+
+
+class RateLimiter:
+    """
+    Async requests-per-minute and tokens-per-minute limiter for one model.
+
+    Callers wait in one FIFO queue per session and the queues are served
+    round-robin, so a session issuing many concurrent calls cannot starve
+    the others. Tokens are taken up front from an estimate and corrected with
+    :meth:`settle` once the actual usage is known.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: RateLimit,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        window: int = 1000,
+    ):
+        self.name = name
+        self.limit = limit
+        self._clock = clock
+        self._sleep = sleep
+        self._requests = (
+            TokenBucket(limit.requests_per_minute, clock) if limit.requests_per_minute else None
+        )
+        self._tokens = (
+            TokenBucket(limit.tokens_per_minute, clock) if limit.tokens_per_minute else None
+        )
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._requests_total = 0
+        self._delayed = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        waits = list(self._waits)
+        return {
+            "requests": self._requests_total,
+            "delayed": self._delayed,
+            "queue_depth": self.queue_depth,
+            "wait_seconds_total": round(self._wait_seconds, 3),
+            "wait_seconds_p50": round(_percentile(waits, 50), 3) if waits else 0.0,
+            "wait_seconds_p95": round(_percentile(waits, 95), 3) if waits else 0.0,
+            "wait_seconds_max": round(max(waits), 3) if waits else 0.0,
+        }
+
+    async def acquire(self, tokens: int = 0, session: Optional[str] = None) -> float:
+        """Wait for a request slot and ``tokens``; returns the seconds waited."""
+        loop = self._bind_loop()
+        session = session or _current_session.get()
+        waiter = _Waiter(tokens, loop.create_future(), self._clock())
+        self._queues.setdefault(session, deque()).append(waiter)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+        # Cancelling the caller cancels the future; the dispatcher skips it
+        await waiter.future
+
+        waited = self._clock() - waiter.enqueued
+        self._requests_total += 1
+        self._waits.append(waited)
+        self._wait_seconds += waited
+        if waiter.throttled:
+            self._delayed += 1
+            logger.debug("%s call from session %s waited %.3fs", self.name, session, waited)
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once a call's real usage is known."""
+        if self._tokens is not None:
+            self._tokens.take(actual_tokens - estimated_tokens)
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        # Queues and futures belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._queues.clear()
+            self._dispatcher = None
+        return loop
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        """Head of the next session's queue in round-robin order."""
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            while queue and queue[0].future.done():
+                queue.popleft()  # cancelled while waiting
+            if queue:
+                return queue[0]
+            del self._queues[session]
+        return None
+
+    def _delay(self, waiter: _Waiter) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = self._requests.delay(1)
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.delay(waiter.tokens))
+        return delay
+
+    async def _dispatch(self) -> None:
+        while True:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            delay = self._delay(waiter)
+            if delay > 0:
+                for queue in self._queues.values():
+                    for queued in queue:
+                        queued.throttled = True
+                await self._sleep(delay)
+                continue  # the waiter may have been cancelled meanwhile
+
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(waiter.tokens)
+            session, queue = next(iter(self._queues.items()))
+            queue.popleft()
+            waiter.future.set_result(None)
+            # Served: this session goes to the back of the rotation
+            self._queues.move_to_end(session)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, limit: RateLimit) -> RateLimiter:
+    """The process-wide limiter for model ``name``, shared by every wrapper of it."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None or limiter.limit != limit:
+            if limiter is not None:
+                logger.warning("Replacing %s rate limit %s with %s", name, limiter.limit, limit)
+            limiter = _limiters[name] = RateLimiter(name, limit)
+        return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """``RateLimiter.stats`` of every process-wide limiter, keyed by model."""
+    with _limiters_lock:
+        return {name: limiter.stats for name, limiter in _limiters.items()}
+
+
+class RateLimitedLlm(BaseLlm):
+    """Wraps a model so every call first passes its process-wide rate limiter.
+
+    A call takes one request plus its estimated tokens (prompt estimate and
+    ``expected_output_tokens``); the estimate is corrected from the
+    response's usage metadata when available.
+    """
+
+    inner: BaseLlm
+    limit: RateLimit
+    expected_output_tokens: int = 512
+
+    _limiter: RateLimiter = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._limiter = get_rate_limiter(self.inner.model, self.limit)
+
+    @property
+    def limiter(self) -> RateLimiter:
+        return self._limiter
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimated = estimate_tokens(request_text(llm_request)) + self.expected_output_tokens
+        await self._limiter.acquire(estimated)
+
+        usage = None
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            usage = response.usage_metadata or usage
+            yield response
+        if usage is not None and usage.total_token_count:
+            self._limiter.settle(estimated, usage.total_token_count)
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.inner.connect(llm_request)
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+
+def needs_gemini(llm_request: LlmRequest) -> bool:
+    """Whether the request uses the built-in ``google_search`` tool (Gemini only)."""
+    tools = llm_request.config.tools if llm_request.config is not None else None
+    return any(getattr(tool, "google_search", None) is not None for tool in tools or [])
+
+
+class ProviderHealth:
+    """Rolling latency (time to first response) and failure record of one provider."""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        # True for a call that errored or missed the latency SLO
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.slo_misses = 0
+        self.updated = 0.0
+        self.open_until = 0.0
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def latency(self) -> Optional[float]:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else None
+
+    def reset(self) -> None:
+        self.latencies.clear()
+        self.outcomes.clear()
+
+
+class RoutedLlm(BaseLlm):
+    """Sends each call to the provider currently performing best, with failover.
+
+    ``providers`` are ranked by their rolling mean time to first response,
+    inflated by ``error_penalty`` times their error rate. Until a provider has
+    ``min_samples`` outcomes (at start, after a cooldown, or once its record
+    is older than ``stale_seconds``) it is ranked first, in configured order,
+    so it gets measured. A call that errors, or sends nothing within
+    ``latency_slo_seconds``, is retried on the next provider; once a
+    response has been passed on the call stays where it is. A provider whose
+    error rate exceeds ``max_error_rate`` is skipped for ``cooldown_seconds``.
+    Requests with the built-in ``google_search`` tool only go to ``gemini-``
+    models. Each provider must have a distinct ``model`` name.
+    """
+
+    providers: List[BaseLlm]
+    latency_slo_seconds: Optional[float] = None
+    window: int = 50
+    min_samples: int = 5
+    error_penalty: float = 4.0
+    max_error_rate: float = 0.5
+    cooldown_seconds: float = 30.0
+    stale_seconds: float = 300.0
+
+    _health: Dict[str, ProviderHealth] = PrivateAttr(default_factory=dict)
+    _failovers: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        if not self.providers:
+            raise ValueError("RoutedLlm needs at least one provider")
+        # Health and stats are kept per model name, so names must be unique
+        names = [provider.model for provider in self.providers]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"RoutedLlm providers must have distinct models: {duplicates}")
+        self._health = {provider.model: ProviderHealth(self.window) for provider in self.providers}
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "failovers": self._failovers,
+            "providers": {
+                name: {
+                    "calls": health.calls,
+                    "errors": health.errors,
+                    "slo_misses": health.slo_misses,
+                    "error_rate": round(health.error_rate, 3),
+                    "latency_seconds": (
+                        round(health.latency, 3) if health.latency is not None else None
+                    ),
+                    "open": health.open_until > time.monotonic(),
+                }
+                for name, health in self._health.items()
+            },
+        }
+
+    def ranking(self, llm_request: LlmRequest) -> List[BaseLlm]:
+        """Providers able to serve ``llm_request``, best first."""
+        now = time.monotonic()
+        candidates = []
+        for index, provider in enumerate(self.providers):
+            if needs_gemini(llm_request) and not provider.model.startswith("gemini"):
+                continue
+            health = self._health[provider.model]
+            if health.open_until > now:
+                continue
+            if health.samples and now - health.updated > self.stale_seconds:
+                health.reset()
+            candidates.append((self._score(health), index, provider))
+        if not candidates:
+            # Every eligible provider is cooling down: try them anyway
+            candidates = [
+                (self._score(self._health[p.model]), i, p)
+                for i, p in enumerate(self.providers)
+                if not needs_gemini(llm_request) or p.model.startswith("gemini")
+            ]
+        return [provider for _, _, provider in sorted(candidates, key=lambda c: c[:2])]
+
+    def _score(self, health: ProviderHealth) -> float:
+        if health.samples < self.min_samples or health.latency is None:
+            return -1.0  # cold: measure it first
+        return health.latency * (1 + self.error_penalty * health.error_rate)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        ranked = self.ranking(llm_request)
+        if not ranked:
+            raise ValueError(f"No provider of {self.model} can serve this request")
+
+        for index, provider in enumerate(ranked):
+            last = index == len(ranked) - 1
+            request = llm_request.model_copy(deep=True)
+            request.model = provider.model
+            health = self._health[provider.model]
+            health.calls += 1
+            responses = provider.generate_content_async(request, stream=stream)
+            start = time.monotonic()
+            try:
+                # The last provider has no one to hand over to, so it gets all the time it needs
+                timeout = None if last else self.latency_slo_seconds
+                first = await asyncio.wait_for(responses.__anext__(), timeout)
+            except StopAsyncIteration:
+                self._record(health, time.monotonic() - start, failed=False)
+                return
+            except asyncio.TimeoutError:
+                await responses.aclose()
+                health.slo_misses += 1
+                self._record(health, time.monotonic() - start, failed=True)
+                self._failover(provider, ranked[index + 1], f"no response in {timeout:g}s")
+                continue
+            except Exception as e:
+                await responses.aclose()
+                health.errors += 1
+                self._record(health, time.monotonic() - start, failed=True)
+                if last:
+                    raise
+                self._failover(provider, ranked[index + 1], f"{type(e).__name__}: {e}")
+                continue
+
+            self._record(health, time.monotonic() - start, failed=False)
+            yield first
+            try:
+                async for response in responses:
+                    yield response
+            except Exception:
+                # Too late to fail over; the error still counts against the provider
+                health.errors += 1
+                self._record(health, None, failed=True)
+                raise
+            return
+
+    def _record(self, health: ProviderHealth, latency: Optional[float], failed: bool) -> None:
+        health.updated = time.monotonic()
+        health.outcomes.append(failed)
+        if latency is not None and not failed:
+            health.latencies.append(latency)
+        if (
+            failed
+            and health.samples >= self.min_samples
+            and health.error_rate > self.max_error_rate
+        ):
+            health.open_until = health.updated + self.cooldown_seconds
+            health.reset()
+
+    def _failover(self, provider: BaseLlm, fallback: BaseLlm, reason: str) -> None:
+        self._failovers += 1
+        logger.warning("Failing over from %s to %s: %s", provider.model, fallback.model, reason)
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.ranking(llm_request)[0].connect(llm_request)
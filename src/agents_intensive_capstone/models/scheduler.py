@@ -0,0 +1,369 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.base_llm_connection import BaseLlmConnection
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+from .hedging import _percentile
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, most urgent first. A call is only admitted while no call
+# of its own or a more urgent class is waiting.
+INTERACTIVE = "interactive"
+DEFAULT = "default"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, DEFAULT, BATCH)
+
+# Session state key selecting the priority class of one request
+PRIORITY_KEY = "request_priority"
+
+# Backends with a concurrency cap of their own
+GEMINI = "gemini"
+LITELLM = "litellm"
+
+# Upper bounds (seconds) of the queue wait histogram
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Priority class of the current model call; unset means DEFAULT
+_current_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "request_priority", default=DEFAULT
+)
+
+
+def set_request_priority(priority: str) -> contextvars.Token:
+    """Schedule model calls made from the current context in class ``priority``."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}; choose from {PRIORITIES}")
+    return _current_priority.set(priority)
+
+
+def priority_callback(default: str = DEFAULT) -> Callable[[Any], None]:
+    """``before_agent_callback`` for the root agent that sets the request's class.
+
+    The class comes from the ``request_priority`` session state key, else
+    ``default``. Sub-agents inherit it, like the rate limit session.
+    """
+    if default not in PRIORITIES:
+        raise ValueError(f"Unknown priority {default!r}; choose from {PRIORITIES}")
+
+    def bind_request_priority(callback_context: Any) -> None:
+        priority = callback_context.state.get(PRIORITY_KEY) or default
+        if priority not in PRIORITIES:
+            logger.warning("Unknown request priority %r; using %s", priority, default)
+            priority = default
+        set_request_priority(priority)
+
+    return bind_request_priority
+
+
+def backend_of(model: Any) -> str:
+    """The backend serving ``model``; same rule as ``ModelBuilder.create_model``."""
+    return GEMINI if str(getattr(model, "model", model)).startswith("gemini") else LITELLM
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """Concurrency cap of one backend and the bounds of its wait queues."""
+
+    max_concurrent: int
+    # Waiting calls per priority class; one more is rejected at once
+    max_queue: int = 256
+    # Longest wait for a slot before the call is rejected (None waits indefinitely)
+    queue_timeout_seconds: Optional[float] = None
+
+
+class AdmissionRejected(Exception):
+    """A model call was refused a slot: its queue was full or it waited too long."""
+
+    def __init__(self, backend: str, priority: str, reason: str):
+        super().__init__(f"{backend} rejected a {priority} model call: {reason}")
+        self.backend = backend
+        self.priority = priority
+        self.reason = reason
+
+
+@dataclass
+class _Waiter:
+    future: "asyncio.Future[None]"
+    enqueued: float
+    granted: bool = False
+
+
+class _ClassStats:
+    def __init__(self, window: int):
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+        self.waits: Deque[float] = deque(maxlen=window)
+        self.buckets: List[int] = [0] * len(WAIT_BUCKETS)
+
+    def record(self, waited: float) -> None:
+        self.admitted += 1
+        self.wait_seconds += waited
+        self.waits.append(waited)
+        for i, bound in enumerate(WAIT_BUCKETS):
+            if waited <= bound:
+                self.buckets[i] += 1
+
+
+class AdmissionScheduler:
+    """
+    Priority scheduler and admission control for the model calls of one backend.
+
+    At most ``max_concurrent`` calls run at once. The others wait in one
+    bounded FIFO queue per priority class, and a freed slot goes to the most
+    urgent class waiting, so interactive requests overtake batch jobs. A call
+    whose queue is full is rejected at once with :class:`AdmissionRejected`
+    (backpressure instead of unbounded memory), as is one that waited longer
+    than ``queue_timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        limits: AdmissionLimits,
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 1000,
+    ):
+        if limits.max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        self.backend = backend
+        self.limits = limits
+        self._clock = clock
+        self._active = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+        self._stats = {priority: _ClassStats(window) for priority in PRIORITIES}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def queue_depth(self, priority: Optional[str] = None) -> int:
+        priorities = [priority] if priority else PRIORITIES
+        return sum(
+            sum(1 for waiter in self._queues[p] if not waiter.future.done()) for p in priorities
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for priority, stats in self._stats.items():
+            waits = list(stats.waits)
+            classes[priority] = {
+                "queue_depth": self.queue_depth(priority),
+                "admitted": stats.admitted,
+                "rejected": stats.rejected,
+                "timed_out": stats.timed_out,
+                "wait_seconds_total": round(stats.wait_seconds, 3),
+                "wait_seconds_p50": round(_percentile(waits, 50), 3) if waits else 0.0,
+                "wait_seconds_p95": round(_percentile(waits, 95), 3) if waits else 0.0,
+                "wait_seconds_max": round(max(waits), 3) if waits else 0.0,
+            }
+        return {
+            "max_concurrent": self.limits.max_concurrent,
+            "active": self._active,
+            "priorities": classes,
+        }
+
+    async def acquire(self, priority: Optional[str] = None) -> float:
+        """Wait for a call slot; returns the seconds waited.
+
+        Raises :class:`AdmissionRejected` when the slot cannot be granted.
+        """
+        loop = self._bind_loop()
+        priority = priority or _current_priority.get()
+        stats = self._stats[priority]
+        if self._active < self.limits.max_concurrent and not self._waiting(priority):
+            self._active += 1
+            stats.record(0.0)
+            return 0.0
+
+        queued = self.queue_depth(priority)
+        if queued >= self.limits.max_queue:
+            stats.rejected += 1
+            raise AdmissionRejected(self.backend, priority, f"{queued} calls already queued")
+
+        waiter = _Waiter(loop.create_future(), self._clock())
+        self._queues[priority].append(waiter)
+        try:
+            await asyncio.wait_for(waiter.future, self.limits.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            if waiter.granted:
+                self.release()
+            stats.timed_out += 1
+            raise AdmissionRejected(
+                self.backend,
+                priority,
+                f"no slot within {self.limits.queue_timeout_seconds:g}s",
+            ) from None
+        except asyncio.CancelledError:
+            # Granted while the caller was being cancelled: pass the slot on
+            if waiter.granted:
+                self.release()
+            raise
+
+        waited = self._clock() - waiter.enqueued
+        stats.record(waited)
+        logger.debug("%s %s call waited %.3fs for a slot", self.backend, priority, waited)
+        return waited
+
+    def release(self) -> None:
+        """Frees the slot of a finished call and admits the next waiting one."""
+        self._active = max(0, self._active - 1)
+        while self._active < self.limits.max_concurrent:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._active += 1
+            waiter.granted = True
+            waiter.future.set_result(None)
+
+    def wait_histogram(self, priority: str) -> Tuple[List[int], float, int]:
+        """Cumulative ``WAIT_BUCKETS`` counts, summed wait and admitted calls of a class."""
+        stats = self._stats[priority]
+        return list(stats.buckets), stats.wait_seconds, stats.admitted
+
+    def _waiting(self, priority: str) -> bool:
+        """Whether a call of ``priority`` or a more urgent class is queued."""
+        urgent = PRIORITIES[: PRIORITIES.index(priority) + 1]
+        return any(self.queue_depth(p) for p in urgent)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.future.done():  # skips cancelled and timed out calls
+                    return waiter
+        return None
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        # Queues and futures belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._active = 0
+            for queue in self._queues.values():
+                queue.clear()
+        return loop
+
+
+_schedulers: Dict[str, AdmissionScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(backend: str, limits: AdmissionLimits) -> AdmissionScheduler:
+    """The process-wide scheduler of ``backend``, shared by every model it serves."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(backend)
+        if scheduler is None or scheduler.limits != limits:
+            if scheduler is not None:
+                logger.warning(
+                    "Replacing %s admission limits %s with %s", backend, scheduler.limits, limits
+                )
+            scheduler = _schedulers[backend] = AdmissionScheduler(backend, limits)
+        return scheduler
+
+
+def scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    """``AdmissionScheduler.stats`` of every process-wide scheduler, keyed by backend."""
+    with _schedulers_lock:
+        return {backend: scheduler.stats for backend, scheduler in _schedulers.items()}
+
+
+def scheduler_prometheus_text() -> str:
+    """Queue depth, admission and wait-time metrics in the Prometheus text format."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    lines: List[str] = []
+
+    def family(metric: str, kind: str, help_text: str) -> None:
+        lines.extend([f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"])
+
+    family("sixhats_scheduler_active_calls", "gauge", "Model calls running per backend.")
+    for scheduler in schedulers:
+        lines.append(
+            f'sixhats_scheduler_active_calls{{backend="{scheduler.backend}"}} {scheduler.active}'
+        )
+    family("sixhats_scheduler_queue_depth", "gauge", "Model calls waiting for a slot.")
+    for scheduler in schedulers:
+        for priority in PRIORITIES:
+            labels = f'backend="{scheduler.backend}",priority="{priority}"'
+            lines.append(
+                f"sixhats_scheduler_queue_depth{{{labels}}} {scheduler.queue_depth(priority)}"
+            )
+    for name, help_text in (
+        ("admitted", "Model calls given a slot."),
+        ("rejected", "Model calls rejected because their queue was full."),
+        ("timed_out", "Model calls rejected after waiting too long for a slot."),
+    ):
+        metric = f"sixhats_scheduler_{name}_total"
+        family(metric, "counter", help_text)
+        for scheduler in schedulers:
+            for priority, stats in scheduler.stats["priorities"].items():
+                labels = f'backend="{scheduler.backend}",priority="{priority}"'
+                lines.append(f"{metric}{{{labels}}} {stats[name]}")
+
+    metric = "sixhats_scheduler_wait_seconds"
+    family(metric, "histogram", "Time admitted model calls waited for a slot.")
+    for scheduler in schedulers:
+        for priority in PRIORITIES:
+            labels = f'backend="{scheduler.backend}",priority="{priority}"'
+            buckets, total, count = scheduler.wait_histogram(priority)
+            for bound, bucket in zip(WAIT_BUCKETS, buckets, strict=True):
+                lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {bucket}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{metric}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n" if schedulers else ""
+
+
+class ScheduledLlm(BaseLlm):
+    """Wraps a model so every call first gets a slot from its backend's scheduler.
+
+    The slot is held until the (possibly streamed) response is complete. The
+    priority class is the one bound to the current request, see
+    :func:`priority_callback`.
+    """
+
+    inner: BaseLlm
+    backend: str
+    limits: AdmissionLimits
+
+    _scheduler: AdmissionScheduler = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._scheduler = get_scheduler(self.backend, self.limits)
+
+    @property
+    def scheduler(self) -> AdmissionScheduler:
+        return self._scheduler
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await self._scheduler.acquire()
+        try:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+        finally:
+            self._scheduler.release()
+
+    def connect(
+        self, llm_request: LlmRequest
+    ) -> AbstractAsyncContextManager[BaseLlmConnection]:
+        return self.inner.connect(llm_request)
@@ -0,0 +1,171 @@
+import asyncio
+import itertools
+import logging
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+from .tokens import estimate_tokens, request_text
+
+logger = logging.getLogger(__name__)
+
+_FILLER_WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel")
+
+
+class StubModelError(RuntimeError):
+    """Injected failure raised by :class:`StubLlm`."""
+
+    def __init__(self, code: int, message: str = "Injected stub model failure"):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Per-call latency in seconds.
+
+    ``kind`` is one of ``constant`` (always ``mean``), ``uniform``
+    (``mean`` +/- ``spread``), ``normal`` (stddev ``spread``) or
+    ``lognormal`` (median ``mean``, sigma ``spread``) for realistic tails.
+    """
+
+    kind: str = "constant"
+    mean: float = 0.0
+    spread: float = 0.0
+
+    @classmethod
+    def constant(cls, seconds: float) -> "LatencyDistribution":
+        return cls("constant", seconds)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "LatencyDistribution":
+        return cls("uniform", (low + high) / 2, (high - low) / 2)
+
+    @classmethod
+    def normal(cls, mean: float, stddev: float) -> "LatencyDistribution":
+        return cls("normal", mean, stddev)
+
+    @classmethod
+    def lognormal(cls, median: float, sigma: float) -> "LatencyDistribution":
+        return cls("lognormal", median, sigma)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            value = self.mean
+        elif self.kind == "uniform":
+            value = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            value = rng.gauss(self.mean, self.spread)
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(self.mean), self.spread) if self.mean > 0 else 0.0
+        else:
+            raise ValueError(f"Unknown latency distribution {self.kind!r}")
+        return max(0.0, value)
+
+
+@dataclass(frozen=True)
+class StubCall:
+    """Record of one call served (or failed) by a StubLlm."""
+
+    latency: float
+    input_tokens: int
+    output_tokens: int
+    failed: bool
+
+
+class StubLlm(BaseLlm):
+    """Deterministic, offline stand-in for ``Gemini``/``LiteLlm``.
+
+    Accepted anywhere ``ModelBuilder.create_gemini()`` output is. The default
+    model name starts with ``gemini-`` so ADK built-in tools such as
+    ``google_search`` accept it; the stub itself never issues tool calls and
+    answers every request with filler text of ``output_tokens`` words.
+    """
+
+    model: str = "gemini-stub"
+    latency: LatencyDistribution = LatencyDistribution()
+    # Fraction of the sampled latency spent before the first streamed chunk.
+    first_token_fraction: float = 0.3
+    output_tokens: int = 64
+    stream_chunks: int = 4
+    failure_rate: float = 0.0
+    failure_code: int = 503
+    seed: Optional[int] = 0
+    responder: Optional[Callable[[LlmRequest], str]] = None
+
+    _rng: random.Random = PrivateAttr()
+    _counter: itertools.count = PrivateAttr(default_factory=itertools.count)
+    _calls: List[StubCall] = PrivateAttr(default_factory=list)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"stub-.*", r"gemini-stub.*"]
+
+    @property
+    def calls(self) -> List[StubCall]:
+        return list(self._calls)
+
+    def reset(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._counter = itertools.count()
+        self._calls.clear()
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        call_index = next(self._counter)
+        latency = self.latency.sample(self._rng)
+        failed = self._rng.random() < self.failure_rate
+        input_tokens = estimate_tokens(request_text(llm_request))
+
+        if failed:
+            await asyncio.sleep(latency)
+            self._calls.append(StubCall(latency, input_tokens, 0, True))
+            logger.debug("Stub call %d failed after %.3fs", call_index, latency)
+            raise StubModelError(self.failure_code)
+
+        text = self._render(llm_request, call_index)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=input_tokens,
+            candidates_token_count=self.output_tokens,
+            total_token_count=input_tokens + self.output_tokens,
+        )
+
+        if stream and self.stream_chunks > 1:
+            words = text.split(" ")
+            size = math.ceil(len(words) / self.stream_chunks)
+            chunks = [" ".join(words[i : i + size]) for i in range(0, len(words), size)]
+            first = latency * self.first_token_fraction
+            rest = (latency - first) / max(1, len(chunks) - 1)
+            for i, chunk in enumerate(chunks):
+                await asyncio.sleep(first if i == 0 else rest)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk + " ")]),
+                    partial=True,
+                )
+        else:
+            await asyncio.sleep(latency)
+
+        self._calls.append(StubCall(latency, input_tokens, self.output_tokens, False))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=usage,
+        )
+
+    def _render(self, llm_request: LlmRequest, call_index: int) -> str:
+        if self.responder is not None:
+            return self.responder(llm_request)
+        filler = itertools.islice(itertools.cycle(_FILLER_WORDS), self.output_tokens)
+        return f"Stub response {call_index} from {self.model}: " + " ".join(filler)
+
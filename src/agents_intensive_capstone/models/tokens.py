@@ -0,0 +1,32 @@
+import math
+
+from google.adk.models.llm_request import LlmRequest
+
+# Rough characters-per-token ratio for English prose across Gemini/GPT tokenizers.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, provider-agnostic token estimate used where no tokenizer is available."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def request_text(llm_request: LlmRequest) -> str:
+    """Concatenate the rendered instruction and the text parts of the request contents.
+
+    Used both for token estimates and as the cache key input. The rendered
+    instruction matters for agents whose prompt is templated from session
+    state (e.g. the incremental Blue Hat), where the contents alone do not
+    identify the request. Thought parts are skipped.
+    """
+    chunks = []
+    system_instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(system_instruction, str):
+        chunks.append(system_instruction)
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.text and not part.thought:
+                chunks.append(part.text)
+    return "\n".join(chunks)
@@ -0,0 +1,5 @@
+"""ADK runner plugins for the Six Hats pipeline."""
+
+from .instrumentation import InstrumentationPlugin, Span, start_metrics_server
+
+__all__ = ["InstrumentationPlugin", "Span", "start_metrics_server"]
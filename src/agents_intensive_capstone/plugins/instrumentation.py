@@ -0,0 +1,528 @@
+import copy
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.tool_context import ToolContext
+
+from agents_intensive_capstone.models.pricing import ModelPrice, estimate_cost
+from agents_intensive_capstone.models.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Runs still open after this long are assumed dead (e.g. cancelled, which
+# skips every run callback) and their spans are closed by the next run.
+MAX_RUN_SECONDS = 3600.0
+
+# Output key of the answer shown to the user; a run's time-to-first-token is
+# the time until the first chunk of the model call writing it.
+FINAL_OUTPUT_KEY = "blue_hat_final_plan"
+
+
+@dataclass
+class Span:
+    """One timed unit of work: a run, an agent, a model call or a tool call."""
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    kind: str
+    name: str
+    agent_name: str
+    output_key: Optional[str]
+    start_time: float
+    duration: Optional[float] = None
+    # Time the step waited to start: since the run started (agents) or since
+    # the agent's previous step ended (model and tool calls).
+    queue_time: Optional[float] = None
+    status: str = "ok"
+    model: Optional[str] = None
+    # Model calls: until the first response chunk. Runs: until the first
+    # chunk of the final answer.
+    time_to_first_token: Optional[float] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tokens_estimated: bool = False
+    cost_usd: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _t0: float = field(default=0.0, repr=False)
+
+
+@dataclass
+class Aggregate:
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    queue_seconds: float = 0.0
+    ttft_seconds: float = 0.0
+    ttft_count: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    ttft_buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def add(self, span: Span) -> None:
+        self.count += 1
+        self.errors += span.status != "ok"
+        self.seconds += span.duration or 0.0
+        self.queue_seconds += span.queue_time or 0.0
+        self.ttft_seconds += span.time_to_first_token or 0.0
+        self.input_tokens += span.input_tokens
+        self.output_tokens += span.output_tokens
+        self.cost_usd += span.cost_usd
+        # Cumulative buckets, as in the Prometheus histogram format.
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if (span.duration or 0.0) <= bound:
+                self.buckets[i] += 1
+        if span.time_to_first_token is not None:
+            self.ttft_count += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if span.time_to_first_token <= bound:
+                    self.ttft_buckets[i] += 1
+
+
+class InstrumentationPlugin(BasePlugin):
+    """
+    Records spans for every run, agent, model call and tool call.
+
+    Usable like ``LoggingPlugin``::
+
+        metrics = InstrumentationPlugin(trace_path="traces.jsonl")
+        runner = InMemoryRunner(agent=root_agent, plugins=[metrics])
+
+    Finished spans are appended to ``trace_path`` (JSONL) when given and kept
+    in a bounded in-memory buffer. Totals are aggregated per
+    ``(kind, output_key, name, model)`` and rendered by :meth:`prometheus_text`
+    or served over HTTP with :func:`start_metrics_server`.
+
+    Run spans get a time-to-first-token too: the time until the first chunk
+    of the model call writing ``final_output_key`` (the Blue Hat's plan). It
+    reflects what users wait for only when the run streams
+    (``StreamingMode.SSE``, as ``PlanStreamer`` does).
+    """
+
+    def __init__(
+        self,
+        name: str = "instrumentation",
+        prices: Optional[Dict[str, ModelPrice]] = None,
+        trace_path: Optional[str] = None,
+        max_spans: int = 10_000,
+        final_output_key: Optional[str] = FINAL_OUTPUT_KEY,
+    ):
+        super().__init__(name=name)
+        self.prices = prices
+        self.final_output_key = final_output_key
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self._trace_file: Optional[IO[str]] = (
+            open(trace_path, "a", encoding="utf-8") if trace_path else None
+        )
+        self._lock = threading.Lock()
+        self._aggregates: Dict[Tuple[str, str, str, str], Aggregate] = {}
+        self._open: Dict[Tuple[str, ...], Span] = {}
+        self._last_step_end: Dict[Tuple[str, str], float] = {}
+        self._output_keys: Dict[str, Optional[str]] = {}
+
+    # ------------------------------------------------------------------
+    # Span bookkeeping
+    # ------------------------------------------------------------------
+
+    def _start(
+        self,
+        key: Tuple[str, ...],
+        kind: str,
+        name: str,
+        trace_id: str,
+        agent_name: str,
+        parent: Optional[Span],
+        queue_time: Optional[float] = None,
+        **attributes: Any,
+    ) -> Span:
+        span = Span(
+            trace_id=trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            name=name,
+            agent_name=agent_name,
+            output_key=self._output_keys.get(agent_name),
+            start_time=time.time(),
+            queue_time=queue_time,
+            attributes=attributes,
+            _t0=time.perf_counter(),
+        )
+        self._open[key] = span
+        return span
+
+    def _finish(self, key: Tuple[str, ...], status: str = "ok") -> Optional[Span]:
+        span = self._open.pop(key, None)
+        if span is None:
+            return None
+        now = time.perf_counter()
+        span.duration = now - span._t0
+        span.status = status
+        if span.kind in ("model", "tool"):
+            self._last_step_end[(span.trace_id, span.agent_name)] = now
+        self._record(span)
+        return span
+
+    def _record(self, span: Span) -> None:
+        agg_key = (span.kind, span.output_key or "", span.name, span.model or "")
+        with self._lock:
+            self.spans.append(span)
+            self._aggregates.setdefault(agg_key, Aggregate()).add(span)
+        if self._trace_file is not None:
+            record = asdict(span)
+            record.pop("_t0")
+            self._trace_file.write(json.dumps(record) + "\n")
+            self._trace_file.flush()
+
+    def _queue_time(self, trace_id: str, agent_name: str) -> Optional[float]:
+        since = self._last_step_end.get((trace_id, agent_name))
+        if since is None:
+            agent_span = self._open.get(("agent", trace_id, agent_name))
+            since = agent_span._t0 if agent_span else None
+        return None if since is None else time.perf_counter() - since
+
+    # ------------------------------------------------------------------
+    # Run & agent callbacks
+    # ------------------------------------------------------------------
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self._sweep_stale_runs()
+        root = invocation_context.agent
+        if root is None:
+            return
+        self._output_keys[root.name] = getattr(root, "output_key", None)
+        self._start(
+            ("run", invocation_context.invocation_id),
+            "run",
+            root.name,
+            invocation_context.invocation_id,
+            root.name,
+            parent=None,
+            session_id=invocation_context.session.id,
+        )
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self._end_run(invocation_context.invocation_id)
+
+    async def on_run_error_callback(
+        self, *, invocation_context: InvocationContext, error: Exception
+    ) -> None:
+        # ADK skips after_run_callback for failed runs
+        run = self._open.get(("run", invocation_context.invocation_id))
+        if run is not None:
+            run.attributes["error"] = repr(error)
+        self._end_run(invocation_context.invocation_id, status="error")
+
+    def _end_run(self, invocation_id: str, status: str = "ok") -> None:
+        """Finish a run's span and whatever it left open, and forget its steps."""
+        for key in [k for k in self._open if k[1] == invocation_id and k[0] != "run"]:
+            self._finish(key, status="unfinished")
+        self._finish(("run", invocation_id), status=status)
+        for key in [k for k in self._last_step_end if k[0] == invocation_id]:
+            del self._last_step_end[key]
+
+    def _sweep_stale_runs(self) -> None:
+        now = time.perf_counter()
+        stale = [
+            key[1]
+            for key, span in self._open.items()
+            if key[0] == "run" and now - span._t0 > MAX_RUN_SECONDS
+        ]
+        for invocation_id in stale:
+            logger.warning("Closing the spans of run %s, open for too long", invocation_id)
+            self._end_run(invocation_id, status="abandoned")
+
+    async def before_agent_callback(
+        self, *, agent: Any, callback_context: CallbackContext
+    ) -> None:
+        trace_id = callback_context.invocation_id
+        self._output_keys[agent.name] = getattr(agent, "output_key", None)
+        parent_span = (
+            self._open.get(("agent", trace_id, agent.parent_agent.name))
+            if agent.parent_agent
+            else None
+        )
+        parent = parent_span or self._open.get(("run", trace_id))
+        run = self._open.get(("run", trace_id))
+        self._start(
+            ("agent", trace_id, agent.name),
+            "agent",
+            agent.name,
+            trace_id,
+            agent.name,
+            parent=parent,
+            queue_time=time.perf_counter() - run._t0 if run else None,
+        )
+        self._last_step_end.pop((trace_id, agent.name), None)
+
+    async def after_agent_callback(
+        self, *, agent: Any, callback_context: CallbackContext
+    ) -> None:
+        trace_id = callback_context.invocation_id
+        # A before_model_callback (e.g. a cache hit) may have short-circuited the call.
+        self._finish(("model", trace_id, agent.name), status="short_circuit")
+        self._finish(("agent", trace_id, agent.name))
+
+    async def on_agent_error_callback(
+        self, *, agent: Any, callback_context: CallbackContext, error: Exception
+    ) -> None:
+        trace_id = callback_context.invocation_id
+        self._finish(("model", trace_id, agent.name), status="error")
+        self._finish(("agent", trace_id, agent.name), status="error")
+
+    # ------------------------------------------------------------------
+    # Model callbacks
+    # ------------------------------------------------------------------
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        trace_id, agent_name = callback_context.invocation_id, callback_context.agent_name
+        key = ("model", trace_id, agent_name)
+        self._finish(key, status="short_circuit")
+        span = self._start(
+            key,
+            "model",
+            llm_request.model or "unknown",
+            trace_id,
+            agent_name,
+            parent=self._open.get(("agent", trace_id, agent_name)),
+            queue_time=self._queue_time(trace_id, agent_name),
+        )
+        span.model = llm_request.model
+        span.attributes["prompt_chars"] = sum(
+            len(part.text or "") for c in llm_request.contents or [] for part in c.parts or []
+        )
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        span = self._open.get(key)
+        if span is None:
+            return
+        if span.time_to_first_token is None:
+            span.time_to_first_token = time.perf_counter() - span._t0
+            run = self._open.get(("run", callback_context.invocation_id))
+            if (
+                run is not None
+                and run.time_to_first_token is None
+                and span.output_key
+                and span.output_key == self.final_output_key
+            ):
+                run.time_to_first_token = time.perf_counter() - run._t0
+        if llm_response.partial:
+            return
+
+        usage = llm_response.usage_metadata
+        if usage is not None and usage.prompt_token_count is not None:
+            span.input_tokens = usage.prompt_token_count or 0
+            span.output_tokens = usage.candidates_token_count or 0
+        else:
+            text = "".join(
+                part.text or ""
+                for part in (llm_response.content.parts if llm_response.content else None) or []
+            )
+            prompt_chars = span.attributes.get("prompt_chars", 0)
+            span.input_tokens = math.ceil(prompt_chars / CHARS_PER_TOKEN)
+            span.output_tokens = estimate_tokens(text)
+            span.tokens_estimated = True
+        span.cost_usd = estimate_cost(
+            span.model or "", span.input_tokens, span.output_tokens, self.prices
+        )
+        self._finish(key, status="error" if llm_response.error_code else "ok")
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> None:
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        span = self._open.get(key)
+        if span is not None:
+            span.attributes["error"] = repr(error)
+        self._finish(key, status="error")
+
+    # ------------------------------------------------------------------
+    # Tool callbacks
+    # ------------------------------------------------------------------
+
+    async def before_tool_callback(
+        self, *, tool: Any, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> None:
+        trace_id, agent_name = tool_context.invocation_id, tool_context.agent_name
+        self._start(
+            ("tool", trace_id, agent_name, tool_context.function_call_id or tool.name),
+            "tool",
+            tool.name,
+            trace_id,
+            agent_name,
+            parent=self._open.get(("agent", trace_id, agent_name)),
+            queue_time=self._queue_time(trace_id, agent_name),
+        )
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: Any,
+        tool_args: Dict[str, Any],
+        tool_context: ToolContext,
+        result: Dict[str, Any],
+    ) -> None:
+        self._finish(
+            ("tool", tool_context.invocation_id, tool_context.agent_name,
+             tool_context.function_call_id or tool.name)
+        )
+
+    async def on_tool_error_callback(
+        self,
+        *,
+        tool: Any,
+        tool_args: Dict[str, Any],
+        tool_context: ToolContext,
+        error: Exception,
+    ) -> None:
+        self._finish(
+            ("tool", tool_context.invocation_id, tool_context.agent_name,
+             tool_context.function_call_id or tool.name),
+            status="error",
+        )
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per ``output_key`` (agents without one are keyed by name)."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            items = list(self._aggregates.items())
+        for (kind, output_key, name, _), agg in items:
+            if kind == "run":
+                continue
+            entry = totals.setdefault(
+                output_key or name,
+                {"agent_seconds": 0.0, "model_seconds": 0.0, "tool_seconds": 0.0,
+                 "model_calls": 0, "tool_calls": 0, "input_tokens": 0,
+                 "output_tokens": 0, "cost_usd": 0.0},
+            )
+            entry[f"{kind}_seconds"] += agg.seconds
+            if kind in ("model", "tool"):
+                entry[f"{kind}_calls"] += agg.count
+            entry["input_tokens"] += agg.input_tokens
+            entry["output_tokens"] += agg.output_tokens
+            entry["cost_usd"] += agg.cost_usd
+        return totals
+
+    def export_jsonl(self, fh: IO[str]) -> int:
+        """Write the buffered spans to ``fh``; returns the number written."""
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            record = asdict(span)
+            record.pop("_t0")
+            fh.write(json.dumps(record) + "\n")
+        return len(spans)
+
+    def prometheus_text(self) -> str:
+        """Aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            items = copy.deepcopy(list(self._aggregates.items()))
+
+        lines = [
+            "# HELP sixhats_span_seconds Duration of runs, agents, model and tool calls.",
+            "# TYPE sixhats_span_seconds histogram",
+        ]
+        for (kind, output_key, name, model), agg in items:
+            labels = _labels(kind=kind, output_key=output_key, name=name, model=model)
+            for bound, count in zip(LATENCY_BUCKETS, agg.buckets, strict=True):
+                lines.append(f'sixhats_span_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'sixhats_span_seconds_bucket{{{labels},le="+Inf"}} {agg.count}')
+            lines.append(f"sixhats_span_seconds_sum{{{labels}}} {agg.seconds:.6f}")
+            lines.append(f"sixhats_span_seconds_count{{{labels}}} {agg.count}")
+
+        lines.append(
+            "# HELP sixhats_time_to_first_token_seconds Time to the first model chunk; "
+            "for runs, to the first chunk of the final answer."
+        )
+        lines.append("# TYPE sixhats_time_to_first_token_seconds histogram")
+        for (kind, output_key, name, model), agg in items:
+            if not agg.ttft_count:
+                continue
+            labels = _labels(kind=kind, output_key=output_key, name=name, model=model)
+            metric = "sixhats_time_to_first_token_seconds"
+            for bound, count in zip(LATENCY_BUCKETS, agg.ttft_buckets, strict=True):
+                lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {agg.ttft_count}')
+            lines.append(f"{metric}_sum{{{labels}}} {agg.ttft_seconds:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {agg.ttft_count}")
+
+        for metric, help_text, attr in (
+            ("sixhats_span_errors_total", "Spans that ended in an error.", "errors"),
+            ("sixhats_queue_seconds_total", "Time steps waited before starting.", "queue_seconds"),
+            ("sixhats_ttft_seconds_total", "Summed model time-to-first-token.", "ttft_seconds"),
+            ("sixhats_input_tokens_total", "Model input tokens.", "input_tokens"),
+            ("sixhats_output_tokens_total", "Model output tokens.", "output_tokens"),
+            ("sixhats_cost_usd_total", "Estimated model cost in USD.", "cost_usd"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (kind, output_key, name, model), agg in items:
+                labels = _labels(kind=kind, output_key=output_key, name=name, model=model)
+                lines.append(f"{metric}{{{labels}}} {getattr(agg, attr):g}")
+        return "\n".join(lines) + "\n"
+
+    async def close(self) -> None:
+        """Closes the trace file; ADK awaits this from ``Runner.close()``."""
+        if self._trace_file is not None:
+            self._trace_file.close()
+            self._trace_file = None
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def start_metrics_server(
+    plugin: InstrumentationPlugin, port: int = 9464, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """Serve ``plugin.prometheus_text()`` at ``/metrics`` from a daemon thread."""
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = plugin.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug("metrics: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, port)
+    return server
@@ -1,5 +1,13 @@
 """Prompt‑loading utilities for the agents_intensive_capstone package."""
 
-from .loader import load_prompt_text
+from .loader import load_prompt_text, preload_prompts
+from .registry import Prompt, PromptRegistry, get_registry, set_registry
 
-__all__ = ["load_prompt_text"]
\ No newline at end of file
+__all__ = [
+    "Prompt",
+    "PromptRegistry",
+    "get_registry",
+    "load_prompt_text",
+    "preload_prompts",
+    "set_registry",
+]
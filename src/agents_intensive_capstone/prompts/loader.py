@@ -1,11 +1,23 @@
 import logging
-from importlib import resources
+from typing import Dict
+
+from .registry import get_registry
 
 logger = logging.getLogger(__name__)
 
+def preload_prompts() -> Dict[str, str]:
+    """Load the prompt registry (every bundled prompt, in one pass).
+
+    Returns a ``{filename: text}`` snapshot of the registry.
+    """
+    return {name: prompt.text for name, prompt in get_registry().prompts.items()}
+
 def load_prompt_text(filename: str) -> str:
     """Load a prompt from the bundled ``agents_intensive_capstone.prompts`` package.
 
+    Prompts are served from the in-memory :class:`PromptRegistry`; files are
+    only read when the registry is first built or reloaded.
+
     Raises
     ------
     FileNotFoundError
@@ -13,10 +25,10 @@ def load_prompt_text(filename: str) -> str:
     RuntimeError
         For any other I/O problem.
     """
-    logger.info("Attempting to load prompt %r", filename)
+    logger.debug("Attempting to load prompt %r", filename)
 
     try:
-        text = resources.read_text(__package__, filename, encoding="utf-8").strip()
+        text = get_registry().text(filename)
         logger.debug("Prompt %r loaded (length=%d)", filename, len(text))
         return text
     except FileNotFoundError as exc:
@@ -32,4 +44,4 @@ def load_prompt_text(filename: str) -> str:
             exc,
             exc_info=True,
         )
-        raise RuntimeError(f"Failed to load prompt '{filename}'") from exc
\ No newline at end of file
+        raise RuntimeError(f"Failed to load prompt '{filename}'") from exc
@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import os
+import pathlib
+import threading
+from dataclasses import dataclass
+from importlib import resources
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# Directory whose *.txt files override (or add to) the bundled prompts
+PROMPT_DIR_ENV = "SIX_HATS_PROMPT_DIR"
+# Poll interval in seconds for hot reloading that directory (unset: no watching)
+PROMPT_WATCH_ENV = "SIX_HATS_PROMPT_WATCH_SECONDS"
+
+PROMPT_SUFFIX = ".txt"
+
+
+@dataclass(frozen=True)
+class Prompt:
+    name: str
+    text: str
+    # sha256 of ``text``; stable across processes, so usable as a cache key
+    # and to recognise a shared prompt prefix
+    sha256: str
+    source: str
+
+
+def make_prompt(name: str, raw: str, source: str) -> Prompt:
+    text = raw.strip()
+    return Prompt(name, text, hashlib.sha256(text.encode("utf-8")).hexdigest(), source)
+
+
+class PromptRegistry:
+    """
+    Every prompt of the package, read once into an immutable in-memory map.
+
+    Files in ``override_dir`` replace bundled prompts of the same name.
+    :meth:`reload` re-reads that directory and atomically swaps in a new map;
+    :meth:`watch` does so in the background whenever a file there changes,
+    so prompts can be edited without restarting the process.
+    """
+
+    def __init__(self, override_dir: Optional[str] = None):
+        self.override_dir = override_dir
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._bundled = self._read_bundled()
+        self._mtimes = self._override_mtimes()
+        self._prompts = self._build()
+        logger.info("Prompt registry loaded %d prompts", len(self._prompts))
+
+    @property
+    def prompts(self) -> Mapping[str, Prompt]:
+        return self._prompts
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def get(self, name: str) -> Prompt:
+        try:
+            return self._prompts[name]
+        except KeyError:
+            raise FileNotFoundError(f"Unknown prompt {name!r}") from None
+
+    def text(self, name: str) -> str:
+        return self.get(name).text
+
+    def hash(self, name: str) -> str:
+        return self.get(name).sha256
+
+    def instruction_provider(self, name: str, suffix: str = "") -> Callable[[Any], Any]:
+        """An ADK ``InstructionProvider`` that always renders the current text.
+
+        Session state placeholders (``{key?}``) are injected just as ADK does
+        for plain string instructions. ``suffix`` is appended to the text.
+        """
+        from google.adk.utils import instructions_utils
+
+        self.get(name)  # fail at build time for unknown prompts
+
+        async def provide(readonly_context: Any) -> str:
+            return await instructions_utils.inject_session_state(
+                self.text(name) + suffix, readonly_context
+            )
+
+        return provide
+
+    def on_change(self, listener: Callable[[List[str]], None]) -> None:
+        """Call ``listener(changed_names)`` after every reload that changed a prompt."""
+        self._listeners.append(listener)
+
+    def reload(self) -> List[str]:
+        """Re-read the override directory; returns the names whose text changed."""
+        with self._lock:
+            old = self._prompts
+            self._mtimes = self._override_mtimes()
+            new = self._build()
+            changed = sorted(
+                name
+                for name in set(old) | set(new)
+                if getattr(old.get(name), "sha256", None)
+                != getattr(new.get(name), "sha256", None)
+            )
+            self._prompts = new
+
+        if changed:
+            logger.info("Reloaded prompts: %s", ", ".join(changed))
+            for listener in self._listeners:
+                listener(changed)
+        return changed
+
+    def watch(self, interval: float = 1.0) -> None:
+        """Poll the override directory every ``interval`` seconds and reload on change."""
+        if self.override_dir is None:
+            raise ValueError("Hot reload needs an override_dir to watch")
+        if self.watching:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="prompt-registry-watch", daemon=True
+        )
+        self._watcher.start()
+        logger.info("Watching %s for prompt changes every %gs", self.override_dir, interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                if self._override_mtimes() != self._mtimes:
+                    self.reload()
+            except OSError:
+                logger.warning(
+                    "Could not reload prompts from %s", self.override_dir, exc_info=True
+                )
+
+    def _read_bundled(self) -> Dict[str, Prompt]:
+        prompts = {}
+        for entry in resources.files(__package__).iterdir():
+            if entry.name.endswith(PROMPT_SUFFIX):
+                prompts[entry.name] = make_prompt(
+                    entry.name, entry.read_text(encoding="utf-8"), "bundled"
+                )
+        return prompts
+
+    def _override_files(self) -> List[pathlib.Path]:
+        if self.override_dir is None:
+            return []
+        return sorted(pathlib.Path(self.override_dir).glob(f"*{PROMPT_SUFFIX}"))
+
+    def _override_mtimes(self) -> Dict[str, int]:
+        return {path.name: path.stat().st_mtime_ns for path in self._override_files()}
+
+    def _build(self) -> Mapping[str, Prompt]:
+        prompts = dict(self._bundled)
+        for path in self._override_files():
+            prompts[path.name] = make_prompt(
+                path.name, path.read_text(encoding="utf-8"), str(path)
+            )
+        return MappingProxyType(prompts)
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> PromptRegistry:
+    """The process-wide registry, configured from the environment on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            registry = PromptRegistry(override_dir=os.environ.get(PROMPT_DIR_ENV) or None)
+            interval = os.environ.get(PROMPT_WATCH_ENV)
+            if interval and registry.override_dir:
+                registry.watch(float(interval))
+            _registry = registry
+    return _registry
+
+
+def set_registry(registry: Optional[PromptRegistry]) -> None:
+    """Install ``registry`` as the process-wide one (None: rebuild on next use)."""
+    global _registry
+    with _registry_lock:
+        if _registry is not None and _registry is not registry:
+            _registry.stop()
+        _registry = registry
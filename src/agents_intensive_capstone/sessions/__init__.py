@@ -0,0 +1,5 @@
+"""Durable ADK session services for the Six Hats pipeline."""
+
+from .sqlite_session_service import SqliteSessionService
+
+__all__ = ["SqliteSessionService"]
@@ -0,0 +1,467 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# Buffered events of one session are written once the buffer reaches this size,
+# even if the agent turn is still running
+MAX_BATCH_EVENTS = 64
+
+# Idle buffers are flushed and expired sessions deleted at most this often
+# (seconds), checked on session creation
+SWEEP_INTERVAL_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS sessions_update_time ON sessions (update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+_SessionKey = Tuple[str, str, str]
+
+
+def split_state(state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state (delta) into app, user and session parts; ``temp:`` keys are dropped.
+
+    App and user keys lose their prefix, as ADK's own session services store them.
+    """
+    app, user, session = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def merge_state(
+    app: Dict[str, Any], user: Dict[str, Any], session: Dict[str, Any]
+) -> Dict[str, Any]:
+    merged = dict(session)
+    merged.update({State.APP_PREFIX + key: value for key, value in app.items()})
+    merged.update({State.USER_PREFIX + key: value for key, value in user.items()})
+    return merged
+
+
+@dataclass
+class _PendingTurn:
+    """Writes of one session buffered until its agent turn ends."""
+
+    events: List[Event] = field(default_factory=list)
+    app_delta: Dict[str, Any] = field(default_factory=dict)
+    user_delta: Dict[str, Any] = field(default_factory=dict)
+    state: Dict[str, Any] = field(default_factory=dict)
+    update_time: float = 0.0
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Durable ADK session service backed by SQLite (WAL mode).
+
+    Usable wherever ``InMemorySessionService`` is, e.g.
+    ``Runner(agent=root_agent, app_name=..., session_service=SqliteSessionService(path))``.
+
+    - Events are buffered per session and written in one transaction when an
+      agent's final response arrives (once per agent turn instead of per event),
+      when ``MAX_BATCH_EVENTS`` are pending, or on :meth:`flush` (run by
+      ``Runner.close``), :meth:`flush_pending` and :meth:`close`. Reads of a
+      session flush its buffer first.
+    - Nothing but those buffers is kept in memory. :meth:`get_session` loads
+      at most ``event_window`` recent events (None: all, as ADK expects);
+      :meth:`load_older_events` fetches earlier ones on demand.
+    - Sessions idle for longer than ``ttl_seconds`` are treated as finished:
+      they are not returned and are deleted by periodic sweeps.
+      :meth:`compact` trims old events, whose state is already materialized.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = None,
+        event_window: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.event_window = event_window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: Dict[_SessionKey, _PendingTurn] = {}
+        self._last_sweep = clock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps committed transactions durable across process crashes
+        # without an fsync per commit
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # BaseSessionService
+    # ------------------------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        self._maybe_sweep()
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        app_delta, user_delta, session_state = split_state(state or {})
+        now = self._clock()
+        with self._lock, self._transaction():
+            if self._session_row(app_name, user_id, session_id) is not None:
+                raise ValueError(f"Session {session_id} already exists")
+            self._conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, json.dumps(session_state), now, now),
+            )
+            app_state = self._update_app_state(app_name, app_delta)
+            user_state = self._update_user_state(app_name, user_id, user_delta)
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=merge_state(app_state, user_state, session_state),
+            events=[],
+            last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        self.flush_pending((app_name, user_id, session_id))
+        with self._lock:
+            row = self._session_row(app_name, user_id, session_id)
+            if row is None:
+                return None
+            state, update_time = row
+            if self._expired(update_time):
+                return None
+
+            query = "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: List[Any] = [app_name, user_id, session_id]
+            if config is not None and config.after_timestamp is not None:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            limit = self.event_window
+            if config is not None and config.num_recent_events is not None:
+                limit = config.num_recent_events
+            query += " ORDER BY seq DESC"
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit)
+            rows = self._conn.execute(query, params).fetchall()
+
+            merged = merge_state(
+                self._app_state(app_name), self._user_state(app_name, user_id), json.loads(state)
+            )
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=merged,
+            events=[Event.model_validate_json(data) for (data,) in reversed(rows)],
+            last_update_time=update_time,
+        )
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        self.flush_pending()
+        query = "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ?"
+        params: List[Any] = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        with self._lock:
+            app_state = self._app_state(app_name)
+            sessions = []
+            for row_user, session_id, state, update_time in self._conn.execute(query, params):
+                if self._expired(update_time):
+                    continue
+                sessions.append(Session(
+                    id=session_id,
+                    app_name=app_name,
+                    user_id=row_user,
+                    state=merge_state(
+                        app_state, self._user_state(app_name, row_user), json.loads(state)
+                    ),
+                    events=[],
+                    last_update_time=update_time,
+                ))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        with self._lock, self._transaction():
+            self._pending.pop((app_name, user_id, session_id), None)
+            self._delete_sessions([(app_name, user_id, session_id)])
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            pending = self._pending.setdefault(key, _PendingTurn())
+            pending.events.append(event)
+            if event.actions and event.actions.state_delta:
+                app_delta, user_delta, _ = split_state(event.actions.state_delta)
+                pending.app_delta.update(app_delta)
+                pending.user_delta.update(user_delta)
+            pending.state = split_state(session.state)[2]
+            pending.update_time = event.timestamp
+            turn_ended = event.is_final_response() or len(pending.events) >= MAX_BATCH_EVENTS
+        if turn_ended:
+            self.flush_pending(key)
+        return event
+
+    # ------------------------------------------------------------------
+    # Batching, lazy loading and housekeeping
+    # ------------------------------------------------------------------
+
+    async def flush(self) -> None:
+        """Write every buffered event; called by ``Runner.close``."""
+        self.flush_pending()
+
+    def flush_pending(self, key: Optional[_SessionKey] = None) -> int:
+        """Write buffered events (of one session, or all); returns how many."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._pending)
+            turns = [(k, self._pending.pop(k)) for k in keys if k in self._pending]
+            if not turns:
+                return 0
+            with self._transaction():
+                for (app_name, user_id, session_id), turn in turns:
+                    self._write_turn(app_name, user_id, session_id, turn)
+        written = sum(len(turn.events) for _, turn in turns)
+        logger.debug("Flushed %d session events in one transaction", written)
+        return written
+
+    async def load_older_events(self, session: Session, limit: Optional[int] = None) -> List[Event]:
+        """Prepend up to ``limit`` events older than ``session.events`` and return them."""
+        key = (session.app_name, session.user_id, session.id)
+        self.flush_pending(key)
+        query = "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        params: List[Any] = list(key)
+        if session.events:
+            query += (
+                " AND seq < (SELECT MIN(seq) FROM events WHERE app_name = ? AND user_id = ?"
+                " AND session_id = ? AND event_id = ?)"
+            )
+            params.extend([*key, session.events[0].id])
+        query += " ORDER BY seq DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        older = [Event.model_validate_json(data) for (data,) in reversed(rows)]
+        session.events[:0] = older
+        return older
+
+    def expire_sessions(self) -> int:
+        """Delete sessions idle for longer than ``ttl_seconds``; returns how many."""
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = self._clock() - self.ttl_seconds
+        with self._lock, self._transaction():
+            expired = self._conn.execute(
+                "SELECT app_name, user_id, id FROM sessions WHERE update_time < ?", (cutoff,)
+            ).fetchall()
+            expired = [key for key in expired if tuple(key) not in self._pending]
+            self._delete_sessions(expired)
+        if expired:
+            logger.info("Expired %d idle sessions", len(expired))
+        return len(expired)
+
+    def compact(self, keep_events: int = 0) -> int:
+        """Drop all but the ``keep_events`` most recent events of every session.
+
+        Session state is stored separately, so it is unaffected. The WAL is
+        checkpointed and truncated afterwards. Returns the number of events deleted.
+        """
+        self.flush_pending()
+        with self._lock:
+            with self._transaction():
+                deleted = self._conn.execute(
+                    """
+                    DELETE FROM events WHERE seq IN (
+                        SELECT seq FROM (
+                            SELECT seq, ROW_NUMBER() OVER (
+                                PARTITION BY app_name, user_id, session_id ORDER BY seq DESC
+                            ) AS recency
+                            FROM events
+                        ) WHERE recency > ?
+                    )
+                    """,
+                    (keep_events,),
+                ).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("Compacted session store: %d events deleted", deleted)
+        return deleted
+
+    def close(self) -> None:
+        self.flush_pending()
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # SQL helpers (callers hold the lock)
+    # ------------------------------------------------------------------
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn)
+
+    def _expired(self, update_time: float) -> bool:
+        return self.ttl_seconds is not None and self._clock() - update_time > self.ttl_seconds
+
+    def _maybe_sweep(self) -> None:
+        if self._clock() - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = self._clock()
+        # Turns that never produced a final response (e.g. failed runs) are
+        # written here rather than held in memory indefinitely
+        self.flush_pending()
+        self.expire_sessions()
+
+    def _session_row(self, app_name: str, user_id: str, session_id: str) -> Optional[Tuple]:
+        return self._conn.execute(
+            "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+
+    def _app_state(self, app_name: str) -> Dict[str, Any]:
+        row = self._conn.execute(
+            "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _user_state(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        row = self._conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _update_app_state(self, app_name: str, delta: Dict[str, Any]) -> Dict[str, Any]:
+        state = self._app_state(app_name)
+        if delta:
+            state.update(delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state)),
+            )
+        return state
+
+    def _update_user_state(
+        self, app_name: str, user_id: str, delta: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        state = self._user_state(app_name, user_id)
+        if delta:
+            state.update(delta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+        return state
+
+    def _write_turn(self, app_name: str, user_id: str, session_id: str, turn: _PendingTurn) -> None:
+        updated = self._conn.execute(
+            "UPDATE sessions SET state = ?, update_time = ? "
+            "WHERE app_name = ? AND user_id = ? AND id = ?",
+            (json.dumps(turn.state), turn.update_time, app_name, user_id, session_id),
+        ).rowcount
+        if not updated:
+            logger.warning("Dropping events of deleted session %s", session_id)
+            return
+        self._conn.executemany(
+            "INSERT INTO events (app_name, user_id, session_id, event_id, timestamp, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    app_name,
+                    user_id,
+                    session_id,
+                    event.id,
+                    event.timestamp,
+                    event.model_dump_json(exclude_none=True),
+                )
+                for event in turn.events
+            ],
+        )
+        self._update_app_state(app_name, turn.app_delta)
+        self._update_user_state(app_name, user_id, turn.user_delta)
+
+    def _delete_sessions(self, keys: List[_SessionKey]) -> None:
+        self._conn.executemany(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", keys
+        )
+        self._conn.executemany(
+            "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", keys
+        )
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` (``ROLLBACK`` on error) on an autocommit connection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,20 @@
+"""Token streaming of SixHatsSolver runs to notebooks and SSE clients."""
+
+from .coalescing import CoalescingStreamer, question_key
+from .events import ERROR, FINAL, HAT_DONE, HAT_STARTED, TOKEN, PlanStreamer, StreamEvent
+from .notebook import display_stream
+from .server import create_app
+
+__all__ = [
+    "CoalescingStreamer",
+    "ERROR",
+    "FINAL",
+    "HAT_DONE",
+    "HAT_STARTED",
+    "TOKEN",
+    "PlanStreamer",
+    "StreamEvent",
+    "create_app",
+    "display_stream",
+    "question_key",
+]
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import replace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai import types
+
+from agents_intensive_capstone.batch.runner import output_keys
+from agents_intensive_capstone.cache.response_cache import content_hash, normalize_text
+from agents_intensive_capstone.cassettes.cassette import normalize_value
+
+from .events import ERROR, FINAL, TOKEN, PlanStreamer, StreamEvent
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# User owning the scratch sessions shared runs execute in
+SHARED_USER_ID = "six_hats_coalesced"
+
+
+def question_key(question: str, state: Dict[str, Any]) -> str:
+    """Default coalescing key: the normalized question and initial session state."""
+    payload = json.dumps(
+        [normalize_text(question), normalize_value(state)], sort_keys=True, default=str
+    )
+    return content_hash(payload)
+
+
+class _Flight:
+    """One shared run: its events so far, replayed to every caller attached to it."""
+
+    def __init__(self) -> None:
+        self.events: List[StreamEvent] = []
+        self.outputs: Dict[str, Any] = {}
+        self.plan_author: Optional[str] = None
+        self.done = False
+        self.callers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event: StreamEvent) -> None:
+        self.events.append(event)
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def finish(self) -> None:
+        self.done = True
+        self._changed.set()
+
+    async def follow(self) -> AsyncIterator[StreamEvent]:
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+class CoalescingStreamer:
+    """
+    Single-flight front for a :class:`PlanStreamer`: concurrent requests for
+    the same question attach to one pipeline run instead of each starting
+    their own.
+
+    Requests share a run when ``key_fn(question, state)`` matches (by default
+    the normalized question and initial session state). Callers joining late
+    first get the events already produced. Each caller still gets its own
+    session. Once the shared run finishes, the question, the final plan and
+    the hat outputs are written to it, so follow-ups work as usual. Nothing
+    else is shared: the run itself happens in a scratch session that is
+    deleted afterwards. Requests on a session that already has history are
+    not coalesced, since that history shapes the answer.
+
+    The shared run is cancelled when every caller attached to it has gone.
+    """
+
+    def __init__(
+        self,
+        streamer: PlanStreamer,
+        key_fn: Callable[[str, Dict[str, Any]], str] = question_key,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.streamer = streamer
+        self.key_fn = key_fn
+        self._clock = clock
+        self._flights: Dict[str, _Flight] = {}
+        self._output_keys = output_keys(streamer.agent)
+        self.stats = {"runs": 0, "coalesced": 0, "uncoalesced": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def stream(
+        self,
+        question: str,
+        user_id: str = "user",
+        session_id: Optional[str] = None,
+        state: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[StreamEvent]:
+        sessions = self.streamer.runner.session_service
+        app_name = self.streamer.app_name
+        session: Optional[Session]
+        if session_id is None:
+            session = await sessions.create_session(app_name=app_name, user_id=user_id, state=state)
+        else:
+            session = await sessions.get_session(
+                app_name=app_name, user_id=user_id, session_id=session_id
+            )
+        if session is None:
+            raise ValueError(f"Session {session_id} not found")
+        if session.events:
+            self.stats["uncoalesced"] += 1
+            async for event in self.streamer.stream(question, user_id, session.id):
+                yield event
+            return
+
+        key = self.key_fn(question, dict(session.state))
+        flight = self._flights.get(key)
+        coalesced = flight is not None
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(
+                self._run(key, flight, question, dict(session.state))
+            )
+            self.stats["runs"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info("Coalesced request into the in-flight run %s", key[:12])
+
+        started = self._clock()
+        time_to_first_token = None
+        flight.callers += 1
+        try:
+            async for event in flight.follow():
+                if event.kind == TOKEN and time_to_first_token is None:
+                    time_to_first_token = round(self._clock() - started, 3)
+                elif event.kind in (FINAL, ERROR):
+                    if event.kind == FINAL:
+                        await self._save(session, question, event.text, flight)
+                    # The caller's own session and latency, not the shared run's
+                    event = replace(
+                        event,
+                        data={
+                            **event.data,
+                            "session_id": session.id,
+                            "coalesced": coalesced,
+                            "time_to_first_token": time_to_first_token,
+                            "total_seconds": round(self._clock() - started, 3),
+                        },
+                    )
+                yield event
+        finally:
+            flight.callers -= 1
+            if flight.callers == 0 and not flight.done and flight.task is not None:
+                logger.info("Cancelling run %s: no callers left", key[:12])
+                flight.task.cancel()
+
+    async def _run(
+        self, key: str, flight: _Flight, question: str, state: Dict[str, Any]
+    ) -> None:
+        sessions = self.streamer.runner.session_service
+        session_id = None
+        try:
+            async for event in self.streamer.stream(question, SHARED_USER_ID, state=state):
+                session_id = event.data.get("session_id", session_id)
+                if event.kind == TOKEN:
+                    flight.plan_author = event.author
+                elif event.kind == FINAL and session_id is not None:
+                    shared = await sessions.get_session(
+                        app_name=self.streamer.app_name,
+                        user_id=SHARED_USER_ID,
+                        session_id=session_id,
+                    )
+                    state = shared.state if shared else {}
+                    flight.outputs = {k: state[k] for k in self._output_keys if k in state}
+                flight.publish(event)
+        except Exception as exc:
+            logger.warning("Shared run %s failed: %s", key[:12], exc, exc_info=True)
+            flight.publish(StreamEvent(ERROR, text=repr(exc)))
+        finally:
+            flight.finish()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if session_id is not None:
+                await sessions.delete_session(
+                    app_name=self.streamer.app_name,
+                    user_id=SHARED_USER_ID,
+                    session_id=session_id,
+                )
+
+    async def _save(self, session: Session, question: str, plan: str, flight: _Flight) -> None:
+        """Record the shared answer in the caller's session as if it had run there."""
+        sessions = self.streamer.runner.session_service
+        invocation_id = f"e-{uuid.uuid4()}"
+        author = flight.plan_author or self.streamer.agent.name
+        await sessions.append_event(
+            session,
+            Event(
+                invocation_id=invocation_id,
+                author="user",
+                content=types.Content(role="user", parts=[types.Part(text=question)]),
+            ),
+        )
+        await sessions.append_event(
+            session,
+            Event(
+                invocation_id=invocation_id,
+                author=author,
+                content=types.Content(role="model", parts=[types.Part(text=plan)]),
+                actions=EventActions(state_delta=dict(flight.outputs)),
+            ),
+        )
@@ -0,0 +1,176 @@
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import InMemoryRunner, Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+
+from agents_intensive_capstone.agents.blue_hat_factory import OUTPUT_KEY as FINAL_OUTPUT_KEY
+from agents_intensive_capstone.agents.orchestration import content_text
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+APP_NAME = "six_hats_stream"
+
+# Stream event kinds
+HAT_STARTED = "hat_started"  # first output (text, tool call) seen from an agent
+HAT_DONE = "hat_done"  # an agent other than the Blue Hat gave its final answer
+TOKEN = "token"  # a chunk of the final plan, as the Blue Hat produces it
+FINAL = "final"  # the complete plan plus the run's latency metrics
+ERROR = "error"  # the run failed; carries the metrics gathered so far
+
+
+@dataclass
+class StreamEvent:
+    """One update of a streamed run; ``text`` is a delta for ``token`` events."""
+
+    kind: str
+    author: str = ""
+    text: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_sse(self) -> str:
+        """The event as one server-sent events message (JSON payload)."""
+        payload = json.dumps(self.to_dict(), ensure_ascii=False)
+        return f"event: {self.kind}\ndata: {payload}\n\n"
+
+
+def final_authors(agent: BaseAgent) -> Set[str]:
+    """Names of the agents in the tree that write ``blue_hat_final_plan``."""
+    names = {agent.name} if getattr(agent, "output_key", None) == FINAL_OUTPUT_KEY else set()
+    for sub_agent in agent.sub_agents:
+        names |= final_authors(sub_agent)
+    return names
+
+
+class PlanStreamer:
+    """
+    Runs questions through an agent (normally the SixHatsSolver ``root_agent``)
+    with ADK's SSE streaming mode on and turns its events into
+    :class:`StreamEvent` updates: hat progress as each hat starts and
+    finishes, then the Blue Hat's plan token by token.
+
+    The final event carries the run's latency metrics, time-to-first-token
+    (question to first plan token) first among them. Sessions are kept, so
+    passing ``session_id`` continues a conversation; ``state`` seeds the state
+    of a new session (e.g. a ``request_budget`` override).
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        plugins: Optional[Sequence[Any]] = None,
+        session_service: Optional[BaseSessionService] = None,
+        app_name: str = APP_NAME,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.agent = agent
+        self.app_name = app_name
+        self.runner: Runner
+        if session_service is None:
+            self.runner = InMemoryRunner(
+                agent=agent, app_name=app_name, plugins=list(plugins or [])
+            )
+        else:
+            self.runner = Runner(
+                agent=agent,
+                app_name=app_name,
+                session_service=session_service,
+                plugins=list(plugins or []),
+            )
+        self.plan_authors = final_authors(agent)
+        self._clock = clock
+
+    async def stream(
+        self,
+        question: str,
+        user_id: str = "user",
+        session_id: Optional[str] = None,
+        state: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[StreamEvent]:
+        started = self._clock()
+        metrics: Dict[str, Any] = {
+            "time_to_first_event": None,
+            "time_to_first_token": None,
+            "total_seconds": None,
+            "token_chunks": 0,
+            "hats_done": 0,
+        }
+
+        def elapsed() -> float:
+            return round(self._clock() - started, 3)
+
+        if session_id is None:
+            session = await self.runner.session_service.create_session(
+                app_name=self.app_name, user_id=user_id, state=state
+            )
+            session_id = session.id
+        metrics["session_id"] = session_id
+
+        message = types.Content(role="user", parts=[types.Part(text=question)])
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+        seen: Set[str] = set()
+        plan_chunks: List[str] = []
+        streamed_plan = False
+        try:
+            async for event in self.runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=message,
+                run_config=run_config,
+            ):
+                if not event.content or not event.content.parts:
+                    continue
+                if metrics["time_to_first_event"] is None:
+                    metrics["time_to_first_event"] = elapsed()
+                author = event.author
+                if author not in seen:
+                    seen.add(author)
+                    yield StreamEvent(HAT_STARTED, author, data={"elapsed": elapsed()})
+
+                text = content_text(event.content)
+                if author in self.plan_authors:
+                    if not event.partial and streamed_plan:
+                        # The complete response repeats the chunks already sent.
+                        # One that was not streamed (a cache hit) is sent whole.
+                        streamed_plan = False
+                        continue
+                    streamed_plan = streamed_plan or bool(event.partial)
+                    if text:
+                        if metrics["time_to_first_token"] is None:
+                            metrics["time_to_first_token"] = elapsed()
+                        metrics["token_chunks"] += 1
+                        plan_chunks.append(text)
+                        yield StreamEvent(TOKEN, author, text)
+                elif event.is_final_response() and text:
+                    metrics["hats_done"] += 1
+                    yield StreamEvent(HAT_DONE, author, text, data={"elapsed": elapsed()})
+        except Exception as exc:
+            logger.warning("Streamed run failed: %s", exc, exc_info=True)
+            metrics["total_seconds"] = elapsed()
+            yield StreamEvent(ERROR, text=repr(exc), data=metrics)
+            return
+
+        finished = await self.runner.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        plan = (finished.state.get(FINAL_OUTPUT_KEY) if finished else None) or "".join(plan_chunks)
+        metrics["total_seconds"] = elapsed()
+        logger.info(
+            "Streamed plan: first token after %ss, done after %ss",
+            metrics["time_to_first_token"],
+            metrics["total_seconds"],
+        )
+        yield StreamEvent(FINAL, text=plan, data=metrics)
@@ -0,0 +1,71 @@
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .events import ERROR, FINAL, HAT_DONE, HAT_STARTED, TOKEN, StreamEvent
+
+
+def render_markdown(hats: List[str], plan: str, footer: str = "") -> str:
+    """Progress lines for the hats followed by the plan streamed so far."""
+    lines = [f"- {hat}" for hat in hats]
+    body = "\n".join(lines)
+    if plan:
+        body += "\n\n---\n\n" + plan
+    if footer:
+        body += f"\n\n*{footer}*"
+    return body
+
+
+def metrics_footer(metrics: Dict[str, Any]) -> str:
+    ttft = metrics.get("time_to_first_token")
+    first = f"first plan token after {ttft:.2f}s, " if ttft is not None else ""
+    return f"Six Hats: {first}complete after {metrics['total_seconds']:.2f}s"
+
+
+async def display_stream(
+    events: AsyncIterator[StreamEvent], min_interval: float = 0.05
+) -> Optional[str]:
+    """
+    Show a streamed run as one live-updating Markdown cell output.
+
+    In a notebook::
+
+        plan = await display_stream(streamer.stream("Should we adopt a 4-day week?"))
+
+    Redraws are throttled to one per ``min_interval`` seconds. Returns the
+    final plan (None if the run failed).
+    """
+    from IPython.display import Markdown, display
+
+    handle = display(Markdown("*Starting the Six Hats...*"), display_id=True)
+    status: Dict[str, str] = {}
+    plan: List[str] = []
+    last_draw = 0.0
+
+    def draw(footer: str = "") -> None:
+        hats = [f"{name}: {state}" for name, state in status.items()]
+        handle.update(Markdown(render_markdown(hats, "".join(plan), footer)))
+
+    async for event in events:
+        if event.kind == HAT_STARTED:
+            status[event.author] = "thinking..."
+        elif event.kind == HAT_DONE:
+            status[event.author] = f"done ({event.data['elapsed']:.1f}s)"
+        elif event.kind == TOKEN:
+            status[event.author] = "writing the plan..."
+            plan.append(event.text)
+        elif event.kind == FINAL:
+            for name, state in status.items():
+                if state == "writing the plan...":
+                    status[name] = "done"
+            plan = [event.text]
+            draw(metrics_footer(event.data))
+            return event.text
+        elif event.kind == ERROR:
+            draw(f"Run failed: {event.text}")
+            return None
+
+        now = time.perf_counter()
+        if now - last_draw >= min_interval:
+            draw()
+            last_draw = now
+    return None
@@ -0,0 +1,109 @@
+"""
+Serve SixHatsSolver runs as server-sent events.
+
+Usage (from the repository root)::
+
+    python -m agents_intensive_capstone.streaming --port 8080
+
+then ``GET /solve/stream?question=...`` streams ``hat_started``, ``hat_done``,
+``token`` and ``final`` events (``EventSource`` compatible). With
+``--metrics`` the instrumentation aggregates, request time-to-first-token
+included, are served at ``/metrics`` next to the admission scheduler's
+queue depth and wait times. With ``--coalesce`` concurrent requests for the
+same question share one pipeline run. New sessions are scheduled in the
+``interactive`` priority class.
+"""
+
+import argparse
+import logging
+import sys
+from typing import Any, AsyncIterator, List, Optional, Union
+
+from agents_intensive_capstone.models.scheduler import (
+    INTERACTIVE,
+    PRIORITY_KEY,
+    scheduler_prometheus_text,
+)
+from agents_intensive_capstone.plugins import InstrumentationPlugin
+
+from .coalescing import CoalescingStreamer
+from .events import PlanStreamer
+
+DEFAULT_AGENT = "adk_app.SixHatsSolver.agent:root_agent"
+
+# Disables proxy buffering (nginx) and caching so each event reaches the client at once
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+Streamer = Union[PlanStreamer, CoalescingStreamer]
+
+
+async def sse_messages(
+    streamer: Streamer, question: str, user_id: str, session_id: Optional[str]
+) -> AsyncIterator[str]:
+    # Seeds new sessions only; a follow-up keeps its session's priority
+    state = {PRIORITY_KEY: INTERACTIVE}
+    async for event in streamer.stream(
+        question, user_id=user_id, session_id=session_id, state=state
+    ):
+        yield event.to_sse()
+
+
+def create_app(streamer: Streamer, metrics: Optional[InstrumentationPlugin] = None) -> Any:
+    """FastAPI app streaming ``streamer`` runs at ``/solve/stream``."""
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+
+    app = FastAPI(title="Six Hats Solver (streaming)")
+
+    @app.get("/solve/stream")
+    async def solve_stream(
+        question: str, user_id: str = "user", session_id: Optional[str] = None
+    ) -> StreamingResponse:
+        return StreamingResponse(
+            sse_messages(streamer, question, user_id, session_id),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    if metrics is not None:
+
+        @app.get("/metrics", response_class=PlainTextResponse)
+        async def prometheus() -> str:
+            return metrics.prometheus_text() + scheduler_prometheus_text()
+
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream SixHatsSolver runs over SSE.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--agent", default=DEFAULT_AGENT, help="module:attribute of the agent")
+    parser.add_argument("--metrics", action="store_true", help="serve /metrics")
+    parser.add_argument(
+        "--coalesce", action="store_true", help="share one run between identical questions"
+    )
+    parser.add_argument("--traces", help="append instrumentation spans to this JSONL file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    from agents_intensive_capstone.batch.cli import load_agent
+
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    plugin = None
+    if args.metrics or args.traces:
+        plugin = InstrumentationPlugin(trace_path=args.traces)
+    planner = PlanStreamer(load_agent(args.agent), plugins=[plugin] if plugin else [])
+    streamer: Streamer = CoalescingStreamer(planner) if args.coalesce else planner
+    uvicorn.run(create_app(streamer, metrics=plugin), host=args.host, port=args.port)
+    return 0
@@ -0,0 +1,506 @@
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+import zlib
+from array import array
+from dataclasses import asdict, dataclass
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+INDEX_VERSION = 2
+# Default index location inside the corpus directory (skipped when scanning)
+INDEX_DIRNAME = ".six_hats_index"
+MANIFEST_FILENAME = "manifest.json"
+
+DOCUMENT_SUFFIXES = (".txt", ".md", ".rst")
+# Documents are split into paragraphs of at most this many words
+PASSAGE_WORDS = 120
+
+# Terms are hashed into this many buckets, so no vocabulary has to be loaded
+# at startup; colliding terms share a posting list
+DEFAULT_BUCKETS = 1 << 20
+# Only the strongest postings of each term are kept (impact-ordered pruning),
+# which bounds query cost however large the corpus grows
+MAX_POSTINGS_PER_TERM = 1000
+# More segments than this (one per incremental re-index) triggers a full rebuild
+MAX_SEGMENTS = 8
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 400
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was "
+    "were will with what which who how why when where should would could".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def term_bucket(term: str, n_buckets: int) -> int:
+    return zlib.crc32(term.encode("utf-8")) % n_buckets
+
+
+def split_passages(text: str, max_words: int = PASSAGE_WORDS) -> List[str]:
+    """Paragraphs of ``text``, with long ones cut into ``max_words`` chunks."""
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        for start in range(0, len(words), max_words):
+            passages.append(" ".join(words[start:start + max_words]))
+    return passages
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    source: str
+    score: float
+    text: str
+
+
+# ---------------------------------------------------------------------------
+# Segments: immutable, memory-mapped BM25 postings for a set of files
+# ---------------------------------------------------------------------------
+
+_ARRAYS = {
+    # name: typecode
+    "offsets": "Q",  # per bucket: start of its postings (n_buckets + 1)
+    "df": "I",  # per bucket: passages containing it, before pruning
+    "postings": "I",  # passage ids, strongest first within a bucket
+    "tfs": "H",  # term frequency of each posting
+    "lengths": "I",  # per passage: number of tokens
+    "file_ids": "I",  # per passage: index into the segment's file list
+    "text_offsets": "Q",  # per passage: start in text.bin (n_passages + 1)
+    # Per file df contributions, to take superseded files out of df
+    "file_df_offsets": "Q",  # per file: start of its entries (n_files + 1)
+    "file_df_buckets": "I",  # buckets the file's passages contain
+    "file_df_counts": "I",  # passages of the file containing each of them
+}
+
+
+def _write_array(path: str, typecode: str, values: Iterable[int]) -> None:
+    data = values if isinstance(values, array) else array(typecode, values)
+    with open(path, "wb") as fh:
+        data.tofile(fh)
+
+
+class _Segment:
+    # Memory-mapped arrays, one per _ARRAYS entry, plus the passage text
+    offsets: memoryview
+    df: memoryview
+    postings: memoryview
+    tfs: memoryview
+    lengths: memoryview
+    file_ids: memoryview
+    text_offsets: memoryview
+    file_df_offsets: memoryview
+    file_df_buckets: memoryview
+    file_df_counts: memoryview
+    text: memoryview
+
+    def __init__(self, path: str, files: Sequence[str]):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.files = list(files)
+        self.live = [True] * len(self.files)
+        # Per bucket: passages counted in ``df`` that belong to superseded files
+        self.superseded_df: Dict[int, int] = {}
+        self._maps: List[mmap.mmap] = []
+        for name, typecode in _ARRAYS.items():
+            setattr(self, name, self._map(f"{name}.bin", typecode))
+        self.text = self._map("text.bin", None)
+
+    def _map(self, filename: str, typecode: Optional[str]) -> memoryview:
+        with open(os.path.join(self.path, filename), "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                view = memoryview(b"")
+            else:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append(mapped)
+                view = memoryview(mapped)
+        # typecode comes from _ARRAYS, so it is always a valid format
+        return view.cast(typecode) if typecode else view  # type: ignore[call-overload]
+
+    def set_live(self, live: List[bool]) -> None:
+        self.live = live
+        self.superseded_df = {}
+        for file_id, is_live in enumerate(live):
+            if is_live:
+                continue
+            start, end = self.file_df_offsets[file_id], self.file_df_offsets[file_id + 1]
+            for bucket, count in zip(
+                self.file_df_buckets[start:end].tolist(),
+                self.file_df_counts[start:end].tolist(),
+                strict=True,
+            ):
+                self.superseded_df[bucket] = self.superseded_df.get(bucket, 0) + count
+
+    def passage_text(self, pid: int) -> str:
+        return bytes(self.text[self.text_offsets[pid]:self.text_offsets[pid + 1]]).decode("utf-8")
+
+    def close(self) -> None:
+        for name in [*_ARRAYS, "text"]:
+            getattr(self, name).release()
+        for mapped in self._maps:
+            mapped.close()
+
+
+def build_segment(
+    path: str, documents: Sequence[Tuple[str, str]], n_buckets: int, max_postings: int
+) -> Dict[str, Dict[str, int]]:
+    """Write a segment for ``documents`` (relative path, text) to ``path``.
+
+    Returns per-file passage and token counts.
+    """
+    os.makedirs(path, exist_ok=True)
+    postings: Dict[int, Tuple[array, array]] = {}
+    lengths, file_ids, text_offsets = array("I"), array("I"), array("Q", [0])
+    file_df_offsets, file_df_buckets, file_df_counts = array("Q", [0]), array("I"), array("I")
+    stats: Dict[str, Dict[str, int]] = {}
+
+    with open(os.path.join(path, "text.bin"), "wb") as text_file:
+        for file_id, (relpath, text) in enumerate(documents):
+            file_stats = stats[relpath] = {"passages": 0, "tokens": 0}
+            file_df: Dict[int, int] = {}
+            for passage in split_passages(text):
+                tokens = tokenize(passage)
+                if not tokens:
+                    continue
+                pid = len(lengths)
+                counts: Dict[int, int] = {}
+                for token in tokens:
+                    bucket = term_bucket(token, n_buckets)
+                    counts[bucket] = counts.get(bucket, 0) + 1
+                for bucket, tf in counts.items():
+                    file_df[bucket] = file_df.get(bucket, 0) + 1
+                    pids, tfs = postings.setdefault(bucket, (array("I"), array("H")))
+                    pids.append(pid)
+                    tfs.append(min(tf, 0xFFFF))
+                lengths.append(len(tokens))
+                file_ids.append(file_id)
+                encoded = passage.encode("utf-8")
+                text_file.write(encoded)
+                text_offsets.append(text_offsets[-1] + len(encoded))
+                file_stats["passages"] += 1
+                file_stats["tokens"] += len(tokens)
+            for bucket in sorted(file_df):
+                file_df_buckets.append(bucket)
+                file_df_counts.append(file_df[bucket])
+            file_df_offsets.append(len(file_df_buckets))
+
+    avgdl = (sum(lengths) / len(lengths)) if lengths else 1.0
+    norm, slope = BM25_K1 * (1 - BM25_B), BM25_K1 * BM25_B / avgdl
+    df, kept = array("I", bytes(4 * n_buckets)), array("I", bytes(4 * n_buckets))
+    kept_pids, kept_tfs = array("I"), array("H")
+    for bucket in sorted(postings):
+        pids, tfs = postings.pop(bucket)
+        # Strongest first by the query-independent part of the BM25 term score
+        order = sorted(
+            range(len(pids)),
+            key=lambda i: -tfs[i] / (tfs[i] + norm + slope * lengths[pids[i]]),
+        )[:max_postings]
+        df[bucket], kept[bucket] = len(pids), len(order)
+        kept_pids.extend(pids[i] for i in order)
+        kept_tfs.extend(tfs[i] for i in order)
+    offsets = array("Q", accumulate(kept, initial=0))
+
+    for name, values in (
+        ("offsets", offsets),
+        ("df", df),
+        ("postings", kept_pids),
+        ("tfs", kept_tfs),
+        ("lengths", lengths),
+        ("file_ids", file_ids),
+        ("text_offsets", text_offsets),
+        ("file_df_offsets", file_df_offsets),
+        ("file_df_buckets", file_df_buckets),
+        ("file_df_counts", file_df_counts),
+    ):
+        _write_array(os.path.join(path, f"{name}.bin"), _ARRAYS[name], values)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+class LocalCorpusIndex:
+    """
+    Offline BM25 retrieval over a directory of text documents.
+
+    Documents (``*.txt``, ``*.md``, ``*.rst``) are split into passages and
+    indexed into segments of memory-mapped arrays under ``index_dir``, so
+    opening an index costs a few ``mmap`` calls regardless of its size.
+    :meth:`refresh` indexes only files added or changed since the last run
+    into a new segment (superseded passages are skipped at query time and
+    left out of document frequencies) and
+    rebuilds everything once there are more than ``MAX_SEGMENTS``.
+
+    Every term keeps at most ``max_postings_per_term`` postings, strongest
+    first, so a query scores a bounded number of passages per term; BM25
+    statistics (document frequency, average length) are index-wide.
+    """
+
+    def __init__(
+        self,
+        corpus_dir: str,
+        index_dir: Optional[str] = None,
+        n_buckets: int = DEFAULT_BUCKETS,
+        max_postings_per_term: int = MAX_POSTINGS_PER_TERM,
+    ):
+        self.corpus_dir = os.path.abspath(corpus_dir)
+        self.index_dir = os.path.abspath(index_dir or os.path.join(corpus_dir, INDEX_DIRNAME))
+        self.n_buckets = n_buckets
+        self.max_postings_per_term = max_postings_per_term
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, Any] = {"version": INDEX_VERSION, "files": {}, "segments": []}
+        self._segments: List[_Segment] = []
+        self._load()
+
+    @classmethod
+    def open(
+        cls, corpus_dir: str, index_dir: Optional[str] = None, **kwargs: Any
+    ) -> "LocalCorpusIndex":
+        """Open (building or updating as needed) the index of ``corpus_dir``."""
+        index = cls(corpus_dir, index_dir, **kwargs)
+        index.refresh()
+        return index
+
+    # -- properties ---------------------------------------------------------
+
+    @property
+    def passages(self) -> int:
+        return sum(record["passages"] for record in self._manifest["files"].values())
+
+    @property
+    def documents(self) -> int:
+        return len(self._manifest["files"])
+
+    @property
+    def segments(self) -> int:
+        return len(self._segments)
+
+    # -- indexing -----------------------------------------------------------
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Indexable files under the corpus directory: relative path -> (mtime_ns, size)."""
+        found = {}
+        for root, dirs, names in os.walk(self.corpus_dir):
+            dirs[:] = [
+                d for d in dirs
+                if not d.startswith(".") and os.path.join(root, d) != self.index_dir
+            ]
+            for name in names:
+                if name.endswith(DOCUMENT_SUFFIXES):
+                    full = os.path.join(root, name)
+                    stat = os.stat(full)
+                    found[os.path.relpath(full, self.corpus_dir)] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def refresh(self) -> Dict[str, int]:
+        """Index files added or changed since the last refresh; forget deleted ones."""
+        with self._lock:
+            current = self.scan()
+            known = self._manifest["files"]
+            changed = sorted(
+                path for path, stat in current.items()
+                if path not in known
+                or (known[path]["mtime_ns"], known[path]["size"]) != stat
+            )
+            deleted = sorted(path for path in known if path not in current)
+            if not changed and not deleted:
+                return {"indexed": 0, "deleted": 0}
+
+            if len(self._manifest["segments"]) >= MAX_SEGMENTS:
+                self._rebuild(current)
+            else:
+                for path in deleted:
+                    del known[path]
+                if changed:
+                    self._add_segment(changed, current)
+                self._save()
+        logger.info(
+            "Local index refreshed: %d files indexed, %d deleted, %d passages in %d segments",
+            len(changed), len(deleted), self.passages, self.segments,
+        )
+        return {"indexed": len(changed), "deleted": len(deleted)}
+
+    def rebuild(self) -> None:
+        """Re-index the whole corpus into a single segment."""
+        with self._lock:
+            self._rebuild(self.scan())
+
+    def _rebuild(self, current: Dict[str, Tuple[int, int]]) -> None:
+        self._manifest["files"] = {}
+        self._add_segment(sorted(current), current)
+        self._save()
+
+    def _add_segment(self, paths: List[str], stats: Dict[str, Tuple[int, int]]) -> None:
+        number = self._manifest.get("next_segment", 1)
+        self._manifest["next_segment"] = number + 1
+        name = f"seg-{number:06d}"
+        documents = []
+        for path in paths:
+            full = os.path.join(self.corpus_dir, path)
+            with open(full, encoding="utf-8", errors="replace") as fh:
+                documents.append((path, fh.read()))
+        counts = build_segment(
+            os.path.join(self.index_dir, name),
+            documents,
+            self.n_buckets,
+            self.max_postings_per_term,
+        )
+        for path in paths:
+            mtime_ns, size = stats[path]
+            self._manifest["files"][path] = {
+                "mtime_ns": mtime_ns, "size": size, "segment": name, **counts[path]
+            }
+        self._manifest["segments"].append({"name": name, "files": paths})
+
+    def _save(self) -> None:
+        owned = {record["segment"] for record in self._manifest["files"].values()}
+        stale = [s for s in self._manifest["segments"] if s["name"] not in owned]
+        self._manifest["segments"] = [s for s in self._manifest["segments"] if s["name"] in owned]
+        self._manifest["n_buckets"] = self.n_buckets
+        self._manifest["max_postings_per_term"] = self.max_postings_per_term
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        path = os.path.join(self.index_dir, MANIFEST_FILENAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as fh:
+            json.dump(self._manifest, fh)
+        os.replace(path + ".tmp", path)
+
+        self._open_segments()
+        for segment in stale:
+            shutil.rmtree(os.path.join(self.index_dir, segment["name"]), ignore_errors=True)
+
+    def _load(self) -> None:
+        path = os.path.join(self.index_dir, MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if manifest.get("version") != INDEX_VERSION:
+            logger.warning("Ignoring local index %s from another version", self.index_dir)
+            return
+        self._manifest = manifest
+        self.n_buckets = manifest["n_buckets"]
+        self.max_postings_per_term = manifest["max_postings_per_term"]
+        self._open_segments()
+
+    def _open_segments(self) -> None:
+        for segment in self._segments:
+            segment.close()
+        files = self._manifest["files"]
+        self._segments = []
+        for entry in self._manifest["segments"]:
+            segment = _Segment(os.path.join(self.index_dir, entry["name"]), entry["files"])
+            # Passages of files re-indexed into a later segment are superseded
+            segment.set_live([
+                files.get(path, {}).get("segment") == entry["name"] for path in segment.files
+            ])
+            self._segments.append(segment)
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+
+    # -- search -------------------------------------------------------------
+
+    def search(self, query: str, top_k: int = 5) -> List[SearchHit]:
+        """The ``top_k`` passages for ``query`` by BM25 score."""
+        with self._lock:
+            return self._search(query, top_k)
+
+    def _search(self, query: str, top_k: int) -> List[SearchHit]:
+        buckets = sorted({term_bucket(t, self.n_buckets) for t in tokenize(query)})
+        total = self.passages
+        if not buckets or not total:
+            return []
+        avgdl = sum(r["tokens"] for r in self._manifest["files"].values()) / total
+        segments = self._segments
+        norm = BM25_K1 * (1 - BM25_B)
+        slope = BM25_K1 * BM25_B / avgdl
+
+        scores: Dict[Tuple[int, int], float] = {}
+        for bucket in buckets:
+            df = sum(
+                segment.df[bucket] - segment.superseded_df.get(bucket, 0) for segment in segments
+            )
+            if not df:
+                continue
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for index, segment in enumerate(segments):
+                start, end = segment.offsets[bucket], segment.offsets[bucket + 1]
+                if start == end:
+                    continue
+                lengths, file_ids, live = segment.lengths, segment.file_ids, segment.live
+                for pid, tf in zip(
+                    segment.postings[start:end].tolist(),
+                    segment.tfs[start:end].tolist(),
+                    strict=True,
+                ):
+                    if not live[file_ids[pid]]:
+                        continue
+                    key = (index, pid)
+                    score = idf * tf * (BM25_K1 + 1) / (tf + norm + slope * lengths[pid])
+                    scores[key] = scores.get(key, 0.0) + score
+
+        hits = []
+        for (index, pid), score in heapq.nlargest(top_k, scores.items(), key=lambda kv: kv[1]):
+            segment = segments[index]
+            hits.append(SearchHit(
+                source=segment.files[segment.file_ids[pid]],
+                score=round(score, 4),
+                text=snippet(segment.passage_text(pid), query),
+            ))
+        return hits
+
+
+def create_local_search_tool(index: LocalCorpusIndex, top_k: int = 5) -> Any:
+    """Wrap ``index`` as a tool that can stand in for ``google_search``."""
+    from google.adk.tools import FunctionTool
+
+    def local_search(query: str) -> Dict[str, Any]:
+        """
+        Searches the local document collection for passages relevant to a query.
+        Args:
+            query: Keywords or a short question describing the information needed.
+        Returns:
+            A dict with the best matching passages, each with its source file and score.
+        """
+        hits = index.search(query, top_k=top_k)
+        return {"query": query, "results": [asdict(hit) for hit in hits]}
+
+    return FunctionTool(local_search)
+
+
+def snippet(text: str, query: str, limit: int = SNIPPET_CHARS) -> str:
+    """At most ``limit`` characters of ``text``, starting near the first query term."""
+    if len(text) <= limit:
+        return text
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in tokenize(query)]
+    first = min((p for p in positions if p >= 0), default=0)
+    start = max(0, min(first - limit // 4, len(text) - limit))
+    start = text.rfind(" ", 0, start) + 1 if start else 0
+    clipped = text[start:start + limit].rsplit(" ", 1)[0]
+    return ("…" if start else "") + clipped + "…"
@@ -0,0 +1,176 @@
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from importlib import resources
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# Bundled catalog: {"fallback": str, "datasets": [{"id", "keywords", "report"}]}
+DATA_FILENAME = "positive_data.json"
+
+# "{topic}" in the fallback report is replaced with the requested topic
+TOPIC_PLACEHOLDER = "{topic}"
+
+
+@dataclass(frozen=True)
+class PositiveDataset:
+    id: str
+    keywords: Tuple[str, ...]
+    report: str
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over lowercase keywords, each tagged with a priority.
+
+    :meth:`best` scans a text once and returns the lowest priority among all
+    keywords occurring in it as substrings (overlapping ones included), so a
+    lookup costs O(len(text)) however many keywords are indexed.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+        for keyword, priority in keywords:
+            if keyword:
+                self._add(keyword.lower(), priority)
+        self._link()
+
+    def __len__(self) -> int:
+        """Number of automaton states."""
+        return len(self._goto)
+
+    def _add(self, keyword: str, priority: int) -> None:
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[node][char] = child
+            node = child
+        self._best[node] = _lowest(self._best[node], priority)
+
+    def _link(self) -> None:
+        # Breadth-first, so every failure target is final before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0) if node else 0
+                self._best[child] = _lowest(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+
+    def best(self, text: str) -> Optional[int]:
+        goto, fail, best_at = self._goto, self._fail, self._best
+        node, best = 0, None
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = best_at[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+
+def _lowest(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+class PositiveDataCatalog:
+    """
+    Curated positive data reports, matched to topics by keyword.
+
+    Datasets are ranked by their position: when several match a topic, the
+    earliest one wins (as in the ``if``/``elif`` chain this replaces).
+    Topics matching nothing get the ``fallback`` report.
+    """
+
+    def __init__(self, datasets: Sequence[PositiveDataset], fallback: str):
+        self.datasets = tuple(datasets)
+        self.fallback = fallback
+        self._index = KeywordIndex(
+            (keyword, rank)
+            for rank, dataset in enumerate(self.datasets)
+            for keyword in dataset.keywords
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PositiveDataCatalog":
+        datasets = [
+            PositiveDataset(str(item["id"]), tuple(item["keywords"]), item["report"])
+            for item in data["datasets"]
+        ]
+        return cls(datasets, data.get("fallback", ""))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "PositiveDataCatalog":
+        """Load ``path``, or the catalog bundled with the package."""
+        if path is None:
+            raw = resources.files(__package__).joinpath(DATA_FILENAME).read_text(encoding="utf-8")
+        else:
+            with open(path, encoding="utf-8") as fh:
+                raw = fh.read()
+        catalog = cls.from_dict(json.loads(raw))
+        logger.info("Loaded %d positive datasets", len(catalog.datasets))
+        return catalog
+
+    def match(self, topic: str) -> Optional[PositiveDataset]:
+        rank = self._index.best(topic)
+        return None if rank is None else self.datasets[rank]
+
+    def lookup(self, topic: str) -> str:
+        dataset = self.match(topic)
+        if dataset is not None:
+            return dataset.report
+        return self.fallback.replace(TOPIC_PLACEHOLDER, topic)
+
+    def lookup_many(self, topics: Iterable[str]) -> List[str]:
+        """:meth:`lookup` for every topic; repeated topics are matched once."""
+        seen: Dict[str, str] = {}
+        results = []
+        for topic in topics:
+            if topic not in seen:
+                seen[topic] = self.lookup(topic)
+            results.append(seen[topic])
+        return results
+
+
+_catalog: Optional[PositiveDataCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> PositiveDataCatalog:
+    """The bundled catalog, loaded and indexed on first use."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = PositiveDataCatalog.load()
+    return _catalog
+
+
+def set_catalog(catalog: Optional[PositiveDataCatalog]) -> None:
+    """Install ``catalog`` process-wide (None: reload the bundled one on next use)."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = catalog
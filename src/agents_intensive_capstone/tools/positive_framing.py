@@ -0,0 +1,79 @@
+import re
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .local_search import SearchHit
+
+# ---------------------------------------------------------------------------
+# Configuration Constants
+# ---------------------------------------------------------------------------
+
+# Hits fetched per result returned, so enough are left after filtering
+OVERFETCH = 3
+
+POSITIVE_TERMS = frozenset(
+    "achieve achieved advantage advantages benefit benefits better boost boosted breakthrough "
+    "gain gains grew growth improve improved improvement improves increase increased "
+    "innovation innovative opportunities opportunity optimistic outperformed positive "
+    "potential progress promising rose savings saved strong stronger succeed succeeded "
+    "success successful thrive thriving upside win wins".split()
+)
+NEGATIVE_TERMS = frozenset(
+    "bankrupt cancelled collapse collapsed concern concerns crisis decline declined "
+    "deficit delay delayed difficult disappointing drop dropped fail failed failing failure "
+    "fell harm lose loss losses negative overrun problem problems risk risks setback "
+    "shortfall struggle struggled threat weak worse worst".split()
+)
+# Flip the polarity of the word that follows them ("not successful")
+NEGATIONS = frozenset("no not never without hardly".split())
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def framing_score(text: str) -> int:
+    """Positive minus negative terms in ``text``; above zero reads as good news."""
+    score, negated = 0, False
+    for word in _WORD.findall(text.lower()):
+        if word in NEGATIONS:
+            negated = True
+            continue
+        polarity = (word in POSITIVE_TERMS) - (word in NEGATIVE_TERMS)
+        score += -polarity if negated else polarity
+        negated = False
+    return score
+
+
+def frame_positively(hits: Sequence[SearchHit]) -> List[Tuple[SearchHit, int]]:
+    """``hits`` without the net-negative ones, in their original (relevance) order."""
+    scored = [(hit, framing_score(hit.text)) for hit in hits]
+    return [(hit, score) for hit, score in scored if score >= 0]
+
+
+def create_optimist_search_tool(
+    search: Callable[[str, int], Sequence[SearchHit]], top_k: int = 5
+) -> Any:
+    """
+    Wrap ``search`` (e.g. ``LocalCorpusIndex.search``) as the Yellow Hat's
+    direct search tool: a plain function call whose results are filtered for
+    positive framing, instead of a nested search agent and its model call.
+    """
+    from google.adk.tools import FunctionTool
+
+    def optimist_search(query: str) -> Dict[str, Any]:
+        """
+        Searches for evidence of benefits, opportunities and success stories about a topic.
+        Args:
+            query: Keywords or a short question, ideally phrased around solutions and successes.
+        Returns:
+            A dict with the best matching passages that are not negatively framed, each with
+            its source file, relevance score and framing score.
+        """
+        hits = search(query, top_k * OVERFETCH)
+        kept = frame_positively(hits)
+        return {
+            "query": query,
+            "results": [dict(asdict(hit), framing=score) for hit, score in kept[:top_k]],
+            "filtered": len(hits) - len(kept),
+        }
+
+    return FunctionTool(optimist_search)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from agents_intensive_capstone.cache.backends import InMemoryCacheBackend
+from agents_intensive_capstone.cache.response_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+SESSION_SCOPE = "session"
+PROCESS_SCOPE = "process"
+# Key namespace of the searching hats' tools (White and Red's ``web_search``,
+# Yellow's ``google_optimist``), so a search made by one is a hit for the others
+SEARCH_NAMESPACE = "web_search"
+
+
+class SearchCache:
+    """
+    Single-flight, TTL cache for search tool results.
+
+    Concurrent calls with the same key share one in-flight fetch; finished
+    results are kept for ``ttl_seconds``. With ``scope="session"`` keys are
+    prefixed by the session id, so only hats of the same run share results;
+    ``scope="process"`` shares them across sessions.
+    """
+
+    def __init__(
+        self,
+        scope: str = SESSION_SCOPE,
+        ttl_seconds: Optional[float] = 600.0,
+        max_entries: int = 4096,
+    ):
+        if scope not in (SESSION_SCOPE, PROCESS_SCOPE):
+            raise ValueError(f"Unknown search cache scope {scope!r}")
+        self.scope = scope
+        self._results = InMemoryCacheBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._in_flight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    def make_key(self, namespace: str, args: Dict[str, Any], session_id: str = "") -> str:
+        normalized = {
+            k: normalize_text(v) if isinstance(v, str) else v for k, v in sorted(args.items())
+        }
+        prefix = session_id if self.scope == SESSION_SCOPE else ""
+        return json.dumps([prefix, namespace, normalized], sort_keys=True, default=str)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._results.get(key)
+        if cached is not None:
+            self.hits += 1
+            return json.loads(cached)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._settle(key, t))
+        # Shielded so a cancelled caller (e.g. a timed-out hat) does not
+        # cancel the fetch other hats are waiting on.
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, task: "asyncio.Task[Any]") -> None:
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        try:
+            self._results.set(key, json.dumps(task.result()))
+        except TypeError:
+            logger.debug("Search result for %s is not JSON-serializable; not cached", key)
+
+
+_process_cache: Optional[SearchCache] = None
+
+
+def process_search_cache(ttl_seconds: Optional[float] = 600.0) -> SearchCache:
+    """The process-wide SearchCache; ``ttl_seconds`` applies when it is first created."""
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = SearchCache(scope=PROCESS_SCOPE, ttl_seconds=ttl_seconds)
+    return _process_cache
+
+
+class CachedSearchTool(BaseTool):
+    """
+    Routes a client-side search tool (e.g. an ``AgentTool`` over a search
+    agent) through a :class:`SearchCache`.
+
+    Only the tool's return value is shared: state changes the wrapped tool
+    would make are applied for the caller that actually ran it. Tools given
+    the same ``namespace`` (default: the tool name) share cached results.
+    """
+
+    def __init__(self, tool: BaseTool, cache: SearchCache, namespace: Optional[str] = None):
+        super().__init__(name=tool.name, description=tool.description)
+        self.tool = tool
+        self.cache = cache
+        self.namespace = namespace or tool.name
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        session_id = tool_context._invocation_context.session.id
+        key = self.cache.make_key(self.namespace, args, session_id)
+        return await self.cache.get_or_fetch(
+            key, lambda: self.tool.run_async(args=args, tool_context=tool_context)
+        )
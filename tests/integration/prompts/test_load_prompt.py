@@ -21,7 +21,7 @@ from agents_intensive_capstone.prompts import __all__, load_prompt_text  # type:
 @pytest.mark.integration
 def test_load_existing_prompt(caplog: pytest.LogCaptureFixture) -> None:
     """The loader must return the exact contents of a bundled prompt."""
-    caplog.set_level(logging.INFO)
+    caplog.set_level(logging.DEBUG)
 
     text = load_prompt_text("blue_hat_prompt.txt")
 
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+
+@pytest.fixture
+def run_agent():
+    """Run ``agent`` once on ``question``; returns (events, final session)."""
+
+    async def _run(agent, question: str = "Should we adopt a 4-day week?"):
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="u")
+        message = types.Content(role="user", parts=[types.Part(text=question)])
+        events = [
+            event
+            async for event in runner.run_async(
+                user_id="u", session_id=session.id, new_message=message
+            )
+        ]
+        session = await runner.session_service.get_session(
+            app_name="test", user_id="u", session_id=session.id
+        )
+        return events, session
+
+    return _run
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import pytest
+
+from agents_intensive_capstone.agents.context_compaction import (
+    ContextCompactionAgent,
+    clear_outputs_callback,
+    compact_outputs,
+    split_points,
+)
+from agents_intensive_capstone.models.tokens import estimate_tokens
+
+WHITE = """## Facts
+- Pilot teams cut meeting time by 20% in 2023.
+- Output per employee stayed flat during the trial.
+Surveys show higher reported wellbeing. Attrition data is missing."""
+
+BLACK = """## Risks
+- Output per employee stayed flat during the trial period.
+- Customer support coverage drops on the fifth day.
+- Overtime may creep back in within six months."""
+
+
+@pytest.mark.unit
+def test_split_points_separates_headings_bullets_and_sentences() -> None:
+    points = split_points(WHITE)
+
+    assert [p.kind for p in points] == ["heading", "bullet", "bullet", "sentence", "sentence"]
+    assert points[3].text == "Surveys show higher reported wellbeing."
+
+
+@pytest.mark.unit
+def test_outputs_within_budget_are_passed_through() -> None:
+    result = compact_outputs({"White Hat": WHITE}, budget=10_000)
+
+    assert result.strategy == "none"
+    assert WHITE in result.brief
+    assert result.tokens_saved == 0
+
+
+@pytest.mark.unit
+def test_overlapping_points_are_kept_once() -> None:
+    outputs = {"White Hat": WHITE, "Black Hat": BLACK}
+    full_tokens = compact_outputs(outputs, budget=10_000).original_tokens
+
+    result = compact_outputs(outputs, budget=full_tokens - 1)
+
+    assert result.strategy == "dedup"
+    assert result.duplicates_dropped == 1
+    assert result.brief.count("Output per employee stayed flat") == 1
+    assert "Customer support coverage" in result.brief
+    assert result.tokens_saved > 0
+
+
+@pytest.mark.unit
+def test_key_points_fit_the_budget_and_keep_every_hat() -> None:
+    long_prose = " ".join(f"Filler sentence number {i} adds little." for i in range(200))
+    outputs = {"White Hat": WHITE + "\n" + long_prose, "Black Hat": BLACK}
+
+    result = compact_outputs(outputs, budget=120)
+
+    assert result.strategy == "key_points"
+    assert result.compacted_tokens <= 120
+    assert "## White Hat" in result.brief and "## Black Hat" in result.brief
+    assert "- Pilot teams cut meeting time by 20% in 2023." in result.brief
+    assert result.stats["tokens_saved"] == result.original_tokens - result.compacted_tokens
+
+
+@pytest.mark.unit
+def test_truncation_is_the_last_resort() -> None:
+    outputs = {f"Hat {i}": f"- point {i} " + "word " * 50 for i in range(10)}
+
+    result = compact_outputs(outputs, budget=20)
+
+    assert result.strategy == "truncate"
+    assert estimate_tokens(result.brief) <= 20
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_agent_writes_brief_and_stats(run_agent) -> None:
+    from google.adk.agents import SequentialAgent
+
+    from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+    from agents_intensive_capstone.models import StubLlm
+
+    stage = ContextCompactionAgent(
+        name="BlueHatContextCompaction",
+        sources={"black_hat_plan": "Black Hat", "green_hat_plan": "Green Hat"},
+        token_budget=10_000,
+    )
+    pipeline = SequentialAgent(
+        name="SixHatsSolver", sub_agents=[BlackHatFactory.create(model=StubLlm()), stage]
+    )
+
+    _, session = await run_agent(pipeline, question="Should we adopt a 4-day week?")
+
+    assert session.state["blue_hat_question"] == "Should we adopt a 4-day week?"
+    assert session.state["blue_hat_brief"].startswith("## Black Hat")
+    assert "Green Hat" not in session.state["blue_hat_brief"]
+    assert session.state["compaction_stats"]["strategy"] == "none"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_outputs_of_earlier_turns_are_not_compacted() -> None:
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+    from agents_intensive_capstone.models import StubLlm
+
+    stage = ContextCompactionAgent(
+        name="BlueHatContextCompaction",
+        sources={"black_hat_plan": "Black Hat", "green_hat_plan": "Green Hat"},
+        token_budget=10_000,
+    )
+    pipeline = SequentialAgent(
+        name="SixHatsSolver",
+        sub_agents=[BlackHatFactory.create(model=StubLlm()), stage],
+        before_agent_callback=clear_outputs_callback(["black_hat_plan", "green_hat_plan"]),
+    )
+    runner = InMemoryRunner(agent=pipeline, app_name="test")
+    session = await runner.session_service.create_session(
+        app_name="test",
+        user_id="u",
+        state={
+            "green_hat_plan": "Stale idea from the previous question",
+            "missing_perspectives": ["Green Hat (timed out after 1s)", "Red Hat (failed)"],
+        },
+    )
+    message = types.Content(role="user", parts=[types.Part(text="Should we hire?")])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="test", user_id="u", session_id=session.id
+    )
+
+    assert "Stale idea" not in session.state["blue_hat_brief"]
+    assert session.state["green_hat_plan"] is None
+    assert session.state["blue_hat_missing_perspectives"] == (
+        "Green Hat (timed out after 1s), Red Hat (failed)"
+    )
+    assert session.state["blue_hat_skipped_hats"] == "none"
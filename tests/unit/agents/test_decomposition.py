@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from agents_intensive_capstone.agents.decomposition import ProblemDecomposer, split_question
+
+PROBLEM = """We are opening a second office next year. Please advise on:
+1. Which city should host the new office?
+2. Should the new team work remotely or on site?
+3. How do we staff the office in its first six months?
+4. What budget should we set aside for the move?
+5. How do we keep one company culture across both offices?"""
+
+
+@pytest.mark.unit
+def test_lists_and_separate_questions_are_split() -> None:
+    assert split_question(PROBLEM)[1] == "Should the new team work remotely or on site?"
+    assert len(split_question(PROBLEM)) == 5
+    assert split_question("Should we raise prices? And should we hire a CFO?") == [
+        "Should we raise prices?",
+        "And should we hire a CFO?",
+    ]
+    assert split_question(PROBLEM, max_parts=3)[2].startswith("How do we staff")
+    assert len(split_question(PROBLEM, max_parts=3)) == 3
+
+
+@pytest.mark.unit
+def test_single_problems_and_fragments_are_not_split() -> None:
+    single = "We are a 50-person startup. Should we adopt a 4-day week?"
+
+    assert split_question(single) == [single]
+    assert split_question("Pick one:\n- Go?\n- Rust?") == ["Pick one:\n- Go?\n- Rust?"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_decomposer_asks_the_model_only_when_the_heuristic_cannot_split() -> None:
+    from agents_intensive_capstone.models import StubLlm
+
+    model = StubLlm(
+        responder=lambda request: "1. What will the move cost us?\n2. Who should lead it?\n"
+    )
+    decomposer = ProblemDecomposer(model=model)
+
+    listed = await decomposer.decompose(PROBLEM)
+    asked = await decomposer.decompose("Plan our move to a second office next year.")
+
+    assert listed.source == "heuristic" and len(model.calls) == 1
+    assert asked.source == "model"
+    assert asked.parts == ("What will the move cost us?", "Who should lead it?")
+
+
+def build_decomposer(hats, blue, max_workers: int = 2, fan_in: int = 2, cache=None):
+    from google.adk.agents import ParallelAgent, SequentialAgent
+
+    from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+    from agents_intensive_capstone.agents.blue_hat_factory import BlueHatFactory
+    from agents_intensive_capstone.agents.decomposition import DecompositionAgent
+    from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+
+    solver = SequentialAgent(
+        name="SixHatsSolver",
+        sub_agents=[
+            ParallelAgent(
+                name="SixHatsBrainstorm",
+                sub_agents=[BlackHatFactory.create(model=hats), GreenHatFactory.create(model=hats)],
+            ),
+            BlueHatFactory.create(model=blue),
+        ],
+    )
+    return DecompositionAgent(
+        name="SixHatsDecomposer",
+        sub_agents=[solver, BlueHatFactory.create_merger(model=blue)],
+        decomposer=ProblemDecomposer(),
+        max_workers=max_workers,
+        fan_in=fan_in,
+        cache=cache,
+    )
+
+
+def blue_responder(request) -> str:
+    from agents_intensive_capstone.models.tokens import request_text
+
+    text = request_text(request)
+    if "Sub-problem plans:" in text:
+        return f"Merged {text.count('## Sub-problem')} sub-problem sections."
+    return "Plan for this part."
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sub_problems_are_solved_then_merged_hierarchically(run_agent) -> None:
+    from agents_intensive_capstone.cache import InMemoryCacheBackend
+    from agents_intensive_capstone.models import StubLlm
+
+    hats, blue = StubLlm(), StubLlm(responder=blue_responder)
+    cache = InMemoryCacheBackend()
+    agent = build_decomposer(hats, blue, cache=cache)
+
+    _, session = await run_agent(agent, PROBLEM)
+
+    # 5 sub-problem plans, 3 merges of at most 2 (levels 5 -> 3 -> 2), final merge
+    assert len(hats.calls) == 10 and len(blue.calls) == 5 + 3 + 1
+    subproblems = session.state["decomposition_subproblems"]
+    assert [item["plan"] for item in subproblems] == ["Plan for this part."] * 5
+    assert not any(item["cached"] for item in subproblems)
+    assert session.state["decomposition_brief"].startswith("## Sub-problems 1-4\n")
+    assert "## Sub-problem 5: How do we keep one company culture" in (
+        session.state["decomposition_brief"]
+    )
+    assert session.state["blue_hat_final_plan"].startswith("Merged")
+    assert len(cache) == 5
+
+    # Each sub-problem is cached on its own: a new problem reuses the shared part
+    hats.reset()
+    blue.reset()
+    _, session = await run_agent(
+        agent, "1. Which city should host the new office?\n2. Should we rent or buy the building?"
+    )
+
+    assert len(hats.calls) == 2
+    assert [item["cached"] for item in session.state["decomposition_subproblems"]] == [True, False]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_problems_go_straight_through_the_solver(run_agent) -> None:
+    from agents_intensive_capstone.models import StubLlm
+
+    hats, blue = StubLlm(), StubLlm(responder=blue_responder)
+
+    _, session = await run_agent(build_decomposer(hats, blue))
+
+    assert len(blue.calls) == 1
+    assert session.state["blue_hat_final_plan"] == "Plan for this part."
+    assert "decomposition_subproblems" not in session.state
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_throughput_scales_with_the_worker_limit(run_agent) -> None:
+    from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+
+    elapsed = {}
+    for workers in (1, 4):
+        hats = StubLlm(latency=LatencyDistribution.constant(0.1))
+        blue = StubLlm(latency=LatencyDistribution.constant(0.1), responder=blue_responder)
+        agent = build_decomposer(hats, blue, max_workers=workers, fan_in=8)
+        start = time.perf_counter()
+        await run_agent(agent, "\n".join(PROBLEM.splitlines()[1:5]))
+        elapsed[workers] = time.perf_counter() - start
+
+    # 4 sub-problems of ~0.2s each (hats, then Blue Hat) plus a 0.1s merge
+    assert elapsed[1] > 0.8
+    assert elapsed[4] < elapsed[1] / 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cached_plans_are_not_reused_by_a_different_solver(run_agent) -> None:
+    from agents_intensive_capstone.cache import InMemoryCacheBackend
+    from agents_intensive_capstone.models import StubLlm
+
+    cache = InMemoryCacheBackend()
+    question = "1. Which city should host the new office?\n2. Should we rent or buy the building?"
+    first = build_decomposer(StubLlm(), StubLlm(responder=blue_responder), cache=cache)
+    await run_agent(first, question)
+
+    # Same question, same cache, but the hats run on another model
+    hats = StubLlm(model="gemini-stub-pro")
+    _, session = await run_agent(
+        build_decomposer(hats, StubLlm(responder=blue_responder), cache=cache), question
+    )
+
+    assert len(hats.calls) == 4
+    assert not any(item["cached"] for item in session.state["decomposition_subproblems"])
+    assert len(cache) == 4
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from agents_intensive_capstone.agents.hat_schemas import (
+    BlackHatOutput,
+    RedHatOutput,
+    parse_output,
+    render_condensed,
+    schema_instruction,
+    to_json,
+)
+
+RISKY_REPLY = """```json
+{
+  "summary": "Too risky this quarter.",
+  "risks": ["Data loss during migration", "", "Team lacks NoSQL experience",
+            "r3", "r4", "r5", "r6", "r7"],
+  "weak_assumptions": ["%s"],
+  "confidence": 0.4
+}
+```""" % ("x" * 500)
+
+
+@pytest.mark.unit
+def test_fields_over_their_cap_are_clipped() -> None:
+    output = parse_output(BlackHatOutput, RISKY_REPLY)
+
+    assert output.summary == "Too risky this quarter."
+    assert output.risks[:2] == ["Data loss during migration", "Team lacks NoSQL experience"]
+    assert len(output.risks) == 6
+    assert len(output.weak_assumptions[0]) == 160
+    assert output.weak_assumptions[0].endswith("…")
+
+
+@pytest.mark.unit
+def test_compact_json_drops_empty_fields_and_whitespace() -> None:
+    output = parse_output(RedHatOutput, '{"feelings": ["Anxious  about\\n change"]}')
+
+    compact = to_json(output)
+
+    assert compact == '{"feelings":["Anxious about change"]}'
+    assert json.loads(compact) == {"feelings": ["Anxious about change"]}
+
+
+@pytest.mark.unit
+def test_prose_replies_are_kept_as_a_clipped_summary() -> None:
+    output = parse_output(BlackHatOutput, "I think this is risky. " * 40)
+
+    assert output.risks == []
+    assert len(output.summary) <= 300 and output.summary.endswith("…")
+
+
+@pytest.mark.unit
+def test_instruction_lists_fields_and_caps_without_placeholders() -> None:
+    instruction = schema_instruction(BlackHatOutput)
+
+    assert "- risks (list of at most 6 strings of at most 200 characters)" in instruction
+    assert "- summary (string of at most 300 characters)" in instruction
+    assert "{" not in instruction and "}" not in instruction
+
+
+@pytest.mark.unit
+def test_condensed_rendering_is_markdown_without_json_syntax() -> None:
+    brief = render_condensed({"summary": "Go, carefully.", "risks": ["Data loss", "Skills"]})
+
+    assert brief == "Summary: Go, carefully.\n**Risks**\n- Data loss\n- Skills"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_structured_hat_feeds_the_blue_hat_brief(run_agent) -> None:
+    from google.adk.agents import SequentialAgent
+
+    from agents_intensive_capstone.agents import black_hat_factory
+    from agents_intensive_capstone.agents.context_compaction import ContextCompactionAgent
+    from agents_intensive_capstone.models import StubLlm
+
+    def reply(llm_request) -> str:
+        return '{"summary": "Risky.", "risks": ["Data loss", "Vendor lock-in"]}'
+
+    hat = black_hat_factory.BlackHatFactory.create(
+        model=StubLlm(responder=reply), output_schema=black_hat_factory.OUTPUT_SCHEMA
+    )
+    stage = ContextCompactionAgent(
+        name="BlueHatContextCompaction",
+        sources={black_hat_factory.OUTPUT_KEY: "Black Hat"},
+        token_budget=None,
+    )
+    pipeline = SequentialAgent(name="SixHatsSolver", sub_agents=[hat, stage])
+
+    _, session = await run_agent(pipeline)
+
+    assert "Output format: reply with a single JSON object" in hat.instruction
+    assert session.state["black_hat_plan"] == (
+        '{"summary":"Risky.","risks":["Data loss","Vendor lock-in"]}'
+    )
+    assert session.state["blue_hat_brief"] == (
+        "## Black Hat\nSummary: Risky.\n**Risks**\n- Data loss\n- Vendor lock-in"
+    )
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+from google.adk.agents import SequentialAgent
+
+from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+from agents_intensive_capstone.agents.blue_hat_factory import BlueHatFactory
+from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+from agents_intensive_capstone.agents.incremental_synthesis import IncrementalSynthesisAgent
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_each_hat_is_folded_in_completion_order(run_agent) -> None:
+    fast = StubLlm(latency=LatencyDistribution.constant(0.01))
+    slow = StubLlm(latency=LatencyDistribution.constant(0.2))
+    blue = StubLlm()
+
+    solver = SequentialAgent(
+        name="SixHatsSolver",
+        sub_agents=[
+            IncrementalSynthesisAgent(
+                name="SixHatsBrainstorm",
+                sub_agents=[BlackHatFactory.create(model=slow), GreenHatFactory.create(model=fast)],
+                synthesizer=BlueHatFactory.create_incremental(model=blue),
+            ),
+            BlueHatFactory.create_reconciler(model=blue),
+        ],
+    )
+
+    events, session = await run_agent(solver)
+
+    folds = [e.actions.state_delta["blue_hat_pending_hat"] for e in events
+             if "blue_hat_pending_hat" in e.actions.state_delta]
+    assert folds == ["GreenHatAgent", "BlackHatAgent"]
+    # Two incremental folds plus one reconciliation pass.
+    assert len(blue.calls) == 3
+    assert session.state["blue_hat_question"] == "Should we adopt a 4-day week?"
+    assert session.state["blue_hat_draft"]
+    assert session.state["blue_hat_final_plan"]
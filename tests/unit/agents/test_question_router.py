@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+from agents_intensive_capstone.agents.question_router import (
+    HatRouter,
+    QuestionRouterAgent,
+    classify_question,
+)
+from agents_intensive_capstone.models import StubLlm
+
+ALL_HATS = ("white", "red", "black", "yellow", "green")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "question, kind",
+    [
+        ("What is the capital of Australia?", "factual"),
+        ("What are the security risks and failure modes of our new API?", "risk"),
+        ("How can we improve onboarding? Any creative ideas?", "ideation"),
+        ("Should we switch our backend database to a NoSQL solution?", "decision"),
+    ],
+)
+def test_classify_question(question: str, kind: str) -> None:
+    assert classify_question(question)[0] == kind
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_confident_heuristic_routes_to_profile() -> None:
+    decision = await HatRouter(ALL_HATS).route("What is the capital of Australia?")
+
+    assert decision.hats == ("white",)
+    assert decision.skipped == ("red", "black", "yellow", "green")
+    assert decision.source == "heuristic"
+    assert decision.calls_saved == 6
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_unclear_question_runs_every_hat_without_model() -> None:
+    decision = await HatRouter(ALL_HATS).route("Thoughts on the Q3 roadmap")
+
+    assert decision.hats == ALL_HATS
+    assert decision.source == "default"
+    assert decision.calls_saved == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_model_fallback_picks_hats_and_counts_its_own_call() -> None:
+    model = StubLlm(responder=lambda request: "White, Black")
+
+    decision = await HatRouter(ALL_HATS, model=model).route("Thoughts on the Q3 roadmap")
+
+    assert decision.hats == ("white", "black")
+    assert decision.source == "model"
+    assert decision.calls_saved == 1 + 3 + 1 - 1
+    assert len(model.calls) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_router_runs_only_the_selected_hats(run_agent) -> None:
+    from google.adk.agents import ParallelAgent
+
+    from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+    from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+
+    factories = {"black": BlackHatFactory, "green": GreenHatFactory}
+    built = []
+
+    def build_stage(hats):
+        built.append(hats)
+        return ParallelAgent(
+            name="SixHatsBrainstorm",
+            sub_agents=[factories[hat].create(model=StubLlm()) for hat in hats],
+        )
+
+    router = QuestionRouterAgent(
+        name="SixHatsRouter",
+        router=HatRouter(("black", "green")),
+        build_stage=build_stage,
+        output_keys={"black": "black_hat_plan", "green": "green_hat_plan"},
+    )
+
+    events, session = await run_agent(router, "What are the safety risks of this plan?")
+    await run_agent(router, "What could go wrong? List the main risks and threats.")
+
+    assert built == [("black", "green")]
+    assert session.state["black_hat_plan"]
+    assert session.state["routing_decision"]["skipped"] == []
+    assert session.state["skipped_hats"] == []
+    assert {event.author for event in events} >= {"BlackHatAgent", "GreenHatAgent"}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_skipped_hats_are_reported_and_cleared(run_agent) -> None:
+    from google.adk.agents import ParallelAgent
+
+    from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+
+    router = QuestionRouterAgent(
+        name="SixHatsRouter",
+        router=HatRouter(("black", "green")),
+        build_stage=lambda hats: ParallelAgent(
+            name="SixHatsBrainstorm", sub_agents=[GreenHatFactory.create(model=StubLlm())]
+        ),
+        output_keys={"black": "black_hat_plan", "green": "green_hat_plan"},
+    )
+
+    events, session = await run_agent(router, "How can we improve onboarding? Any creative ideas?")
+
+    assert session.state["routing_decision"]["hats"] == ["green"]
+    assert session.state["skipped_hats"] == ["Black Hat"]
+    assert session.state["blue_hat_skipped_hats"] == "Black Hat"
+    assert session.state["black_hat_plan"] is None
+    assert "not consulted" in events[0].content.parts[0].text
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+from agents_intensive_capstone.agents.quorum_parallel_agent import QuorumParallelAgent
+from agents_intensive_capstone.models import (
+    BudgetedLlm,
+    LatencyDistribution,
+    RequestBudget,
+    StubLlm,
+)
+
+
+def make_hats():
+    fast = StubLlm(latency=LatencyDistribution.constant(0.01))
+    stuck = StubLlm(latency=LatencyDistribution.constant(30.0))
+    return GreenHatFactory.create(model=fast), BlackHatFactory.create(model=stuck)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_per_hat_timeout_reports_missing_perspective(run_agent) -> None:
+    green, black = make_hats()
+    stage = QuorumParallelAgent(
+        name="SixHatsBrainstorm",
+        sub_agents=[green, black],
+        hat_timeouts={"BlackHatAgent": 0.05},
+    )
+
+    events, session = await run_agent(stage)
+
+    assert session.state["green_hat_plan"]
+    assert "black_hat_plan" not in session.state
+    assert session.state["missing_perspectives"] == ["BlackHatAgent (timed out after 0.05s)"]
+    assert "BlackHatAgent" in events[-1].content.parts[0].text
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_quorum_cancels_late_hats(run_agent) -> None:
+    green, black = make_hats()
+    stage = QuorumParallelAgent(name="SixHatsBrainstorm", sub_agents=[green, black], quorum=1)
+
+    _, session = await run_agent(stage)
+
+    assert session.state["missing_perspectives"] == ["BlackHatAgent (cancelled (quorum reached))"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_all_hats_finishing_reports_nothing_missing(run_agent) -> None:
+    green, _ = make_hats()
+    stage = QuorumParallelAgent(name="SixHatsBrainstorm", sub_agents=[green], deadline=5.0)
+
+    _, session = await run_agent(stage)
+
+    assert session.state["missing_perspectives"] == []
+
+
+def budgeted(latency: float) -> BudgetedLlm:
+    stub = StubLlm(latency=LatencyDistribution.constant(latency))
+    return BudgetedLlm(model=stub.model, inner=stub)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_spent_token_budget_cancels_running_hats(run_agent) -> None:
+    green = GreenHatFactory.create(model=budgeted(0.01))
+    black = BlackHatFactory.create(model=budgeted(30.0))
+    stage = QuorumParallelAgent(
+        name="SixHatsBrainstorm", sub_agents=[green, black], budget=RequestBudget(max_tokens=10)
+    )
+
+    _, session = await asyncio.wait_for(run_agent(stage), timeout=5.0)
+
+    assert session.state["green_hat_plan"]
+    assert session.state["missing_perspectives"] == [
+        "BlackHatAgent (cancelled (budget exhausted: tokens))"
+    ]
+    usage = session.state["request_budget_usage"]
+    assert usage["model_calls"] == 2 and usage["exhausted"] == "tokens"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_model_call_budget_refuses_further_calls(run_agent) -> None:
+    green = GreenHatFactory.create(model=budgeted(0.01))
+    black = BlackHatFactory.create(model=budgeted(0.01))
+    stage = QuorumParallelAgent(
+        name="SixHatsBrainstorm", sub_agents=[green, black], budget=RequestBudget(max_model_calls=1)
+    )
+
+    _, session = await run_agent(stage)
+
+    [missing] = session.state["missing_perspectives"]
+    assert missing.endswith("(stopped (request budget exhausted (model calls)))")
+    assert session.state["request_budget_usage"]["model_calls"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_wall_time_budget_cuts_off_slow_hats(run_agent) -> None:
+    green = GreenHatFactory.create(model=budgeted(0.01))
+    black = BlackHatFactory.create(model=budgeted(30.0))
+    stage = QuorumParallelAgent(
+        name="SixHatsBrainstorm",
+        sub_agents=[green, black],
+        budget=RequestBudget(max_wall_seconds=0.2),
+    )
+
+    _, session = await asyncio.wait_for(run_agent(stage), timeout=5.0)
+
+    assert session.state["missing_perspectives"] == [
+        "BlackHatAgent (cancelled (budget exhausted: wall time))"
+    ]
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import pathlib
+
+import pytest
+from google.adk.agents import ParallelAgent, SequentialAgent
+
+from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+from agents_intensive_capstone.agents.blue_hat_factory import BlueHatFactory
+from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+from agents_intensive_capstone.agents.question_router import HatRouter, QuestionRouterAgent
+from agents_intensive_capstone.batch import BatchItem, BatchRunner, load_checkpoint, read_questions
+from agents_intensive_capstone.batch.runner import output_keys
+from agents_intensive_capstone.models import StubLlm
+
+
+def make_solver() -> SequentialAgent:
+    model = StubLlm()
+    return SequentialAgent(
+        name="SixHatsSolver",
+        sub_agents=[
+            ParallelAgent(
+                name="SixHatsBrainstorm", sub_agents=[BlackHatFactory.create(model=model)]
+            ),
+            BlueHatFactory.create(model=model),
+        ],
+    )
+
+
+def read_records(path: pathlib.Path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.unit
+def test_read_questions_supports_jsonl_and_csv(tmp_path: pathlib.Path) -> None:
+    jsonl = tmp_path / "q.jsonl"
+    jsonl.write_text('"bare question"\n\n{"id": "q7", "question": "with id"}\n')
+    csv_file = tmp_path / "q.csv"
+    csv_file.write_text("id,question\n,first\nb,second\n")
+
+    assert list(read_questions(str(jsonl))) == [
+        BatchItem("1", "bare question"),
+        BatchItem("q7", "with id"),
+    ]
+    assert list(read_questions(str(csv_file))) == [
+        BatchItem("1", "first"),
+        BatchItem("b", "second"),
+    ]
+
+
+@pytest.mark.unit
+def test_load_checkpoint_truncates_torn_last_line(tmp_path: pathlib.Path) -> None:
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        '{"id": "1", "status": "ok"}\n{"id": "2", "status": "error"}\n{"id": "3", "st'
+    )
+
+    assert load_checkpoint(str(output)) == {"1"}
+    assert len(read_records(output)) == 2
+
+
+@pytest.mark.unit
+def test_load_checkpoint_skips_only_unreadable_lines(tmp_path: pathlib.Path) -> None:
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"id": "1", "status": "ok"}\n{"id": "2", "st\n{"id": "3", "status": "ok"}\n')
+
+    assert load_checkpoint(str(output)) == {"1", "3"}
+
+
+@pytest.mark.unit
+def test_load_checkpoint_ends_the_last_record_with_a_newline(tmp_path: pathlib.Path) -> None:
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"id": "1", "status": "ok"}')
+
+    assert load_checkpoint(str(output)) == {"1"}
+    with open(output, "a", encoding="utf-8") as fh:
+        fh.write('{"id": "2", "status": "ok"}\n')
+    assert [record["id"] for record in read_records(output)] == ["1", "2"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_writes_results_and_resumes(tmp_path: pathlib.Path) -> None:
+    output = tmp_path / "out.jsonl"
+    output.write_text(json.dumps({"id": "a", "status": "ok"}) + "\n")
+    items = [BatchItem("a", "done already"), BatchItem("b", "Q b"), BatchItem("c", "Q c")]
+
+    stats = await BatchRunner(make_solver(), str(output), concurrency=2).run(iter(items))
+
+    assert stats == {"ok": 2, "error": 0, "skipped": 1}
+    records = {r["id"]: r for r in read_records(output)}
+    assert set(records) == {"a", "b", "c"}
+    assert records["b"]["blue_hat_final_plan"]
+    assert records["b"]["hat_outputs"]["black_hat_plan"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_routed_hat_outputs_are_recorded(tmp_path: pathlib.Path) -> None:
+    model = StubLlm()
+    hats = {"black": BlackHatFactory.create, "green": GreenHatFactory.create}
+    router = QuestionRouterAgent(
+        name="SixHatsRouter",
+        router=HatRouter(tuple(hats)),
+        build_stage=lambda selected: ParallelAgent(
+            name="SixHatsBrainstorm", sub_agents=[hats[hat](model=model) for hat in selected]
+        ),
+        output_keys={"black": "black_hat_plan", "green": "green_hat_plan"},
+    )
+    solver = SequentialAgent(
+        name="SixHatsSolver", sub_agents=[router, BlueHatFactory.create(model=model)]
+    )
+    output = tmp_path / "out.jsonl"
+
+    assert output_keys(solver) == ["black_hat_plan", "green_hat_plan", "blue_hat_final_plan"]
+    await BatchRunner(solver, str(output)).run(
+        iter([BatchItem("a", "How can we improve onboarding? Any creative ideas?")])
+    )
+
+    [record] = read_records(output)
+    assert record["hat_outputs"]["green_hat_plan"]
+    assert record["hat_outputs"]["black_hat_plan"] is None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from agents_intensive_capstone.cache.backends import (
+    InMemoryCacheBackend,
+    SqliteCacheBackend,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request: pytest.FixtureRequest, tmp_path: pathlib.Path):
+    def _make(**kwargs):
+        if request.param == "memory":
+            return InMemoryCacheBackend(**kwargs)
+        return SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), **kwargs)
+
+    return _make
+
+
+@pytest.mark.unit
+def test_get_returns_stored_value(make_backend) -> None:
+    backend = make_backend()
+
+    backend.set("k", "v")
+
+    assert backend.get("k") == "v"
+    assert backend.get("missing") is None
+
+
+@pytest.mark.unit
+def test_lru_eviction_keeps_recently_used(make_backend) -> None:
+    clock = FakeClock()
+    backend = make_backend(max_entries=2, clock=clock)
+
+    backend.set("a", "1")
+    clock.now += 1
+    backend.set("b", "2")
+    clock.now += 1
+    assert backend.get("a") == "1"  # "a" is now most recently used
+    clock.now += 1
+    backend.set("c", "3")
+
+    assert len(backend) == 2
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.get("c") == "3"
+
+
+@pytest.mark.unit
+def test_ttl_expiry(make_backend) -> None:
+    clock = FakeClock()
+    backend = make_backend(ttl_seconds=10, clock=clock)
+
+    backend.set("k", "v")
+    clock.now += 5
+    assert backend.get("k") == "v"
+    clock.now += 6
+
+    assert backend.get("k") is None
+    assert len(backend) == 0
+
+
+@pytest.mark.unit
+def test_sqlite_backend_persists_across_instances(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    SqliteCacheBackend(path).set("k", "v")
+
+    assert SqliteCacheBackend(path).get("k") == "v"
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agents_intensive_capstone.agents import factory
+from agents_intensive_capstone.cache import response_cache
+from agents_intensive_capstone.cache.response_cache import ResponseCache
+from agents_intensive_capstone.models import StubLlm
+
+
+def request(text: str) -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+def answer(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def turn(invocation_id: str) -> SimpleNamespace:
+    return SimpleNamespace(invocation_id=invocation_id, agent_name="BlackHatAgent")
+
+
+async def ask(agent, question: str) -> str:
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = await runner.session_service.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="test", user_id="u", session_id=session.id
+    )
+    return session.state["black_hat_plan"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_repeated_question_is_answered_without_the_model() -> None:
+    model, cache = StubLlm(), ResponseCache()
+    agent = factory.build_agent(
+        name="BlackHatAgent",
+        model=model,
+        tools=[],
+        prompt_filename="black_hat_prompt.txt",
+        output_key="black_hat_plan",
+        cache=cache,
+    )
+
+    first = await ask(agent, "Should we adopt a 4-day week?")
+    second = await ask(agent, "should we  adopt a 4-day WEEK?")
+
+    assert second == first
+    assert len(model.calls) == 1
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+@pytest.mark.unit
+def test_key_changes_with_the_prompt_and_the_model() -> None:
+    cache = ResponseCache()
+    stored = cache.bind("BlackHatAgent", "prompt-v1", "gemini-2.5-flash")
+    assert stored.before_model(turn("1"), request("hi")) is None
+    stored.after_model(turn("1"), answer("cached"))
+
+    hit = stored.before_model(turn("2"), request("hi"))
+    assert hit is not None and hit.content.parts[0].text == "cached"
+
+    changed = [("3", "prompt-v2", "gemini-2.5-flash"), ("4", "prompt-v1", "stub-gpt")]
+    for invocation_id, prompt_hash, model in changed:
+        callbacks = cache.bind("BlackHatAgent", prompt_hash, model)
+        assert callbacks.before_model(turn(invocation_id), request("hi")) is None
+    assert cache.stats == {"hits": 1, "misses": 3}
+
+
+@pytest.mark.unit
+def test_failed_and_abandoned_turns_do_not_pile_up(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(response_cache, "MAX_PENDING_TURNS", 2)
+    cache = ResponseCache()
+    callbacks = cache.bind("BlackHatAgent", "prompt", "gemini-2.5-flash")
+
+    callbacks.before_model(turn("failed"), request("hi"))
+    callbacks.on_model_error(turn("failed"), request("hi"), RuntimeError("503"))
+    assert not cache._pending
+
+    for invocation_id in ("1", "2", "3"):
+        callbacks.before_model(turn(invocation_id), request(f"question {invocation_id}"))
+    assert list(cache._pending) == [("2", "BlackHatAgent"), ("3", "BlackHatAgent")]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import pathlib
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import BaseTool
+from google.genai import types
+
+from agents_intensive_capstone.agents.black_hat_factory import OUTPUT_KEY, BlackHatFactory
+from agents_intensive_capstone.cassettes import (
+    AUTO,
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteLlm,
+    CassetteMissError,
+    CassetteTool,
+)
+from agents_intensive_capstone.cassettes.wrappers import model_fingerprint
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+
+
+async def run_hat(model: Any, question: str = "Should we adopt a 4-day week?") -> str:
+    runner = InMemoryRunner(agent=BlackHatFactory.create(model=model), app_name="test")
+    session = await runner.session_service.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+    session = await runner.session_service.get_session(
+        app_name="test", user_id="u", session_id=session.id
+    )
+    return session.state[OUTPUT_KEY]
+
+
+def taped(inner: StubLlm, cassette: Cassette) -> CassetteLlm:
+    return CassetteLlm(model=inner.model, inner=inner, cassette=cassette)
+
+
+def request(text: str, call_id: str = "") -> LlmRequest:
+    parts = [types.Part(text=text)]
+    if call_id:
+        call = types.FunctionCall(id=call_id, name="lookup", args={"q": "x"})
+        parts.append(types.Part(function_call=call))
+    return LlmRequest(model="gemini-stub", contents=[types.Content(role="user", parts=parts)])
+
+
+class CountingTool(BaseTool):
+    def __init__(self) -> None:
+        super().__init__(name="web_search", description="Searches the web.")
+        self.queries: List[str] = []
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: Any) -> Any:
+        self.queries.append(args["request"])
+        return {"results": [f"about {args['request']}"]}
+
+
+@pytest.fixture
+def path(tmp_path: pathlib.Path) -> str:
+    return str(tmp_path / "hat.cassette.jsonl")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_recorded_hat_run_replays_without_the_model(path: str) -> None:
+    live = StubLlm(latency=LatencyDistribution.constant(0.05))
+    recorded = await run_hat(taped(live, Cassette(path, RECORD)))
+
+    broken = StubLlm(failure_rate=1.0)
+    cassette = Cassette(path, REPLAY)
+    replayed = await run_hat(taped(broken, cassette))
+
+    assert replayed == recorded
+    assert broken.calls == []
+    assert cassette.stats == {"hits": 1, "misses": 0, "recorded": 0}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_replay_fails_loudly_on_unrecorded_requests(path: str) -> None:
+    await run_hat(taped(StubLlm(), Cassette(path, RECORD)))
+    model = taped(StubLlm(), Cassette(path, REPLAY))
+
+    with pytest.raises(CassetteMissError):
+        await run_hat(model, question="Should we open an office in Lisbon?")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_auto_mode_records_only_new_requests(path: str) -> None:
+    live = StubLlm()
+    await run_hat(taped(live, Cassette(path, AUTO)))
+    cassette = Cassette(path, AUTO)
+    model = taped(live, cassette)
+
+    await run_hat(model)
+    await run_hat(model, question="Should we open an office in Lisbon?")
+
+    assert len(live.calls) == 2
+    assert cassette.stats == {"hits": 1, "misses": 1, "recorded": 1}
+    with open(path, encoding="utf-8") as fh:
+        assert [json.loads(line)["kind"] for line in fh] == ["model", "model"]
+
+
+@pytest.mark.unit
+def test_fingerprint_ignores_formatting_and_call_ids() -> None:
+    assert model_fingerprint(request("Should  we expand?", "adk-1")) == model_fingerprint(
+        request("should we expand?\n", "adk-2")
+    )
+    assert model_fingerprint(request("Should we expand?")) != model_fingerprint(
+        request("Should we contract?")
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tool_results_replay_by_normalized_arguments(path: str) -> None:
+    context = SimpleNamespace()
+    live = CountingTool()
+    recorder = CassetteTool(live, Cassette(path, RECORD))
+    await recorder.run_async(args={"request": "EV adoption"}, tool_context=context)
+    await recorder.run_async(args={"request": "Heat pumps"}, tool_context=context)
+
+    replayed = CountingTool()
+    player = CassetteTool(replayed, Cassette(path, REPLAY))
+    result = await player.run_async(args={"request": "ev  adoption"}, tool_context=context)
+
+    assert result == {"results": ["about EV adoption"]}
+    assert replayed.queries == []
+    assert live.queries == ["EV adoption", "Heat pumps"]
+
+
+@pytest.mark.unit
+def test_replaying_a_missing_cassette_is_an_error(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.jsonl"), REPLAY)
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "missing.jsonl"), "rewind")
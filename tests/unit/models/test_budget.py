@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncGenerator, List
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agents_intensive_capstone.models import BudgetedLlm, BudgetExceeded, RequestBudget, StubLlm
+from agents_intensive_capstone.models.budget import BudgetTracker, set_budget_tracker
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ToolCallingLlm(BaseLlm):
+    """Asks for ``calls`` tool calls per response, reporting 50 tokens of usage."""
+
+    model: str = "gemini-tools"
+    calls: int = 2
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        parts = [
+            types.Part(function_call=types.FunctionCall(name="search", args={"q": str(i)}))
+            for i in range(self.calls)
+        ]
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=50),
+        )
+
+
+def request(text: str = "Should we expand?") -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def call(model: BaseLlm) -> List[LlmResponse]:
+    return [r async for r in model.generate_content_async(request())]
+
+
+async def in_budget(tracker: BudgetTracker, model: BaseLlm) -> List[Any]:
+    # A fresh task, like a brainstorm hat, so the binding does not leak
+    async def run() -> List[Any]:
+        set_budget_tracker(tracker)
+        return await call(model)
+
+    return await asyncio.create_task(run())
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_calls_outside_a_budget_pass_through() -> None:
+    stub = StubLlm()
+    responses = await call(BudgetedLlm(model=stub.model, inner=stub))
+
+    assert len(responses) == 1 and len(stub.calls) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_usage_and_requested_tool_calls_are_charged() -> None:
+    inner = ToolCallingLlm()
+    model = BudgetedLlm(model=inner.model, inner=inner)
+    tracker = BudgetTracker(RequestBudget(max_tool_calls=3))
+
+    await in_budget(tracker, model)
+    assert (tracker.tokens, tracker.model_calls, tracker.tool_calls) == (50, 1, 2)
+    assert not tracker.exhausted.is_set()
+
+    await in_budget(tracker, model)
+    assert tracker.exhausted.is_set() and tracker.reason == "tool calls"
+    with pytest.raises(BudgetExceeded):
+        await in_budget(tracker, model)
+    assert tracker.usage["refused_model_calls"] == 1
+
+
+@pytest.mark.unit
+def test_limits_are_spent_only_once_exceeded() -> None:
+    tracker = BudgetTracker(RequestBudget(max_tokens=10, max_tool_calls=2))
+
+    tracker.charge(tokens=10, tool_calls=2)
+    assert not tracker.exhausted.is_set()
+
+    tracker.charge(tokens=1)
+    assert tracker.reason == "tokens"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tokens_are_estimated_without_usage_metadata() -> None:
+    class NoUsageStub(StubLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            async for response in super().generate_content_async(llm_request, stream):
+                response.usage_metadata = None
+                yield response
+
+    stub = NoUsageStub(output_tokens=40)
+    tracker = BudgetTracker(RequestBudget(max_tokens=30))
+
+    await in_budget(tracker, BudgetedLlm(model=stub.model, inner=stub))
+
+    assert tracker.tokens >= 40
+    assert tracker.reason == "tokens"
+
+
+@pytest.mark.unit
+def test_model_call_limit_refuses_without_cancelling() -> None:
+    tracker = BudgetTracker(RequestBudget(max_model_calls=1))
+    tracker.start_model_call()
+
+    with pytest.raises(BudgetExceeded, match="model calls"):
+        tracker.start_model_call()
+    assert not tracker.exhausted.is_set()
+    assert tracker.model_calls == 1
+
+
+@pytest.mark.unit
+def test_wall_time_is_checked_before_each_call() -> None:
+    clock = FakeClock()
+    tracker = BudgetTracker(RequestBudget(max_wall_seconds=5), clock=clock)
+    tracker.start_model_call()
+    clock.now += 5
+
+    with pytest.raises(BudgetExceeded, match="wall time"):
+        tracker.start_model_call()
+    assert tracker.exhausted.is_set()
+
+
+@pytest.mark.unit
+def test_per_request_overrides_replace_configured_limits() -> None:
+    budget = RequestBudget(max_tokens=10_000, max_model_calls=20)
+
+    merged = budget.merge({"max_tokens": 2_000, "max_wall_seconds": None})
+
+    assert merged == RequestBudget(max_tokens=2_000, max_model_calls=20)
+    assert budget.merge(None) is budget
+    with pytest.raises(ValueError):
+        budget.merge({"max_dollars": 1})
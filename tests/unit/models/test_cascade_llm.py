@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import AsyncGenerator, Optional
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agents_intensive_capstone.models import CascadeLlm, QualityCheck, StubLlm
+from agents_intensive_capstone.models.cascade import parse_confidence, strip_confidence
+
+
+class ToolCallingLlm(BaseLlm):
+    model: str = "gemini-tools"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        call = types.FunctionCall(name="google_search", args={"query": "x"})
+        part = types.Part(function_call=call)
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def stub(name: str, answer: str) -> StubLlm:
+    return StubLlm(model=name, responder=lambda request: answer)
+
+
+async def call(model: BaseLlm) -> LlmResponse:
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+    responses = [r async for r in model.generate_content_async(request)]
+    return responses[-1]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_short_answer_escalates_to_next_tier() -> None:
+    cheap, strong = stub("gemini-cheap", "Too short."), stub("gemini-strong", "A" * 50)
+    model = CascadeLlm(model=cheap.model, tiers=[cheap, strong], check=QualityCheck(min_chars=20))
+
+    response = await call(model)
+
+    assert response.content.parts[0].text == "A" * 50
+    assert len(cheap.calls) == 1 and len(strong.calls) == 1
+    stats = model.stats
+    assert stats["escalation_rate"] == 1.0
+    assert stats["tiers"]["gemini-cheap"]["rejections"] == {"shorter": 1}
+    assert stats["tiers"]["gemini-strong"]["accepted"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_good_answer_stays_on_cheap_tier() -> None:
+    cheap = stub("gemini-cheap", "## Risks\nPlenty of detail here.")
+    strong = stub("gemini-strong", "unused")
+    check = QualityCheck(min_chars=10, required_sections=("## Risks",))
+    model = CascadeLlm(model=cheap.model, tiers=[cheap, strong], check=check)
+
+    await call(model)
+
+    assert strong.calls == []
+    assert model.stats["escalation_rate"] == 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tool_calls_are_not_escalated() -> None:
+    cheap, strong = ToolCallingLlm(), stub("gemini-strong", "unused")
+    model = CascadeLlm(model=cheap.model, tiers=[cheap, strong], check=QualityCheck(min_chars=500))
+
+    response = await call(model)
+
+    assert response.content.parts[0].function_call.name == "google_search"
+    assert strong.calls == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_low_confidence_escalates_and_rating_is_stripped() -> None:
+    cheap = stub("gemini-cheap", "Maybe.\nConfidence: 0.3")
+    strong = stub("gemini-strong", "Surely.\nConfidence: 9/10")
+    check = QualityCheck(min_confidence=0.7)
+    model = CascadeLlm(model=cheap.model, tiers=[cheap, strong], check=check)
+
+    response = await call(model)
+
+    assert response.content.parts[0].text == "Surely."
+    assert model.stats["tiers"]["gemini-cheap"]["rejections"] == {"confidence": 1}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Answer\nConfidence: 0.85", 0.85),
+        ("Answer\n**Confidence:** 80%", 0.8),
+        ("Answer\nConfidence: 7/10", 0.7),
+        ("Answer\nConfidence: 7", 0.7),
+        ("Answer without a rating", None),
+    ],
+)
+def test_parse_confidence(text: str, expected: Optional[float]) -> None:
+    if expected is None:
+        assert parse_confidence(text) is None
+    else:
+        assert parse_confidence(text) == pytest.approx(expected)
+
+
+@pytest.mark.unit
+def test_strip_confidence() -> None:
+    assert strip_confidence("Answer\n\nConfidence: 0.9\n") == "Answer"
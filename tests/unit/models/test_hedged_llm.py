@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncGenerator, List
+
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agents_intensive_capstone.models import HedgedLlm
+
+
+class ScriptedLlm(BaseLlm):
+    """Serves call ``i`` after ``latencies[i]`` seconds."""
+
+    model: str = "gemini-scripted"
+    latencies: List[float] = []
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        index = self.calls
+        self.calls += 1
+        await asyncio.sleep(self.latencies[index])
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=str(index))]))
+
+
+async def call(model: BaseLlm, stream: bool = False) -> str:
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+    responses = [r async for r in model.generate_content_async(request, stream=stream)]
+    return responses[-1].content.parts[0].text
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_hedge_wins() -> None:
+    inner = ScriptedLlm(latencies=[0.01, 0.01, 0.01, 5.0, 0.01])
+    model = HedgedLlm(model=inner.model, inner=inner, hedge_percentile=90, min_samples=3)
+
+    for _ in range(3):
+        await call(model)
+    result = await asyncio.wait_for(call(model), timeout=1.0)
+
+    assert result == "4"
+    assert model.stats == {"hedges_fired": 1, "hedges_won": 1}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_no_hedging_while_warming_up() -> None:
+    inner = ScriptedLlm(latencies=[0.05])
+    model = HedgedLlm(model=inner.model, inner=inner, min_samples=3)
+
+    assert await call(model) == "0"
+    assert model.stats["hedges_fired"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_winning_hedge_records_the_primary_latency() -> None:
+    inner = ScriptedLlm(latencies=[0.05, 0.05, 0.05, 5.0, 0.001])
+    model = HedgedLlm(model=inner.model, inner=inner, hedge_percentile=90, min_samples=3)
+
+    for _ in range(3):
+        await call(model)
+    delay = model.hedge_delay
+    await asyncio.wait_for(call(model), timeout=1.0)
+
+    # The primary ran for at least the hedge delay; the hedge alone took ~1ms
+    assert model._latencies[-1] >= delay
+    assert model.hedge_delay >= delay
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_streamed_call_is_hedged_until_its_first_chunk() -> None:
+    inner = ScriptedLlm(latencies=[0.01, 0.01, 0.01, 5.0, 0.01])
+    model = HedgedLlm(model=inner.model, inner=inner, hedge_percentile=90, min_samples=3)
+
+    for _ in range(3):
+        await call(model, stream=True)
+    assert model.hedge_delay is None and model.stream_hedge_delay is not None
+    result = await asyncio.wait_for(call(model, stream=True), timeout=1.0)
+
+    assert result == "4"
+    assert model.stats == {"hedges_fired": 1, "hedges_won": 1}
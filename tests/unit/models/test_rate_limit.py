@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from agents_intensive_capstone.models import RateLimit, RateLimitedLlm, RateLimiter, StubLlm
+from agents_intensive_capstone.models.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def limiter(limit: RateLimit, clock: FakeClock) -> RateLimiter:
+    return RateLimiter("gemini-test", limit, clock=clock, sleep=clock.sleep)
+
+
+@pytest.mark.unit
+def test_token_bucket_refills_continuously() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+
+    bucket.take(60)
+    assert bucket.delay(30) == pytest.approx(30.0)
+    clock.now = 10.0
+    assert bucket.level == pytest.approx(10.0)
+    assert bucket.delay(1000) == pytest.approx(50.0)  # capped at the capacity
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sessions_are_served_round_robin() -> None:
+    clock = FakeClock()
+    rate_limiter = limiter(RateLimit(requests_per_minute=1), clock)
+    served: List[str] = []
+
+    async def call(session: str, label: str) -> None:
+        await rate_limiter.acquire(session=session)
+        served.append(label)
+
+    await asyncio.gather(call("a", "a1"), call("a", "a2"), call("a", "a3"), call("b", "b1"))
+
+    assert served == ["a1", "b1", "a2", "a3"]
+    assert clock.now == pytest.approx(180.0)
+    stats = rate_limiter.stats
+    assert stats["requests"] == 4
+    assert stats["delayed"] == 3
+    assert stats["wait_seconds_max"] == pytest.approx(180.0)
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_actual_usage_above_estimate_delays_later_calls() -> None:
+    clock = FakeClock()
+    rate_limiter = limiter(RateLimit(tokens_per_minute=600), clock)
+
+    assert await rate_limiter.acquire(tokens=600) == 0.0
+    rate_limiter.settle(estimated_tokens=600, actual_tokens=660)
+
+    # 60 tokens of debt plus 10 requested, refilled at 10 tokens per second
+    assert await rate_limiter.acquire(tokens=10) == pytest.approx(7.0)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_skipped() -> None:
+    clock = FakeClock()
+    rate_limiter = limiter(RateLimit(requests_per_minute=1), clock)
+    await rate_limiter.acquire()
+
+    waiting = asyncio.create_task(rate_limiter.acquire(session="a"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    waited = await rate_limiter.acquire(session="b")
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert waited == pytest.approx(60.0)
+    assert rate_limiter.stats["requests"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_wrappers_of_one_model_share_a_limiter() -> None:
+    limit = RateLimit(requests_per_minute=100)
+    first, second = (
+        RateLimitedLlm(model="gemini-shared", inner=StubLlm(model="gemini-shared"), limit=limit)
+        for _ in range(2)
+    )
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+
+    for model in (first, second):
+        [r async for r in model.generate_content_async(request)]
+
+    assert first.limiter is second.limiter
+    assert first.limiter.stats["requests"] == 2
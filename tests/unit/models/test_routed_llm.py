@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from agents_intensive_capstone.models import LatencyDistribution, RoutedLlm, StubLlm
+
+
+def request(*tools: types.Tool) -> LlmRequest:
+    return LlmRequest(
+        model="routed",
+        contents=[types.Content(role="user", parts=[types.Part(text="hi")])],
+        config=types.GenerateContentConfig(tools=list(tools)),
+    )
+
+
+def stub(name: str, seconds: float = 0.01, failure_rate: float = 0.0) -> StubLlm:
+    return StubLlm(
+        model=name, latency=LatencyDistribution.constant(seconds), failure_rate=failure_rate
+    )
+
+
+async def answer(model: RoutedLlm, llm_request: LlmRequest | None = None) -> str:
+    responses = [r async for r in model.generate_content_async(llm_request or request())]
+    return responses[-1].content.parts[0].text
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_call_fails_over_to_the_next_provider() -> None:
+    broken, backup = stub("gemini-stub", failure_rate=1.0), stub("stub-gpt")
+    model = RoutedLlm(model="routed", providers=[broken, backup])
+
+    assert "from stub-gpt" in await answer(model)
+
+    stats = model.stats
+    assert stats["failovers"] == 1
+    assert stats["providers"]["gemini-stub"]["errors"] == 1
+    assert stats["providers"]["stub-gpt"]["calls"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_call_missing_the_latency_slo_fails_over() -> None:
+    slow, fast = stub("gemini-stub", seconds=1.0), stub("stub-gpt", seconds=0.01)
+    model = RoutedLlm(model="routed", providers=[slow, fast], latency_slo_seconds=0.05)
+
+    start = time.perf_counter()
+    text = await answer(model)
+
+    assert "from stub-gpt" in text and time.perf_counter() - start < 0.5
+    assert model.stats["providers"]["gemini-stub"]["slo_misses"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_calls_go_to_the_faster_provider_once_both_are_measured() -> None:
+    slower, faster = stub("gemini-stub", seconds=0.04), stub("stub-gpt", seconds=0.01)
+    model = RoutedLlm(model="routed", providers=[slower, faster], min_samples=2)
+
+    for _ in range(10):
+        await answer(model)
+
+    # Two calls each to measure them, then the faster one only
+    assert len(slower.calls) == 2 and len(faster.calls) == 8
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failing_provider_is_skipped_during_its_cooldown() -> None:
+    broken, backup = stub("gemini-stub", failure_rate=1.0), stub("stub-gpt")
+    model = RoutedLlm(
+        model="routed", providers=[broken, backup], min_samples=2, cooldown_seconds=60
+    )
+
+    texts = await asyncio.gather(*(answer(model) for _ in range(2)))
+    texts += [await answer(model) for _ in range(5)]
+
+    assert all("from stub-gpt" in text for text in texts)
+    assert len(broken.calls) == 2
+    assert model.stats["providers"]["gemini-stub"]["open"] is True
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_google_search_requests_stay_on_gemini() -> None:
+    gpt, gemini = stub("stub-gpt"), stub("gemini-stub")
+    model = RoutedLlm(model="routed", providers=[gpt, gemini])
+
+    search = types.Tool(google_search=types.GoogleSearch())
+    assert "from gemini-stub" in await answer(model, request(search))
+    assert "from stub-gpt" in await answer(model)
+    assert [p.model for p in model.ranking(request(search))] == ["gemini-stub"]
+
+
+@pytest.mark.unit
+def test_providers_with_the_same_model_are_rejected() -> None:
+    with pytest.raises(ValueError, match="distinct models"):
+        RoutedLlm(model="routed", providers=[stub("stub-gpt"), stub("stub-gpt", seconds=0.5)])
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from agents_intensive_capstone.models import (
+    AdmissionLimits,
+    AdmissionRejected,
+    AdmissionScheduler,
+    LatencyDistribution,
+    ScheduledLlm,
+    StubLlm,
+    scheduler_prometheus_text,
+)
+from agents_intensive_capstone.models.scheduler import (
+    BATCH,
+    DEFAULT,
+    INTERACTIVE,
+    PRIORITY_KEY,
+    priority_callback,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_freed_slots_go_to_the_most_urgent_class_first() -> None:
+    scheduler = AdmissionScheduler("gemini", AdmissionLimits(max_concurrent=1))
+    admitted: List[str] = []
+
+    async def call(priority: str, label: str) -> None:
+        await scheduler.acquire(priority)
+        admitted.append(label)
+        await asyncio.sleep(0.01)
+        scheduler.release()
+
+    await scheduler.acquire(DEFAULT)
+    calls = [
+        asyncio.create_task(call(priority, label))
+        for priority, label in (
+            (BATCH, "batch-1"),
+            (DEFAULT, "default-1"),
+            (BATCH, "batch-2"),
+            (INTERACTIVE, "interactive-1"),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth() == 4
+    scheduler.release()
+    await asyncio.gather(*calls)
+
+    assert admitted == ["interactive-1", "default-1", "batch-1", "batch-2"]
+    assert scheduler.active == 0
+    stats = scheduler.stats["priorities"]
+    assert stats[BATCH]["admitted"] == 2 and stats[BATCH]["wait_seconds_max"] > 0.02
+    assert stats[INTERACTIVE]["wait_seconds_max"] < stats[BATCH]["wait_seconds_max"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_full_queue_rejects_at_once_and_other_classes_still_queue() -> None:
+    scheduler = AdmissionScheduler("litellm", AdmissionLimits(max_concurrent=1, max_queue=1))
+    await scheduler.acquire(BATCH)
+    queued = asyncio.create_task(scheduler.acquire(BATCH))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected, match="1 calls already queued") as rejected:
+        await scheduler.acquire(BATCH)
+    interactive = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+
+    assert rejected.value.priority == BATCH and rejected.value.backend == "litellm"
+    assert scheduler.stats["priorities"][BATCH]["rejected"] == 1
+    assert scheduler.queue_depth() == 2
+    scheduler.release()
+    await interactive
+    assert not queued.done()
+    scheduler.release()
+    await queued
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_wait_over_the_timeout_is_rejected_and_leaves_no_waiter() -> None:
+    scheduler = AdmissionScheduler(
+        "gemini", AdmissionLimits(max_concurrent=1, queue_timeout_seconds=0.02)
+    )
+    await scheduler.acquire()
+
+    with pytest.raises(AdmissionRejected, match="no slot within 0.02s"):
+        await scheduler.acquire()
+
+    assert scheduler.queue_depth() == 0
+    assert scheduler.stats["priorities"][DEFAULT]["timed_out"] == 1
+    scheduler.release()
+    assert scheduler.active == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_scheduled_llm_caps_concurrent_calls_per_backend() -> None:
+    inner = StubLlm(latency=LatencyDistribution.constant(0.05))
+    limits = AdmissionLimits(max_concurrent=2, max_queue=8)
+    first = ScheduledLlm(model=inner.model, inner=inner, backend="test-backend", limits=limits)
+    second = ScheduledLlm(model=inner.model, inner=inner, backend="test-backend", limits=limits)
+    peak = 0
+
+    async def call(model: ScheduledLlm) -> None:
+        nonlocal peak
+        request = LlmRequest(
+            model=model.model,
+            contents=[types.Content(role="user", parts=[types.Part(text="hi")])],
+        )
+        async for _ in model.generate_content_async(request, stream=True):
+            peak = max(peak, model.scheduler.active)
+
+    await asyncio.gather(*(call(model) for model in [first, second] * 3))
+
+    assert first.scheduler is second.scheduler
+    assert peak == 2 and first.scheduler.active == 0
+    assert first.scheduler.stats["priorities"][DEFAULT]["admitted"] == 6
+    metrics = scheduler_prometheus_text()
+    assert 'sixhats_scheduler_admitted_total{backend="test-backend",priority="default"} 6' in (
+        metrics
+    )
+    assert 'sixhats_scheduler_queue_depth{backend="test-backend",priority="batch"} 0' in metrics
+
+
+@pytest.mark.unit
+def test_priority_comes_from_session_state() -> None:
+    from agents_intensive_capstone.models.scheduler import _current_priority
+
+    bind = priority_callback(default=INTERACTIVE)
+
+    def bound(state: dict) -> str:
+        context = contextvars.copy_context()
+        context.run(bind, SimpleNamespace(state=state))
+        return context[_current_priority]
+
+    assert bound({}) == INTERACTIVE
+    assert bound({PRIORITY_KEY: BATCH}) == BATCH
+    assert bound({PRIORITY_KEY: "urgent"}) == INTERACTIVE
+    with pytest.raises(ValueError):
+        priority_callback(default="urgent")
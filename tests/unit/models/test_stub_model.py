@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm, StubModelError
+
+
+def make_request(text: str = "Should we adopt a 4-day week?") -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def collect(model: StubLlm, request: LlmRequest, stream: bool = False):
+    return [response async for response in model.generate_content_async(request, stream=stream)]
+
+
+@pytest.mark.unit
+def test_latency_distributions_are_seeded_and_non_negative() -> None:
+    dist = LatencyDistribution.lognormal(0.1, 0.8)
+
+    first = [dist.sample(random.Random(7)) for _ in range(3)]
+    second = [dist.sample(random.Random(7)) for _ in range(3)]
+
+    assert first == second
+    assert LatencyDistribution.normal(0.0, 5.0).sample(random.Random(1)) >= 0.0
+    assert LatencyDistribution.constant(0.25).sample(random.Random()) == 0.25
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stub_returns_usage_metadata() -> None:
+    model = StubLlm(output_tokens=12)
+
+    responses = await collect(model, make_request())
+
+    assert len(responses) == 1
+    final = responses[0]
+    assert final.usage_metadata.candidates_token_count == 12
+    assert final.usage_metadata.prompt_token_count > 0
+    assert final.content.parts[0].text.startswith("Stub response 0")
+    assert len(model.calls) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stub_streams_partial_chunks_before_final() -> None:
+    model = StubLlm(output_tokens=16, stream_chunks=4)
+
+    responses = await collect(model, make_request(), stream=True)
+
+    assert [r.partial for r in responses] == [True, True, True, True, None]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stub_failure_injection() -> None:
+    model = StubLlm(failure_rate=1.0, failure_code=429)
+
+    with pytest.raises(StubModelError) as excinfo:
+        await collect(model, make_request())
+
+    assert excinfo.value.code == 429
+    assert model.calls[0].failed
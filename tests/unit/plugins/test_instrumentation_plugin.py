@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import io
+import json
+import pathlib
+
+import pytest
+import pytest_asyncio
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+from agents_intensive_capstone.models import StubLlm, StubModelError
+from agents_intensive_capstone.plugins import InstrumentationPlugin, instrumentation
+
+
+@pytest_asyncio.fixture
+async def instrumented_run():
+    plugin = InstrumentationPlugin()
+    agent = BlackHatFactory.create(model=StubLlm(model="gemini-2.5-flash-lite", output_tokens=50))
+    runner = InMemoryRunner(agent=agent, app_name="test", plugins=[plugin])
+    session = await runner.session_service.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text="Should we migrate?")])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+    return plugin
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_records_run_agent_and_model_spans(instrumented_run) -> None:
+    spans = {span.kind: span for span in instrumented_run.spans}
+
+    assert set(spans) == {"run", "agent", "model"}
+    model_span = spans["model"]
+    assert model_span.output_key == "black_hat_plan"
+    assert model_span.parent_id == spans["agent"].span_id
+    assert model_span.output_tokens == 50
+    assert model_span.cost_usd > 0
+    assert model_span.time_to_first_token is not None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_summary_is_keyed_by_output_key(instrumented_run) -> None:
+    summary = instrumented_run.summary()
+
+    assert summary["black_hat_plan"]["model_calls"] == 1
+    assert summary["black_hat_plan"]["output_tokens"] == 50
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_exports_jsonl_and_prometheus(instrumented_run) -> None:
+    buffer = io.StringIO()
+
+    written = instrumented_run.export_jsonl(buffer)
+    metrics = instrumented_run.prometheus_text()
+
+    assert written == 3
+    assert all(json.loads(line)["trace_id"] for line in buffer.getvalue().splitlines())
+    assert 'sixhats_output_tokens_total{kind="model",output_key="black_hat_plan"' in metrics
+    assert "sixhats_span_seconds_count" in metrics
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_runner_close_closes_the_trace_file(tmp_path: pathlib.Path) -> None:
+    trace_path = tmp_path / "trace.jsonl"
+    plugin = InstrumentationPlugin(trace_path=str(trace_path))
+    agent = BlackHatFactory.create(model=StubLlm(model="gemini-2.5-flash-lite"))
+    runner = InMemoryRunner(agent=agent, app_name="test", plugins=[plugin])
+    session = await runner.session_service.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text="Should we migrate?")])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+
+    await runner.close()
+
+    assert plugin._trace_file is None
+    assert len(trace_path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_run_closes_its_spans() -> None:
+    plugin = InstrumentationPlugin()
+    agent = BlackHatFactory.create(model=StubLlm(failure_rate=1.0))
+    runner = InMemoryRunner(agent=agent, app_name="test", plugins=[plugin])
+    session = await runner.session_service.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text="Should we migrate?")])
+
+    with pytest.raises(StubModelError):
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+
+    assert not plugin._open and not plugin._last_step_end
+    assert {span.kind: span.status for span in plugin.spans} == {
+        "run": "error",
+        "agent": "error",
+        "model": "error",
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_runs_left_open_are_swept_by_the_next_run(
+    instrumented_run, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    plugin = instrumented_run
+    plugin._start(("run", "lost"), "run", "SixHatsSolver", "lost", "SixHatsSolver", parent=None)
+    monkeypatch.setattr(instrumentation, "MAX_RUN_SECONDS", 0.0)
+
+    plugin._sweep_stale_runs()
+
+    assert not plugin._open
+    assert plugin.spans[-1].status == "abandoned"
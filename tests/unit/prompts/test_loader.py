@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pytest
+
+from agents_intensive_capstone.prompts import load_prompt_text, preload_prompts, registry
+
+
+@pytest.mark.unit
+def test_preload_reads_every_bundled_prompt() -> None:
+    prompts = preload_prompts()
+
+    assert "white_hat_prompt.txt" in prompts
+    assert all(name.endswith("_prompt.txt") for name in prompts)
+    assert all(text == text.strip() and text for text in prompts.values())
+
+
+@pytest.mark.unit
+def test_preloaded_prompts_are_served_from_memory(monkeypatch: pytest.MonkeyPatch) -> None:
+    expected = preload_prompts()["blue_hat_prompt.txt"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("prompt re-read from package resources")
+
+    monkeypatch.setattr(registry.resources, "files", fail)
+
+    assert load_prompt_text("blue_hat_prompt.txt") == expected
+
+
+@pytest.mark.unit
+def test_missing_prompt_still_raises() -> None:
+    preload_prompts()
+
+    with pytest.raises(FileNotFoundError):
+        load_prompt_text("no_such_prompt.txt")
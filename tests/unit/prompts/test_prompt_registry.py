@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import time
+
+import pytest
+
+from agents_intensive_capstone.prompts import PromptRegistry
+
+
+def write(path: pathlib.Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+    # Make sure the mtime moves even on filesystems with coarse timestamps
+    stamp = time.time() + 1
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.mark.unit
+def test_bundled_prompts_are_loaded_with_content_hashes() -> None:
+    registry = PromptRegistry()
+
+    prompt = registry.get("white_hat_prompt.txt")
+
+    assert prompt.source == "bundled"
+    assert prompt.sha256 == hashlib.sha256(prompt.text.encode("utf-8")).hexdigest()
+    assert registry.hash("white_hat_prompt.txt") == PromptRegistry().hash("white_hat_prompt.txt")
+
+
+@pytest.mark.unit
+def test_prompt_map_is_read_only() -> None:
+    registry = PromptRegistry()
+
+    with pytest.raises(TypeError):
+        registry.prompts["white_hat_prompt.txt"] = None  # type: ignore[index]
+
+
+@pytest.mark.unit
+def test_unknown_prompt_raises_file_not_found() -> None:
+    with pytest.raises(FileNotFoundError):
+        PromptRegistry().get("does_not_exist.txt")
+
+
+@pytest.mark.unit
+def test_override_dir_replaces_bundled_prompt(tmp_path: pathlib.Path) -> None:
+    write(tmp_path / "red_hat_prompt.txt", "  Overridden red hat.\n")
+
+    registry = PromptRegistry(override_dir=str(tmp_path))
+
+    assert registry.text("red_hat_prompt.txt") == "Overridden red hat."
+    assert registry.get("red_hat_prompt.txt").source == str(tmp_path / "red_hat_prompt.txt")
+    assert registry.hash("red_hat_prompt.txt") != PromptRegistry().hash("red_hat_prompt.txt")
+
+
+@pytest.mark.unit
+def test_reload_reports_changed_prompts(tmp_path: pathlib.Path) -> None:
+    override = tmp_path / "green_hat_prompt.txt"
+    write(override, "v1")
+    registry = PromptRegistry(override_dir=str(tmp_path))
+    seen = []
+    registry.on_change(seen.append)
+
+    assert registry.reload() == []
+
+    write(override, "v2")
+    assert registry.reload() == ["green_hat_prompt.txt"]
+    assert registry.text("green_hat_prompt.txt") == "v2"
+
+    override.unlink()
+    assert registry.reload() == ["green_hat_prompt.txt"]
+    assert registry.get("green_hat_prompt.txt").source == "bundled"
+    assert seen == [["green_hat_prompt.txt"], ["green_hat_prompt.txt"]]
+
+
+@pytest.mark.unit
+def test_watch_hot_reloads_edited_prompt(tmp_path: pathlib.Path) -> None:
+    override = tmp_path / "black_hat_prompt.txt"
+    write(override, "before")
+    registry = PromptRegistry(override_dir=str(tmp_path))
+    registry.watch(interval=0.01)
+    try:
+        write(override, "after")
+        deadline = time.monotonic() + 2
+        while registry.text("black_hat_prompt.txt") != "after" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop()
+
+    assert registry.text("black_hat_prompt.txt") == "after"
+    assert not registry.watching
+
+
+@pytest.mark.unit
+def test_watch_requires_override_dir() -> None:
+    with pytest.raises(ValueError):
+        PromptRegistry().watch()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import pathlib
+import sqlite3
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from agents_intensive_capstone.agents.black_hat_factory import (
+    AGENT_NAME,
+    OUTPUT_KEY,
+    BlackHatFactory,
+)
+from agents_intensive_capstone.models import StubLlm
+from agents_intensive_capstone.sessions import SqliteSessionService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def text_event(text: str, **state_delta) -> Event:
+    return Event(
+        author="agent",
+        invocation_id="inv",
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta),
+    )
+
+
+def tool_call_event() -> Event:
+    call = types.FunctionCall(name="lookup", args={})
+    return Event(
+        author="agent",
+        invocation_id="inv",
+        content=types.Content(role="model", parts=[types.Part(function_call=call)]),
+    )
+
+
+def stored_events(path: pathlib.Path) -> int:
+    with sqlite3.connect(path) as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM events").fetchone()
+    return count
+
+
+@pytest.fixture
+def db(tmp_path: pathlib.Path) -> pathlib.Path:
+    return tmp_path / "sessions.sqlite3"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_runner_sessions_survive_restart(db: pathlib.Path) -> None:
+    service = SqliteSessionService(str(db))
+    runner = Runner(
+        agent=BlackHatFactory.create(model=StubLlm()), app_name="test", session_service=service
+    )
+    session = await service.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text="Should we expand?")])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+    service.close()
+
+    reopened = SqliteSessionService(str(db))
+    restored = await reopened.get_session(app_name="test", user_id="u", session_id=session.id)
+
+    assert restored.state[OUTPUT_KEY]
+    assert [event.author for event in restored.events] == ["user", AGENT_NAME]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_events_are_written_once_per_agent_turn(db: pathlib.Path) -> None:
+    service = SqliteSessionService(str(db))
+    session = await service.create_session(app_name="app", user_id="u")
+
+    await service.append_event(session, tool_call_event())
+    await service.append_event(session, tool_call_event())
+    assert stored_events(db) == 0
+
+    await service.append_event(session, text_event("done", answer="42"))
+    assert stored_events(db) == 3
+    restored = await service.get_session(app_name="app", user_id="u", session_id=session.id)
+    assert restored.state["answer"] == "42"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_runner_close_writes_pending_events(db: pathlib.Path) -> None:
+    service = SqliteSessionService(str(db))
+    runner = Runner(
+        agent=BlackHatFactory.create(model=StubLlm()), app_name="app", session_service=service
+    )
+    session = await service.create_session(app_name="app", user_id="u")
+    await service.append_event(session, tool_call_event())
+    assert stored_events(db) == 0
+
+    await runner.close()
+
+    assert stored_events(db) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_app_and_user_state_are_shared_and_temp_state_dropped(db: pathlib.Path) -> None:
+    service = SqliteSessionService(str(db))
+    first = await service.create_session(app_name="app", user_id="u")
+    await service.append_event(
+        first, text_event("hi", **{"app:model": "flash", "user:name": "Ada", "temp:scratch": 1})
+    )
+
+    second = await service.create_session(app_name="app", user_id="u")
+    other_user = await service.create_session(app_name="app", user_id="v")
+
+    assert second.state == {"app:model": "flash", "user:name": "Ada"}
+    assert other_user.state == {"app:model": "flash"}
+    restored = await service.get_session(app_name="app", user_id="u", session_id=first.id)
+    assert "temp:scratch" not in restored.state
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_recent_events_load_first_and_older_ones_on_demand(db: pathlib.Path) -> None:
+    service = SqliteSessionService(str(db), event_window=2)
+    session = await service.create_session(app_name="app", user_id="u")
+    for index in range(5):
+        await service.append_event(session, text_event(f"turn {index}"))
+
+    restored = await service.get_session(app_name="app", user_id="u", session_id=session.id)
+    assert [e.content.parts[0].text for e in restored.events] == ["turn 3", "turn 4"]
+
+    older = await service.load_older_events(restored, limit=2)
+    assert [e.content.parts[0].text for e in older] == ["turn 1", "turn 2"]
+    assert len(restored.events) == 4
+
+    latest = await service.get_session(
+        app_name="app",
+        user_id="u",
+        session_id=session.id,
+        config=GetSessionConfig(num_recent_events=1),
+    )
+    assert [e.content.parts[0].text for e in latest.events] == ["turn 4"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_idle_sessions_expire(db: pathlib.Path) -> None:
+    clock = FakeClock()
+    service = SqliteSessionService(str(db), ttl_seconds=60, clock=clock)
+    stale = await service.create_session(app_name="app", user_id="u")
+    clock.now += 30
+    fresh = await service.create_session(app_name="app", user_id="u")
+    clock.now += 45
+
+    assert await service.get_session(app_name="app", user_id="u", session_id=stale.id) is None
+    assert await service.get_session(app_name="app", user_id="u", session_id=fresh.id)
+    assert service.expire_sessions() == 1
+    listed = await service.list_sessions(app_name="app", user_id="u")
+    assert [s.id for s in listed.sessions] == [fresh.id]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_compaction_keeps_recent_events_and_state(db: pathlib.Path) -> None:
+    service = SqliteSessionService(str(db))
+    session = await service.create_session(app_name="app", user_id="u")
+    for index in range(4):
+        await service.append_event(session, text_event(f"turn {index}", last=index))
+
+    assert service.compact(keep_events=1) == 3
+
+    restored = await service.get_session(app_name="app", user_id="u", session_id=session.id)
+    assert [e.content.parts[0].text for e in restored.events] == ["turn 3"]
+    assert restored.state["last"] == 3
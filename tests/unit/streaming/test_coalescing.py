@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+from google.adk.agents import ParallelAgent, SequentialAgent
+
+from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+from agents_intensive_capstone.agents.blue_hat_factory import BlueHatFactory
+from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+from agents_intensive_capstone.streaming import (
+    FINAL,
+    TOKEN,
+    CoalescingStreamer,
+    PlanStreamer,
+    StreamEvent,
+)
+
+
+def coalescer(hats: StubLlm, blue: StubLlm) -> CoalescingStreamer:
+    solver = SequentialAgent(
+        name="SixHatsSolver",
+        sub_agents=[
+            ParallelAgent(
+                name="SixHatsBrainstorm",
+                sub_agents=[BlackHatFactory.create(model=hats), GreenHatFactory.create(model=hats)],
+            ),
+            BlueHatFactory.create(model=blue),
+        ],
+    )
+    return CoalescingStreamer(PlanStreamer(solver))
+
+
+async def collect(
+    streamer: CoalescingStreamer,
+    question: str,
+    user_id: str = "user",
+    session_id: Optional[str] = None,
+    state: Optional[Dict[str, Any]] = None,
+) -> List[StreamEvent]:
+    return [
+        event
+        async for event in streamer.stream(question, user_id, session_id=session_id, state=state)
+    ]
+
+
+@pytest.fixture
+def models():
+    return (
+        StubLlm(latency=LatencyDistribution.constant(0.05)),
+        StubLlm(latency=LatencyDistribution.constant(0.1)),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_identical_questions_share_one_run(models) -> None:
+    hats, blue = models
+    streamer = coalescer(hats, blue)
+
+    results = await asyncio.gather(
+        collect(streamer, "Should we adopt a 4-day week?", "ana"),
+        collect(streamer, "should we adopt a  4-day week? ", "ben"),
+        collect(streamer, "Should we adopt a 4-day week?", "cy"),
+    )
+
+    assert len(blue.calls) == 1 and len(hats.calls) == 2
+    assert streamer.stats == {"runs": 1, "coalesced": 2, "uncoalesced": 0}
+    assert streamer.in_flight == 0
+    finals = [events[-1] for events in results]
+    assert all(final.kind == FINAL for final in finals)
+    assert len({final.text for final in finals}) == 1
+    assert [final.data["coalesced"] for final in finals] == [False, True, True]
+    for events in results:
+        assert "".join(e.text for e in events if e.kind == TOKEN).strip() == finals[0].text.strip()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_each_caller_keeps_its_own_session(models) -> None:
+    hats, blue = models
+    streamer = coalescer(hats, blue)
+    sessions = streamer.streamer.runner.session_service
+    app_name = streamer.streamer.app_name
+
+    results = await asyncio.gather(
+        collect(streamer, "Should we expand?", "ana"),
+        collect(streamer, "Should we expand?", "ben"),
+    )
+
+    session_ids = [events[-1].data["session_id"] for events in results]
+    assert session_ids[0] != session_ids[1]
+    for user_id, session_id in zip(("ana", "ben"), session_ids, strict=True):
+        session = await sessions.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        assert session.state["blue_hat_final_plan"] == results[0][-1].text
+        assert session.state["black_hat_plan"]
+        assert [event.author for event in session.events] == ["user", "BlueHatAgent"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_different_state_or_follow_ups_run_separately(models) -> None:
+    hats, blue = models
+    streamer = coalescer(hats, blue)
+
+    first, _ = await asyncio.gather(
+        collect(streamer, "Should we expand?"),
+        collect(streamer, "Should we expand?", state={"request_budget": {"max_tokens": 5000}}),
+    )
+    session_id = first[-1].data["session_id"]
+    follow_up = await collect(streamer, "And in Spain?", session_id=session_id)
+
+    assert streamer.stats == {"runs": 2, "coalesced": 0, "uncoalesced": 1}
+    assert follow_up[-1].kind == FINAL
+    assert len(blue.calls) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_is_cancelled_once_every_caller_left(models) -> None:
+    hats, blue = models
+    streamer = coalescer(hats, blue)
+
+    events = streamer.stream("Should we expand?")
+    await events.__anext__()
+    await events.aclose()
+    await asyncio.sleep(0.3)
+
+    assert streamer.in_flight == 0
+    assert blue.calls == []
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from typing import List
+
+import pytest
+from google.adk.agents import ParallelAgent, SequentialAgent
+
+from agents_intensive_capstone.agents.black_hat_factory import BlackHatFactory
+from agents_intensive_capstone.agents.blue_hat_factory import BlueHatFactory
+from agents_intensive_capstone.agents.green_hat_factory import GreenHatFactory
+from agents_intensive_capstone.models import LatencyDistribution, StubLlm
+from agents_intensive_capstone.plugins import InstrumentationPlugin
+from agents_intensive_capstone.streaming import (
+    ERROR,
+    FINAL,
+    HAT_DONE,
+    HAT_STARTED,
+    TOKEN,
+    PlanStreamer,
+    StreamEvent,
+)
+
+
+def solver(blue: StubLlm, hats: StubLlm) -> SequentialAgent:
+    return SequentialAgent(
+        name="SixHatsSolver",
+        sub_agents=[
+            ParallelAgent(
+                name="SixHatsBrainstorm",
+                sub_agents=[BlackHatFactory.create(model=hats), GreenHatFactory.create(model=hats)],
+            ),
+            BlueHatFactory.create(model=blue),
+        ],
+    )
+
+
+async def collect(streamer: PlanStreamer) -> List[StreamEvent]:
+    return [event async for event in streamer.stream("Should we adopt a 4-day week?")]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_hat_progress_then_plan_tokens_then_final() -> None:
+    hats = StubLlm(latency=LatencyDistribution.constant(0.02))
+    blue = StubLlm(latency=LatencyDistribution.constant(0.2), stream_chunks=5)
+
+    events = await collect(PlanStreamer(solver(blue, hats)))
+
+    kinds = [event.kind for event in events]
+    assert kinds.count(HAT_DONE) == 2
+    assert kinds.count(TOKEN) == 5
+    assert kinds[-1] == FINAL
+    assert max(i for i, kind in enumerate(kinds) if kind == HAT_DONE) < kinds.index(TOKEN)
+    assert {e.author for e in events if e.kind == HAT_STARTED} == {
+        "BlackHatAgent",
+        "GreenHatAgent",
+        "BlueHatAgent",
+    }
+
+    final = events[-1]
+    tokens = "".join(e.text for e in events if e.kind == TOKEN)
+    assert tokens.strip() == final.text.strip()
+    metrics = final.data
+    assert 0 < metrics["time_to_first_token"] < metrics["total_seconds"]
+    assert metrics["token_chunks"] == 5 and metrics["hats_done"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_unstreamed_plan_is_sent_as_one_token() -> None:
+    blue = StubLlm(stream_chunks=1)
+
+    events = await collect(PlanStreamer(solver(blue, StubLlm())))
+
+    tokens = [e for e in events if e.kind == TOKEN]
+    assert len(tokens) == 1
+    assert tokens[0].text == events[-1].text
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_run_ends_with_an_error_event() -> None:
+    events = await collect(PlanStreamer(solver(StubLlm(failure_rate=1.0), StubLlm())))
+
+    assert events[-1].kind == ERROR
+    assert events[-1].data["time_to_first_token"] is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_time_to_first_token_is_instrumented() -> None:
+    plugin = InstrumentationPlugin()
+    blue = StubLlm(latency=LatencyDistribution.constant(0.1))
+    streamer = PlanStreamer(solver(blue, StubLlm()), plugins=[plugin])
+
+    await collect(streamer)
+
+    run = next(span for span in plugin.spans if span.kind == "run")
+    blue_model = next(
+        span for span in plugin.spans
+        if span.kind == "model" and span.output_key == "blue_hat_final_plan"
+    )
+    assert run.time_to_first_token is not None
+    assert run.time_to_first_token >= blue_model.time_to_first_token
+    assert 'sixhats_time_to_first_token_seconds_count{kind="run"' in plugin.prometheus_text()
+
+
+@pytest.mark.unit
+def test_events_serialize_as_server_sent_events() -> None:
+    message = StreamEvent(TOKEN, "BlueHatAgent", "Line one\nline two").to_sse()
+
+    event_line, data_line, blank, end = message.split("\n")
+    assert event_line == "event: token"
+    assert json.loads(data_line.removeprefix("data: "))["text"] == "Line one\nline two"
+    assert (blank, end) == ("", "")
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import pathlib
+
+import pytest
+
+from agents_intensive_capstone.tools import local_search
+from agents_intensive_capstone.tools.local_search import (
+    LocalCorpusIndex,
+    create_local_search_tool,
+    snippet,
+    split_passages,
+)
+
+BUCKETS = 4096
+
+
+def write(corpus: pathlib.Path, name: str, text: str) -> None:
+    path = corpus / name
+    path.write_text(text, encoding="utf-8")
+    # Make every rewrite visible to the (mtime, size) change check
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def corpus(tmp_path: pathlib.Path) -> pathlib.Path:
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    write(corpus, "energy.md", "Solar capacity doubled in five years.\n\nWind farms need storage.")
+    write(corpus, "team.txt", "Team morale rose after the pilot.\n\nMeetings were shortened.")
+    write(corpus, "notes.csv", "solar,ignored")
+    return corpus
+
+
+@pytest.mark.unit
+def test_search_ranks_matching_passages(corpus: pathlib.Path) -> None:
+    index = LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS)
+
+    hits = index.search("solar capacity", top_k=3)
+
+    assert index.documents == 2 and index.passages == 4
+    assert hits[0].source == "energy.md"
+    assert hits[0].text == "Solar capacity doubled in five years."
+    assert index.search("the of and") == []
+
+
+@pytest.mark.unit
+def test_refresh_indexes_only_changed_files(corpus: pathlib.Path) -> None:
+    index = LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS)
+    assert index.refresh() == {"indexed": 0, "deleted": 0}
+
+    write(corpus, "team.txt", "The pilot was cancelled.")
+    assert index.refresh() == {"indexed": 1, "deleted": 0}
+
+    assert index.segments == 2
+    assert [hit.text for hit in index.search("pilot")] == ["The pilot was cancelled."]
+    assert index.search("morale") == []
+    assert index.search("solar")[0].source == "energy.md"
+
+
+@pytest.mark.unit
+def test_superseded_passages_leave_document_frequencies(
+    corpus: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    index = LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS)
+    write(corpus, "team.txt", "The pilot was cancelled.\n\nSolar panels were installed.")
+    index.refresh()
+
+    fresh = LocalCorpusIndex.open(str(corpus), str(tmp_path / "fresh"), n_buckets=BUCKETS)
+
+    assert index.segments == 2 and fresh.segments == 1
+    for query in ("pilot", "solar", "morale"):
+        assert index.search(query) == fresh.search(query)
+
+
+@pytest.mark.unit
+def test_deleted_files_leave_the_index(corpus: pathlib.Path) -> None:
+    index = LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS)
+    (corpus / "energy.md").unlink()
+
+    assert index.refresh() == {"indexed": 0, "deleted": 1}
+    assert index.search("solar") == []
+    assert index.passages == 2
+
+
+@pytest.mark.unit
+def test_reopening_maps_the_persisted_index(corpus: pathlib.Path) -> None:
+    LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS).close()
+
+    reopened = LocalCorpusIndex(str(corpus))
+
+    assert reopened.n_buckets == BUCKETS
+    assert reopened.search("storage")[0].text == "Wind farms need storage."
+    assert reopened.refresh() == {"indexed": 0, "deleted": 0}
+
+
+@pytest.mark.unit
+def test_many_refreshes_collapse_into_one_segment(
+    corpus: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(local_search, "MAX_SEGMENTS", 2)
+    index = LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS)
+    for round_ in range(2):
+        write(corpus, "team.txt", f"Pilot round {round_} finished.")
+        index.refresh()
+
+    assert index.segments == 1
+    assert sorted(p.name for p in (corpus / ".six_hats_index").iterdir()) == [
+        "manifest.json",
+        "seg-000003",
+    ]
+    assert index.search("pilot")[0].text == "Pilot round 1 finished."
+
+
+@pytest.mark.unit
+def test_postings_are_pruned_to_the_strongest(tmp_path: pathlib.Path) -> None:
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    passages = ["growth " + "filler " * n for n in range(10)] + ["growth growth growth"]
+    write(corpus, "docs.txt", "\n\n".join(passages))
+
+    index = LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS, max_postings_per_term=3)
+    hits = index.search("growth", top_k=10)
+
+    assert [hit.text for hit in hits] == ["growth growth growth", "growth", "growth filler"]
+
+
+@pytest.mark.unit
+def test_passages_and_snippets_are_bounded() -> None:
+    assert split_passages("one two three\n\nfour", max_words=2) == ["one two", "three", "four"]
+
+    text = "intro " * 100 + "the key finding is here " + "outro " * 100
+    clipped = snippet(text, "finding", limit=60)
+    assert "finding" in clipped and clipped.startswith("…") and len(clipped) <= 62
+
+
+@pytest.mark.unit
+def test_tool_returns_ranked_results(corpus: pathlib.Path) -> None:
+    tool = create_local_search_tool(LocalCorpusIndex.open(str(corpus), n_buckets=BUCKETS), top_k=1)
+
+    result = tool.func(query="team morale")
+
+    assert tool.name == "local_search"
+    assert result["results"][0]["source"] == "team.txt"
+    assert set(result["results"][0]) == {"source", "score", "text"}
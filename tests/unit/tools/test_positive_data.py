@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from agents_intensive_capstone.tools.positive_data import (
+    KeywordIndex,
+    PositiveDataCatalog,
+    PositiveDataset,
+)
+from agents_intensive_capstone.tools.tools import get_positive_data, get_positive_data_batch
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("topic", "expected"),
+    [
+        ("Results of the pilot", "**Pilot Data Success:**"),
+        ("Renewable ENERGY outlook", "**Future Trend Analysis:**"),
+        ("Logistics bottlenecks", "**Breakthrough Solution Found:**"),
+        ("team morale", "**Team Success Story (Alpha Team):**"),
+        # Earlier datasets win, as in the original if/elif chain
+        ("team decision", "**Pilot Data Success:**"),
+        # Substring matching, as before
+        ("steam turbines", "**Team Success Story (Alpha Team):**"),
+    ],
+)
+def test_bundled_catalog_matches_previous_behaviour(topic: str, expected: str) -> None:
+    assert get_positive_data(topic).startswith(expected)
+
+
+@pytest.mark.unit
+def test_unmatched_topic_gets_fallback_report() -> None:
+    report = get_positive_data("quantum {gravity}")
+
+    assert "No curated dataset" in report
+    assert "quantum {gravity}" in report
+
+
+@pytest.mark.unit
+def test_batch_lookup_preserves_order() -> None:
+    topics = ["energy", "team", "energy", "unknown"]
+
+    assert get_positive_data_batch(topics) == [get_positive_data(t) for t in topics]
+
+
+@pytest.mark.unit
+def test_overlapping_keywords_are_all_found() -> None:
+    catalog = PositiveDataCatalog(
+        [
+            PositiveDataset("chain", ("chain",), "chain report"),
+            PositiveDataset("supply", ("supply chain",), "supply report"),
+            PositiveDataset("ply", ("ply",), "ply report"),
+        ],
+        fallback="none",
+    )
+
+    assert catalog.lookup("supply chains") == "chain report"
+    assert catalog.lookup("supply") == "ply report"
+    assert catalog.lookup("demand") == "none"
+
+
+@pytest.mark.unit
+def test_index_agrees_with_linear_scan() -> None:
+    rng = random.Random(7)
+    alphabet = "abc "
+    keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(50)]
+    index = KeywordIndex((keyword, rank) for rank, keyword in enumerate(keywords))
+
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        linear = next((rank for rank, kw in enumerate(keywords) if kw in text), None)
+        assert index.best(text) == linear, text
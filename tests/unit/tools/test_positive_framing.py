@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from agents_intensive_capstone.tools.local_search import LocalCorpusIndex, SearchHit
+from agents_intensive_capstone.tools.positive_framing import (
+    create_optimist_search_tool,
+    frame_positively,
+    framing_score,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Team morale rose after a successful pilot.", 2),
+        ("The pilot was cancelled after delays.", -1),
+        ("The launch was not successful.", -1),
+        ("Meetings were shortened.", 0),
+    ],
+)
+def test_framing_score(text: str, expected: int) -> None:
+    assert framing_score(text) == expected
+
+
+@pytest.mark.unit
+def test_negative_hits_are_dropped_and_order_is_kept() -> None:
+    hits = [
+        SearchHit("a.txt", 3.0, "Costs are a concern."),
+        SearchHit("b.txt", 2.0, "The rollout is on schedule."),
+        SearchHit("c.txt", 1.0, "Savings beat the plan."),
+    ]
+
+    assert [(hit.source, score) for hit, score in frame_positively(hits)] == [
+        ("b.txt", 0),
+        ("c.txt", 1),
+    ]
+
+
+@pytest.mark.unit
+def test_tool_searches_the_index_directly(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "pilot.txt").write_text(
+        "The pilot failed in the north region.\n\n"
+        "The pilot succeeded in the south region and saved money.\n\n"
+        "Pilot staffing was unchanged.",
+        encoding="utf-8",
+    )
+    index = LocalCorpusIndex.open(str(tmp_path), n_buckets=4096)
+    tool = create_optimist_search_tool(index.search, top_k=5)
+
+    result = tool.func(query="pilot region")
+
+    assert tool.name == "optimist_search"
+    assert result["filtered"] == 1
+    assert [hit["framing"] for hit in result["results"]] == [2, 0]
+    assert all("failed" not in hit["text"] for hit in result["results"])
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+from google.adk.tools import BaseTool
+
+from agents_intensive_capstone.tools.search_cache import CachedSearchTool, SearchCache
+
+
+class CountingSearch:
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.queries: List[str] = []
+
+    async def __call__(self, query: str) -> str:
+        self.queries.append(query)
+        await asyncio.sleep(self.delay)
+        return f"results for {query}"
+
+
+class FakeSearchTool(BaseTool):
+    def __init__(self, search: CountingSearch) -> None:
+        super().__init__(name="web_search", description="Searches the web.")
+        self.search = search
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: Any) -> Any:
+        return await self.search(args["request"])
+
+
+def tool_context(session_id: str) -> Any:
+    session = SimpleNamespace(id=session_id)
+    return SimpleNamespace(_invocation_context=SimpleNamespace(session=session))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_fetch() -> None:
+    cache = SearchCache()
+    search = CountingSearch()
+    key = cache.make_key("web_search", {"request": "EV adoption"}, "s1")
+
+    results = await asyncio.gather(
+        *(cache.get_or_fetch(key, lambda: search("EV adoption")) for _ in range(3))
+    )
+
+    assert results == ["results for EV adoption"] * 3
+    assert search.queries == ["EV adoption"]
+    assert cache.stats == {"hits": 0, "misses": 1, "coalesced": 2}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_finished_search_is_served_from_cache() -> None:
+    cache = SearchCache()
+    search = CountingSearch()
+    key = cache.make_key("web_search", {"request": "EV adoption"}, "s1")
+
+    await cache.get_or_fetch(key, lambda: search("EV adoption"))
+    again = await cache.get_or_fetch(key, lambda: search("EV adoption"))
+
+    assert again == "results for EV adoption"
+    assert len(search.queries) == 1
+    assert cache.hits == 1
+
+
+@pytest.mark.unit
+def test_keys_normalize_queries_and_respect_scope() -> None:
+    session = SearchCache(scope="session")
+    process = SearchCache(scope="process")
+
+    assert session.make_key("t", {"request": "EV  Adoption "}, "s1") == session.make_key(
+        "t", {"request": "ev adoption"}, "s1"
+    )
+    assert session.make_key("t", {"request": "q"}, "s1") != session.make_key(
+        "t", {"request": "q"}, "s2"
+    )
+    assert process.make_key("t", {"request": "q"}, "s1") == process.make_key(
+        "t", {"request": "q"}, "s2"
+    )
+
+
+@pytest.mark.unit
+def test_unknown_scope_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        SearchCache(scope="global")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch() -> None:
+    cache = SearchCache()
+    search = CountingSearch(delay=0.05)
+    key = cache.make_key("web_search", {"request": "q"})
+
+    first = asyncio.create_task(cache.get_or_fetch(key, lambda: search("q")))
+    second = asyncio.create_task(cache.get_or_fetch(key, lambda: search("q")))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "results for q"
+    assert search.queries == ["q"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_search_is_not_cached() -> None:
+    cache = SearchCache()
+    calls = []
+
+    async def flaky() -> str:
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("search backend unavailable")
+        return "ok"
+
+    key = cache.make_key("web_search", {"request": "q"})
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch(key, flaky)
+
+    assert await cache.get_or_fetch(key, flaky) == "ok"
+    assert len(calls) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cached_tool_shares_results_between_hats_of_one_session() -> None:
+    search = CountingSearch()
+    tool = CachedSearchTool(FakeSearchTool(search), SearchCache(scope="session"))
+
+    white, red, other_session = await asyncio.gather(
+        tool.run_async(args={"request": "grid storage"}, tool_context=tool_context("s1")),
+        tool.run_async(args={"request": "Grid storage"}, tool_context=tool_context("s1")),
+        tool.run_async(args={"request": "grid storage"}, tool_context=tool_context("s2")),
+    )
+
+    assert white == red == other_session == "results for grid storage"
+    assert len(search.queries) == 2
+    assert tool.name == "web_search"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tools_in_one_namespace_share_results() -> None:
+    search = CountingSearch()
+    cache = SearchCache(scope="session")
+    web = CachedSearchTool(FakeSearchTool(search), cache, namespace="web_search")
+    optimist_tool = FakeSearchTool(search)
+    optimist_tool.name = "google_optimist"
+    optimist = CachedSearchTool(optimist_tool, cache, namespace="web_search")
+
+    await web.run_async(args={"request": "grid storage"}, tool_context=tool_context("s1"))
+    result = await optimist.run_async(
+        args={"request": "grid storage"}, tool_context=tool_context("s1")
+    )
+
+    assert result == "results for grid storage"
+    assert len(search.queries) == 1
+    assert cache.stats == {"hits": 1, "misses": 1, "coalesced": 0}